@@ -0,0 +1,127 @@
+"""
+Classifier hot paths: single hand (objects / array) and batches
+分類器效能：單手（物件 / 陣列）與批次
+"""
+import tracemalloc
+
+import pytest
+
+from src.gesture_classifier import GestureClassifier
+from src.gesture_classifier_v2 import GestureClassifierV2
+
+from conftest import BATCH_SIZES, make_batch
+
+
+@pytest.mark.benchmark(group="classify-v1")
+class BenchGestureClassifier:
+
+    def bench_classify_landmarks(self, benchmark, hand_landmarks):
+        benchmark(GestureClassifier().classify, hand_landmarks)
+
+    def bench_classify_array(self, benchmark, hand_array):
+        benchmark(GestureClassifier().classify, hand_array)
+
+
+@pytest.mark.benchmark(group="classify-v2")
+class BenchGestureClassifierV2:
+
+    def bench_classify_landmarks(self, benchmark, hand_landmarks):
+        benchmark(GestureClassifierV2().classify, hand_landmarks)
+
+    def bench_classify_array(self, benchmark, hand_array):
+        benchmark(GestureClassifierV2().classify, hand_array)
+
+
+def allocations_per_call(func, calls: int = 1000):
+    """Memory blocks / bytes still held per call (results are kept alive)"""
+    func()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [func() for _ in range(calls)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    del kept
+    return (sum(stat.count_diff for stat in diff) / calls,
+            sum(stat.size_diff for stat in diff) / calls)
+
+
+@pytest.mark.benchmark(group="classify-alloc")
+class BenchClassifyAllocations:
+    """New result per call vs one reused result (classify(..., out=))"""
+
+    def bench_classify_new_result(self, benchmark, hand_array):
+        classify = GestureClassifierV2().classify
+        call = lambda: classify(hand_array)
+        blocks, size = allocations_per_call(call)
+        benchmark.extra_info.update(blocks_per_call=blocks, bytes_per_call=size)
+        benchmark(call)
+
+    def bench_classify_reused_result(self, benchmark, hand_array):
+        classifier = GestureClassifierV2()
+        out = classifier.classify(hand_array)
+        call = lambda: classifier.classify(hand_array, out=out)
+        blocks, size = allocations_per_call(call)
+        benchmark.extra_info.update(blocks_per_call=blocks, bytes_per_call=size)
+        benchmark(call)
+
+
+@pytest.mark.benchmark(group="classify-angle-mode")
+@pytest.mark.parametrize("angle_mode", ["2d", "3d"])
+class BenchAngleMode:
+    """3D dot-product angles vs the 2D atan2 path (3D should cost no more)"""
+
+    def bench_classify_array(self, benchmark, hand_array, angle_mode):
+        benchmark(GestureClassifierV2(angle_mode=angle_mode).classify, hand_array)
+
+    def bench_classify_landmarks(self, benchmark, hand_landmarks, angle_mode):
+        benchmark(GestureClassifierV2(angle_mode=angle_mode).classify, hand_landmarks)
+
+    def bench_classify_batch_10000(self, benchmark, angle_mode):
+        batch = make_batch(10000)
+        benchmark(GestureClassifierV2(angle_mode=angle_mode).classify_batch, batch)
+
+
+@pytest.mark.benchmark(group="classify-batch")
+@pytest.mark.parametrize("size", BATCH_SIZES)
+class BenchClassifyBatch:
+
+    def bench_classify_batch(self, benchmark, size):
+        batch = make_batch(size)
+        benchmark.extra_info["hands"] = size
+        benchmark(GestureClassifierV2().classify_batch, batch)
+
+    def bench_classify_loop(self, benchmark, size):
+        """Per-hand classify() over the same batch (what classify_batch replaces)"""
+        if size > 100:
+            pytest.skip("per-hand loop only timed at small sizes")
+        batch = make_batch(size)
+        classify = GestureClassifierV2().classify
+        benchmark.extra_info["hands"] = size
+        benchmark(lambda: [classify(hand) for hand in batch])
+
+
+@pytest.fixture(scope="module", params=[0, 32], ids=["logistic", "mlp32"])
+def gesture_model(request):
+    from src.gesture_model import train_gesture_model
+    from src.synthetic import Augment, random_hands
+
+    codes, points = next(random_hands(4000, Augment(noise=0.01, rotation=30.0)))
+    return train_gesture_model(points, codes, hidden=request.param, epochs=3)[0]
+
+
+@pytest.mark.benchmark(group="classify-backend")
+class BenchGestureModel:
+    """Learned backend: model alone (several thousand hands per ms) and behind the classifier"""
+
+    def bench_predict_array(self, benchmark, gesture_model, hand_array):
+        benchmark(gesture_model.predict, hand_array)
+
+    def bench_predict_batch_10000(self, benchmark, gesture_model):
+        batch = make_batch(10000)
+        benchmark.extra_info["hands"] = 10000
+        benchmark(gesture_model.predict_batch, batch)
+
+    def bench_classify_batch_10000(self, benchmark, gesture_model):
+        batch = make_batch(10000)
+        benchmark(GestureClassifierV2(backend=gesture_model).classify_batch, batch)
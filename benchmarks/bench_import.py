@@ -0,0 +1,44 @@
+"""
+Cold-start import time of the core modules (fresh interpreter per round)
+核心模組冷啟動匯入時間（每輪啟動新的直譯器）
+"""
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+CORE = "import src.gesture_classifier_v2, src.judge, src.game_logic"
+# Interpreter start + NumPy + core modules; fails the run when exceeded
+IMPORT_BUDGET = 0.5
+
+
+def cold_import(code: str) -> float:
+    """Seconds to run ``code`` in a new interpreter"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=str(ROOT), check=True)
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark(group="import")
+class BenchImport:
+
+    def bench_interpreter_only(self, benchmark):
+        """Baseline: bare interpreter start"""
+        benchmark.pedantic(cold_import, args=("pass",), rounds=5)
+
+    def bench_core_cold_start(self, benchmark):
+        # Timed here, not via benchmark.stats (None under --benchmark-disable)
+        samples = []
+        benchmark.extra_info["budget_s"] = IMPORT_BUDGET
+        benchmark.pedantic(lambda: samples.append(cold_import(CORE)), rounds=5)
+        assert statistics.median(samples) < IMPORT_BUDGET
+
+    def bench_core_no_heavy_modules(self, benchmark):
+        """Core import must not load OpenCV, PIL or MediaPipe"""
+        check = (f"{CORE}; import sys; "
+                 "assert not {'cv2', 'PIL', 'mediapipe'} & set(sys.modules)")
+        benchmark.pedantic(cold_import, args=(check,), rounds=3)
@@ -0,0 +1,117 @@
+"""
+Judge and game-logic hot paths
+判定與遊戲邏輯效能
+"""
+import itertools
+
+import numpy as np
+import pytest
+
+from src.game_logic import RPSStateMachine, SimpleGameLogic
+from src.gestures import Gesture
+from src.judge import judge, judge_batch, judge_rps
+from src.replay import ReplayEngine, Session
+from src.stabilizer import GestureStabilizer
+from src.tournament import League
+from src.synthetic import GESTURES, SyntheticSource
+
+PAIRS = list(itertools.product(GESTURES, repeat=2))
+
+
+@pytest.mark.benchmark(group="judge")
+class BenchJudge:
+
+    def bench_judge_rps(self, benchmark):
+        benchmark(judge_rps, "rock", "scissors")
+
+    def bench_judge_all_pairs(self, benchmark):
+        benchmark(lambda: [judge_rps(left, right) for left, right in PAIRS])
+
+    def bench_judge_codes(self, benchmark):
+        benchmark(judge, Gesture.ROCK, Gesture.SCISSORS)
+
+    def bench_judge_batch(self, benchmark):
+        rng = np.random.default_rng(0)
+        left, right = rng.integers(0, 4, size=(2, 10000), dtype=np.int8)
+        benchmark(judge_batch, left, right)
+
+
+@pytest.mark.benchmark(group="game-logic")
+class BenchGameLogic:
+
+    def bench_update_live(self, benchmark):
+        logic = SimpleGameLogic(clock=lambda: 0.0)
+        benchmark(logic.update, "rock", "paper")
+
+    def bench_update_locked(self, benchmark):
+        logic = SimpleGameLogic(lock_duration=1e9, clock=lambda: 0.0)
+        logic.update("rock", "paper", space_pressed=True)
+        benchmark(logic.update, "rock", "paper")
+
+    def million_ticks(self):
+        """One million frames (~9 hours at 30 FPS) of held gestures with dropouts"""
+        rng = np.random.default_rng(0)
+        frames = 1_000_000
+        held = np.repeat(rng.integers(1, 4, size=(2, frames // 60 + 1)), 60, axis=1)[:, :frames]
+        codes = np.where(rng.random((2, frames)) < 0.995, held, 0).astype(np.int8)
+        timestamps = np.cumsum(rng.uniform(0.02, 0.05, frames))
+        return timestamps, codes[0], codes[1], rng.random(frames) < 0.005
+
+    def bench_run_live_million_ticks(self, benchmark):
+        timestamps, left, right, space = self.million_ticks()
+        benchmark.extra_info["ticks"] = len(timestamps)
+        benchmark(SimpleGameLogic(lock_duration=3.0).run, timestamps, left, right, space)
+
+    def bench_run_countdown_million_ticks(self, benchmark):
+        timestamps, left, right, _ = self.million_ticks()
+        benchmark.extra_info["ticks"] = len(timestamps)
+        benchmark(RPSStateMachine().run, timestamps, left, right)
+
+    def bench_stabilizer_update(self, benchmark):
+        stabilizer = GestureStabilizer(window=5, min_count=3)
+        benchmark(stabilizer.update, "rock")
+
+    def bench_replay_one_minute(self, benchmark):
+        """1800 frames (one minute at 30 FPS) through classify + game logic + judge"""
+        session = Session.from_frames(SyntheticSource(frames=1800))
+        benchmark.extra_info["frames"] = len(session)
+        benchmark(ReplayEngine().run, session)
+
+
+@pytest.mark.benchmark(group="league")
+class BenchLeague:
+
+    ROUNDS = 1_000_000
+
+    def columns(self, players=1000):
+        rng = np.random.default_rng(0)
+        left = rng.integers(0, players, self.ROUNDS)
+        right = (left + rng.integers(1, players, self.ROUNDS)) % players
+        codes = rng.integers(0, 4, size=(2, self.ROUNDS), dtype=np.int8)
+        return left, right, codes[0], codes[1]
+
+    def bench_add_rounds_million(self, benchmark):
+        """One million rounds as columns, 65536 rounds per rating period"""
+        left, right, left_codes, right_codes = self.columns()
+
+        def score():
+            league = League()
+            for name in range(1000):
+                league.player_id(f"p{name}")
+            for start in range(0, self.ROUNDS, 1 << 16):
+                end = start + (1 << 16)
+                league.add_rounds(left[start:end], right[start:end],
+                                  left_codes[start:end], right_codes[start:end])
+            return league
+
+        benchmark.extra_info["rounds"] = self.ROUNDS
+        benchmark.pedantic(score, rounds=3)
+
+    def bench_ingest_million(self, benchmark):
+        """One million (left, right, gesture, gesture, timestamp) tuples"""
+        names = [f"p{i}" for i in range(1000)]
+        labels = [g.label for g in Gesture]
+        rounds = [(names[a], names[b], labels[c], labels[d], float(t))
+                  for t, (a, b, c, d) in enumerate(zip(*(column.tolist() for column in self.columns())))]
+        benchmark.extra_info["rounds"] = self.ROUNDS
+        benchmark.pedantic(lambda: League().ingest(rounds), rounds=1)
@@ -0,0 +1,46 @@
+"""
+Synthetic load: hand generation throughput and classifier accuracy under noise
+合成資料壓力測試：產生速度與加入雜訊後的分類準確率
+"""
+import numpy as np
+import pytest
+
+from src.gesture_classifier_v2 import GestureClassifierV2
+from src.synthetic import Augment, random_hands, synthesize_session
+
+HANDS = 1_000_000
+REALISTIC = Augment(noise=0.004, rotation=30.0, scale=(0.6, 1.4), shift=0.2, occlusion=0.1)
+
+
+def drain(n: int, augment=None) -> int:
+    return sum(len(codes) for codes, _ in random_hands(n, augment))
+
+
+@pytest.mark.benchmark(group="synthetic")
+class BenchSynthesize:
+
+    def bench_million_templates(self, benchmark):
+        benchmark.extra_info["hands"] = HANDS
+        benchmark.pedantic(drain, args=(HANDS,), rounds=3)
+
+    def bench_million_augmented(self, benchmark):
+        benchmark.extra_info["hands"] = HANDS
+        benchmark.pedantic(drain, args=(HANDS, REALISTIC), rounds=3)
+
+    def bench_one_hour_session(self, benchmark):
+        """108,000 two-hand frames with transitions"""
+        benchmark.pedantic(synthesize_session, args=(108000,),
+                           kwargs=dict(hold=20, transition=6, augment=REALISTIC), rounds=3)
+
+
+@pytest.mark.benchmark(group="synthetic")
+class BenchAccuracy:
+
+    def bench_classify_augmented(self, benchmark):
+        """classify_batch over 100k realistic hands; records the accuracy"""
+        classifier = GestureClassifierV2()
+        codes, points = next(random_hands(100_000, REALISTIC, batch=100_000))
+        result = benchmark(classifier.classify_batch, points)
+        accuracy = float((result.codes == codes).mean())
+        benchmark.extra_info["accuracy"] = round(accuracy, 4)
+        assert accuracy > 0.95
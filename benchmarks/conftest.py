@@ -0,0 +1,59 @@
+"""
+Benchmark fixtures - synthetic landmarks shaped like the test fixtures
+效能測試共用資料：與 tests/ 相同幾何的合成手部關鍵點
+"""
+import os
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.synthetic import GESTURE_FINGER_STATES, GESTURES, canonical_hand
+
+BATCH_SIZES = (1, 100, 10000)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Anchor a relative file:// benchmark storage to rootdir instead of the cwd"""
+    storage = config.getoption("benchmark_storage", None)
+    if storage and storage.startswith("file://") and not os.path.isabs(storage[len("file://"):]):
+        config.option.benchmark_storage = f"file://{config.rootpath / storage[len('file://'):]}"
+
+
+@dataclass
+class MockLandmark:
+    """Mock MediaPipe landmark (attribute access like the protobuf)"""
+    x: float
+    y: float
+    z: float = 0.0
+
+
+def to_landmarks(points: np.ndarray) -> List[MockLandmark]:
+    return [MockLandmark(*map(float, point)) for point in points]
+
+
+@pytest.fixture(scope="session", params=GESTURES)
+def gesture(request) -> str:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def hand_array(gesture) -> np.ndarray:
+    """(21, 3) float32 canonical hand"""
+    return canonical_hand(GESTURE_FINGER_STATES[gesture])
+
+
+@pytest.fixture(scope="session")
+def hand_landmarks(hand_array) -> List[MockLandmark]:
+    """21 landmark objects, as the notebooks pass them"""
+    return to_landmarks(hand_array)
+
+
+def make_batch(size: int, seed: int = 0) -> np.ndarray:
+    """(size, 21, 3) hands: random canonical gestures plus ±0.5% jitter"""
+    rng = np.random.default_rng(seed)
+    hands = np.stack([canonical_hand(GESTURE_FINGER_STATES[g]) for g in GESTURES])
+    batch = hands[rng.integers(0, len(GESTURES), size)]
+    return (batch + rng.normal(0, 0.005, batch.shape)).astype(np.float32)
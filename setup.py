@@ -18,12 +18,13 @@ setup(
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
             "pytest-mock>=3.11.0",
+            "pytest-benchmark>=4.0.0",
         ]
     },
     python_requires=">=3.8",
     entry_points={
         "console_scripts": [
-            "rps-referee=main:main",
+            "rps-referee=src.cli:main",
         ],
     },
 )
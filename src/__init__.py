@@ -1,7 +1,44 @@
 """
 RPS Gesture Referee System
 A real-time Rock-Paper-Scissors gesture recognition and referee system
+
+Public names are imported on first access, so ``import src`` (and the
+classifier, judge and game logic) load without OpenCV, PIL or MediaPipe.
 """
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "Your Name"
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "RPSConfig": "config",
+    "Gesture": "gestures",
+    "GestureClassifierV2": "gesture_classifier_v2",
+    "GestureResult": "gesture_classifier_v2",
+    "judge_rps": "judge",
+    "judge_batch": "judge",
+    "GameMode": "game_logic",
+    "SimpleGameLogic": "game_logic",
+    "GestureStabilizer": "stabilizer",
+    "LandmarkBuffer": "landmarks",
+    "League": "tournament",
+    "ReplayEngine": "replay",
+    "Session": "replay",
+    "RefereePipeline": "pipeline",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
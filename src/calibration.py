@@ -0,0 +1,268 @@
+"""
+Player Calibration - Per-player finger thresholds with a persistent LRU store
+玩家校準：依個人手型學習各指閾值，並以 LRU 檔案快取保存
+
+``ThresholdCalibrator`` collects the per-finger angles a classifier
+reports (``GestureResult.debug_angles`` / ``BatchGestureResult.debug_angles``)
+while a player holds each pose for a few seconds, and places every
+finger's threshold in the gap between its bent and extended angles.
+``CalibrationStore`` keeps the results in a small JSON file keyed by
+player, evicting the least recently used players beyond ``capacity``;
+``get`` is a dict lookup returning precompiled thresholds that can be
+passed straight to ``classify(..., thresholds=...)``.
+
+Usage:
+    calibrator = ThresholdCalibrator()
+    for gesture in CALIBRATION_POSES:           # ~3 s of each pose
+        for result in results_while_holding(gesture):
+            calibrator.add(gesture, result.debug_angles)
+    store = CalibrationStore("calibration.json")
+    store.put("alice", calibrator.thresholds())
+    classifier.classify(points, thresholds=store.get("alice"))
+"""
+import json
+import os
+import warnings
+from collections import OrderedDict
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from .gesture_classifier_v2 import (DEFAULT_FINGER_THRESHOLDS, FINGER_CONFIGS, CompiledThresholds,
+                                    compile_thresholds)
+from .gestures import Gesture
+from .synthetic import GESTURE_FINGER_STATES
+
+# Poses a player holds during calibration (each finger is bent in one, extended in another)
+CALIBRATION_POSES = ("rock", "paper", "scissors")
+# Calibrated thresholds are clipped to this range (degrees)
+THRESHOLD_RANGE = (90.0, 170.0)
+
+_FINGERS = tuple(name for name, _ in FINGER_CONFIGS)
+
+
+class ThresholdCalibrator:
+    """
+    Learn one player's finger thresholds from held poses
+    由玩家擺出的各手勢學習每根手指的伸直閾值
+    """
+
+    def __init__(self, min_frames: int = 30, percentile: float = 10.0):
+        """
+        Args:
+            min_frames: Frames of every pose needed before thresholds() (~1 s at 30 FPS)
+            percentile: Tail trimmed from each side when locating the gap
+                between bent and extended angles (robust to misdetections)
+        """
+        self.min_frames = min_frames
+        self.percentile = percentile
+        self._angles: Dict[str, List[np.ndarray]] = {pose: [] for pose in CALIBRATION_POSES}
+
+    def add(self, gesture: str, angles) -> int:
+        """
+        Record per-finger angles observed while the player holds ``gesture``
+
+        Args:
+            gesture: "rock" | "paper" | "scissors"
+            angles: (5,) or (N, 5) [thumb, index, middle, ring, pinky] angles
+
+        Returns:
+            Frames recorded for this pose so far
+        """
+        if gesture not in self._angles:
+            raise ValueError(f"Unknown calibration pose {gesture!r}; expected one of {CALIBRATION_POSES}")
+        angles = np.asarray(angles, dtype=np.float64).reshape(-1, len(_FINGERS))
+        self._angles[gesture].append(angles)
+        return self.frames(gesture)
+
+    def frames(self, gesture: str) -> int:
+        """Frames recorded for one pose"""
+        return sum(len(block) for block in self._angles[gesture])
+
+    @property
+    def ready(self) -> bool:
+        """Whether every pose has at least min_frames frames"""
+        return all(self.frames(pose) >= self.min_frames for pose in CALIBRATION_POSES)
+
+    def reset(self):
+        for blocks in self._angles.values():
+            blocks.clear()
+
+    def thresholds(self) -> Dict[str, float]:
+        """
+        Per-finger thresholds from the recorded poses
+        計算各指閾值（彎曲與伸直角度分布間隙的中點）
+
+        For each finger, the bent angles (poses where it is folded) and
+        the extended ones are trimmed by ``percentile`` on their facing
+        sides; the threshold is the middle of the gap between them, or the
+        middle of the two medians if they overlap.
+
+        Returns:
+            {finger: threshold} for all five fingers
+
+        Raises:
+            ValueError: If a pose has fewer than min_frames frames
+        """
+        if not self.ready:
+            counts = {pose: self.frames(pose) for pose in CALIBRATION_POSES}
+            raise ValueError(f"Need {self.min_frames} frames of every pose, have {counts}")
+        samples = {pose: np.concatenate(blocks) for pose, blocks in self._angles.items()}
+        thresholds = {}
+        for finger, name in enumerate(_FINGERS):
+            bent = np.concatenate([samples[pose][:, finger] for pose in CALIBRATION_POSES
+                                   if not GESTURE_FINGER_STATES[pose][finger]])
+            extended = np.concatenate([samples[pose][:, finger] for pose in CALIBRATION_POSES
+                                       if GESTURE_FINGER_STATES[pose][finger]])
+            high_bent = np.percentile(bent, 100.0 - self.percentile)
+            low_extended = np.percentile(extended, self.percentile)
+            if high_bent >= low_extended:
+                high_bent, low_extended = np.median(bent), np.median(extended)
+            threshold = (high_bent + low_extended) / 2
+            thresholds[name] = float(np.clip(threshold, *THRESHOLD_RANGE))
+        return thresholds
+
+
+class CalibrationStore:
+    """
+    Small on-disk store of per-player thresholds with LRU eviction
+    玩家閾值檔案快取（最久未使用者優先淘汰）
+
+    The whole file is read once into an ordered dict of precompiled
+    thresholds, so ``get`` is O(1). ``put`` / ``remove`` write the file
+    (temporary file, then rename); recency updates from ``get`` are
+    written with the next change or ``save()`` / ``close()``. An
+    unreadable file is reported and replaced by an empty store.
+    """
+
+    def __init__(self, path: str, capacity: int = 256):
+        """
+        Args:
+            path: JSON file (created on the first put)
+            capacity: Players kept; the least recently used are evicted
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+        self.path = path
+        self.capacity = capacity
+        self.evictions = 0
+        self._entries: "OrderedDict[str, CompiledThresholds]" = OrderedDict()
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for player, thresholds in data["players"]:
+                self._entries[player] = compile_thresholds(thresholds)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self._entries.clear()
+            warnings.warn(f"Calibration store {self.path} unreadable, starting empty: "
+                          f"{type(e).__name__}: {e}")
+            return
+        self._evict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, player: str) -> bool:
+        return player in self._entries
+
+    @property
+    def players(self) -> List[str]:
+        """Stored players, least recently used first"""
+        return list(self._entries)
+
+    def get(self, player: str) -> Optional[CompiledThresholds]:
+        """
+        Thresholds of a returning player (O(1); marks them recently used)
+
+        Returns:
+            CompiledThresholds for classify(..., thresholds=...), or None
+        """
+        thresholds = self._entries.get(player)
+        if thresholds is not None:
+            self._entries.move_to_end(player)
+            self._dirty = True
+        return thresholds
+
+    def put(self, player: str, thresholds: Mapping[str, float]) -> CompiledThresholds:
+        """
+        Store a player's thresholds (unlisted fingers keep the defaults) and save
+
+        Returns:
+            The compiled thresholds
+        """
+        compiled = compile_thresholds({**DEFAULT_FINGER_THRESHOLDS, **thresholds})
+        self._entries[player] = compiled
+        self._entries.move_to_end(player)
+        self._evict()
+        self.save()
+        return compiled
+
+    def remove(self, player: str) -> bool:
+        """Forget a player; returns whether they were stored"""
+        if self._entries.pop(player, None) is None:
+            return False
+        self.save()
+        return True
+
+    def _evict(self):
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def save(self):
+        """Write the store (least recently used first)"""
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"players": [[player, dict(compiled.by_name)]
+                                   for player, compiled in self._entries.items()]},
+                      f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def close(self):
+        """Persist pending recency updates"""
+        if self._dirty:
+            self.save()
+
+    def __enter__(self) -> "CalibrationStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def calibrate_from_session(session, labels: np.ndarray, side: int, classifier=None,
+                           min_frames: int = 30) -> Dict[str, float]:
+    """
+    Calibrate one side's player from a labelled session (offline)
+    由標註的錄影資料校準某一側玩家
+
+    Args:
+        session: replay Session
+        labels: (F, H) Gesture codes per hand slot
+        side: HAND_LEFT or HAND_RIGHT
+        classifier: GestureClassifierV2 providing the angles (its angle mode
+            is the one the thresholds are for); default V2
+        min_frames: Frames of every pose required
+
+    Returns:
+        {finger: threshold}
+    """
+    from .gesture_classifier_v2 import GestureClassifierV2
+
+    classifier = classifier or GestureClassifierV2()
+    labels = np.asarray(labels)
+    present = np.arange(labels.shape[1]) < session.counts[:, None]
+    hands = present & (session.handedness == side)
+    angles = classifier.classify_batch(session.points[hands]).debug_angles
+    codes = labels[hands]
+    calibrator = ThresholdCalibrator(min_frames=min_frames)
+    for pose in CALIBRATION_POSES:
+        calibrator.add(pose, angles[codes == Gesture.parse(pose)])
+    return calibrator.thresholds()
@@ -0,0 +1,275 @@
+"""
+Command Line Interface - ``rps-referee``
+命令列介面
+
+Commands:
+    rps-referee serve SOURCE [SOURCE ...]   headless multi-table referee
+    rps-referee replay SESSION              judge a recorded landmark session
+    rps-referee video VIDEO                 judge a match recording in parallel chunks
+    rps-referee synth OUTPUT                write a synthetic landmark session
+    rps-referee train OUTPUT --data S L     train a gesture model backend
+    rps-referee calibrate PLAYER --data S L store a player's finger thresholds
+"""
+import argparse
+import json
+import sys
+from typing import List, Optional
+
+
+def _cmd_serve(args) -> int:
+    from .server import serve, TableSummary
+
+    failed = 0
+    events = serve(
+        args.sources,
+        workers=args.workers,
+        mirror=not args.no_mirror,
+        model_complexity=args.model_complexity,
+        max_num_hands=args.max_num_hands
+    )
+    for event in events:
+        if isinstance(event, TableSummary):
+            if event.error:
+                failed += 1
+            if args.no_summary:
+                continue
+        print(json.dumps(event.to_dict(), ensure_ascii=False), flush=True)
+    return 1 if failed else 0
+
+
+def _cmd_replay(args) -> int:
+    from .game_logic import RPSStateMachine
+    from .replay import ReplayEngine, Session
+
+    game_logic = None
+    if args.mode == "countdown":
+        game_logic = RPSStateMachine(args.countdown, args.lock_delay, args.lock_duration)
+    result = ReplayEngine(lock_duration=args.lock_duration, game_logic=game_logic).run(
+        Session.load(args.session), space_times=args.space)
+    for event in result.events:
+        print(json.dumps(event.to_dict(), ensure_ascii=False))
+    if not args.no_summary:
+        print(json.dumps(result.to_dict(), ensure_ascii=False))
+    return 0
+
+
+def _cmd_video(args) -> int:
+    from .video_batch import process_video, write_timeline
+
+    result = process_video(
+        args.video,
+        workers=args.workers,
+        chunks=args.chunks,
+        overlap=args.overlap,
+        mirror=not args.no_mirror,
+        model_complexity=args.model_complexity,
+        max_num_hands=args.max_num_hands
+    )
+    fmt = args.format or ("csv" if args.output and args.output.endswith(".csv") else "jsonl")
+    summary = json.dumps(result.to_dict(), ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            write_timeline(result.events, f, fmt)
+    else:
+        write_timeline(result.events, sys.stdout, fmt)
+    if not args.no_summary:
+        # Keep CSV on stdout parseable: the summary goes to stderr there
+        print(summary, file=sys.stderr if fmt == "csv" and not args.output else sys.stdout)
+    return 0
+
+
+def _cmd_synth(args) -> int:
+    import time
+    import numpy as np
+    from .recording import write_recording
+    from .synthetic import Augment, synthesize_session
+
+    begin = time.perf_counter()
+    augment = Augment(noise=args.noise, rotation=args.rotation, scale=tuple(args.scale),
+                      shift=args.shift, occlusion=args.occlusion)
+    session, labels = synthesize_session(args.frames, fps=args.fps, hold=args.hold,
+                                         transition=args.transition, augment=augment,
+                                         seed=args.seed)
+    if args.output.endswith(".npz"):
+        session.save(args.output)
+    else:
+        write_recording(args.output, session)
+    if args.labels:
+        np.save(args.labels, labels)
+    elapsed = time.perf_counter() - begin
+    print(json.dumps({"type": "summary", "output": args.output, "frames": len(session),
+                      "hands": int(session.counts.sum()), "elapsed": round(elapsed, 3)}))
+    return 0
+
+
+def _cmd_train(args) -> int:
+    import numpy as np
+    from .gesture_model import train_gesture_model, training_data
+    from .replay import Session
+
+    points, labels = zip(*(training_data(Session.load(session), np.load(codes))
+                           for session, codes in args.data))
+    model, report = train_gesture_model(
+        np.concatenate(points), np.concatenate(labels),
+        hidden=args.hidden,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+        l2=args.l2,
+        validation=args.validation,
+        seed=args.seed
+    )
+    model.min_confidence = args.min_confidence
+    model.save(args.output)
+    print(json.dumps({**report.to_dict(), "output": args.output}))
+    return 0
+
+
+def _cmd_calibrate(args) -> int:
+    import numpy as np
+    from .calibration import CalibrationStore, calibrate_from_session
+    from .gesture_classifier_v2 import GestureClassifierV2
+    from .landmarks import HAND_LEFT, HAND_RIGHT
+    from .replay import Session
+
+    session, labels = args.data
+    thresholds = calibrate_from_session(
+        Session.load(session), np.load(labels),
+        side=HAND_LEFT if args.side == "left" else HAND_RIGHT,
+        classifier=GestureClassifierV2(angle_mode=args.angle_mode),
+        min_frames=args.min_frames
+    )
+    with CalibrationStore(args.store, capacity=args.capacity) as store:
+        compiled = store.put(args.player, thresholds)
+    print(json.dumps({"type": "calibration", "player": args.player,
+                      "thresholds": dict(compiled.by_name), "players": len(store),
+                      "evictions": store.evictions}, ensure_ascii=False))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="rps-referee",
+        description="Rock-Paper-Scissors Gesture Referee"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser(
+        "serve", help="Referee many video sources on a process pool (JSONL to stdout)"
+    )
+    serve.add_argument("sources", nargs="+",
+                       help="Video file paths, or 'synthetic[:FRAMES]' test tables")
+    serve.add_argument("-w", "--workers", type=int, default=None,
+                       help="Worker processes (default: one per table, up to CPU count)")
+    serve.add_argument("--no-mirror", action="store_true",
+                       help="Do not flip frames (input is already mirrored)")
+    serve.add_argument("--model-complexity", type=int, default=0, choices=[0, 1])
+    serve.add_argument("--max-num-hands", type=int, default=2)
+    serve.add_argument("--no-summary", action="store_true",
+                       help="Only print judgements, not per-table summaries")
+    serve.set_defaults(func=_cmd_serve)
+
+    replay = subparsers.add_parser(
+        "replay", help="Replay a recorded landmark session (JSONL timeline to stdout)"
+    )
+    replay.add_argument("session", help="Session file (.npz, or a landmark recording)")
+    replay.add_argument("--space", type=float, nargs="*", default=[], metavar="SECONDS",
+                        help="Timestamps at which SPACE (lock) is pressed")
+    replay.add_argument("--mode", choices=("live", "countdown"), default="live",
+                        help="Game mode: instant judge with SPACE lock, or 3-2-1 countdown")
+    replay.add_argument("--lock-duration", type=float, default=3.0,
+                        help="Seconds a locked result is shown (reveal duration in countdown mode)")
+    replay.add_argument("--countdown", type=float, default=3.0,
+                        help="Countdown seconds before the lock (countdown mode)")
+    replay.add_argument("--lock-delay", type=float, default=1.0,
+                        help="Seconds between the lock and the reveal (countdown mode)")
+    replay.add_argument("--no-summary", action="store_true",
+                        help="Only print judgements, not the replay summary")
+    replay.set_defaults(func=_cmd_replay)
+
+    video = subparsers.add_parser(
+        "video", help="Referee a video file in parallel chunks (ordered timeline)"
+    )
+    video.add_argument("video", help="Video file (MP4, AVI, ...)")
+    video.add_argument("-o", "--output", default=None,
+                       help="Write the timeline here (.csv or .jsonl; default stdout)")
+    video.add_argument("--format", choices=["jsonl", "csv"], default=None,
+                       help="Timeline format (default: from --output suffix, else jsonl)")
+    video.add_argument("-w", "--workers", type=int, default=None,
+                       help="Worker processes (default: CPU count; 0 = in-process)")
+    video.add_argument("--chunks", type=int, default=None,
+                       help="Frame ranges to split the video into (default: 2 per worker)")
+    video.add_argument("--overlap", type=int, default=15,
+                       help="Frames decoded before each chunk for tracker warm-up and seams")
+    video.add_argument("--no-mirror", action="store_true",
+                       help="Do not flip frames (input is already mirrored)")
+    video.add_argument("--model-complexity", type=int, default=0, choices=[0, 1])
+    video.add_argument("--max-num-hands", type=int, default=2)
+    video.add_argument("--no-summary", action="store_true",
+                       help="Do not print the summary line")
+    video.set_defaults(func=_cmd_video)
+
+    synth = subparsers.add_parser(
+        "synth", help="Write a synthetic two-hand landmark session (camera-free load tests)"
+    )
+    synth.add_argument("output", help="Session file (.npz, otherwise a landmark recording)")
+    synth.add_argument("--frames", type=int, default=108000, help="Frames (default: 1 hour @ 30 FPS)")
+    synth.add_argument("--fps", type=float, default=30.0)
+    synth.add_argument("--hold", type=int, default=15, help="Frames each gesture pair is held")
+    synth.add_argument("--transition", type=int, default=0,
+                       help="Blend frames between gesture pairs")
+    synth.add_argument("--noise", type=float, default=0.0, help="Landmark noise sigma")
+    synth.add_argument("--rotation", type=float, default=0.0, help="Max hand rotation (degrees)")
+    synth.add_argument("--scale", type=float, nargs=2, default=[1.0, 1.0], metavar=("MIN", "MAX"))
+    synth.add_argument("--shift", type=float, default=0.0, help="Max wrist displacement")
+    synth.add_argument("--occlusion", type=float, default=0.0,
+                       help="Probability a held hand has one finger occluded")
+    synth.add_argument("--seed", type=int, default=0)
+    synth.add_argument("--labels", default=None,
+                       help="Also write the (frames, 2) ground-truth Gesture codes as .npy")
+    synth.set_defaults(func=_cmd_synth)
+
+    train = subparsers.add_parser(
+        "train", help="Train a learned gesture backend (.npz) from labelled sessions"
+    )
+    train.add_argument("output", help="Model file (.npz); set GESTURE_MODEL to use it")
+    train.add_argument("--data", nargs=2, action="append", required=True,
+                       metavar=("SESSION", "LABELS"),
+                       help="Session file and its (frames, hands) Gesture codes (.npy); repeatable")
+    train.add_argument("--hidden", type=int, default=32, help="Hidden units (0 = logistic regression)")
+    train.add_argument("--epochs", type=int, default=30)
+    train.add_argument("--batch-size", type=int, default=256)
+    train.add_argument("--learning-rate", type=float, default=0.005)
+    train.add_argument("--l2", type=float, default=1e-4, help="Weight decay")
+    train.add_argument("--validation", type=float, default=0.2,
+                       help="Held-out fraction for calibration and metrics")
+    train.add_argument("--min-confidence", type=float, default=0.0,
+                       help="Report UNKNOWN below this calibrated probability")
+    train.add_argument("--seed", type=int, default=0)
+    train.set_defaults(func=_cmd_train)
+
+    calibrate = subparsers.add_parser(
+        "calibrate", help="Learn a player's finger thresholds from a labelled session"
+    )
+    calibrate.add_argument("player", help="Player name (store key)")
+    calibrate.add_argument("--data", nargs=2, required=True, metavar=("SESSION", "LABELS"),
+                           help="Session of the player holding each pose and its Gesture codes (.npy)")
+    calibrate.add_argument("--side", choices=["left", "right"], default="left",
+                           help="Which hand slot is the player")
+    calibrate.add_argument("--store", default="calibration.json", help="Calibration store (JSON)")
+    calibrate.add_argument("--capacity", type=int, default=256,
+                           help="Players kept before least recently used are evicted")
+    calibrate.add_argument("--angle-mode", choices=["2d", "3d"], default="2d")
+    calibrate.add_argument("--min-frames", type=int, default=30, help="Frames required per pose")
+    calibrate.set_defaults(func=_cmd_calibrate)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""
+Configuration Management for RPS Gesture Referee System
+"""
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Optional
+import yaml
+
+
+@dataclass
+class RPSConfig:
+    """RPS System Configuration"""
+
+    # Gesture Classification Parameters
+    ANGLE_THRESHOLD: float = 130.0  # Finger extension angle threshold
+    FINGER_THRESHOLDS: Dict[str, float] = field(default_factory=lambda: {
+        "thumb": 120.0, "index": 140.0, "middle": 140.0, "ring": 135.0, "pinky": 130.0
+    })  # Per-finger extension thresholds (V2 classifier, hot-reloadable)
+    FUZZY_MATCHING: bool = True  # Allow 1-2 misread fingers (V2 classifier)
+    ANGLE_MODE: str = "2d"  # Joint angles: "2d" (x/y) or "3d" (uses z, tilt-invariant)
+    GESTURE_MODEL: Optional[str] = None  # Trained model (.npz) backend for V2; None = angle rules
+
+    # State Machine Parameters
+    GAME_MODE: str = "live"  # "live" (instant judge, SPACE locks) or "countdown" (3-2-1, then reveal)
+    COUNTDOWN: float = 3.0  # Countdown before the lock in seconds (countdown mode)
+    STABLE_FRAMES: int = 5  # Number of stable frames required (N)
+    MIN_LOCK_STABILITY: float = 0.8  # SPACE locks only if this share of the window agrees (live mode)
+    LOCK_DELAY: float = 1.0  # Lock delay in seconds
+    REVEAL_DURATION: float = 3.0  # Result display duration in seconds
+
+    # MediaPipe Parameters
+    MODEL_COMPLEXITY: int = 0  # 0=fast, 1=accurate
+    MIN_DETECTION_CONFIDENCE: float = 0.7
+    MIN_TRACKING_CONFIDENCE: float = 0.5
+    MAX_NUM_HANDS: int = 2
+
+    # UI Parameters
+    MIRROR_MODE: bool = True  # Mirror mode (flip left-right)
+    SHOW_LANDMARKS: bool = True  # Show skeleton overlay
+    ICON_ALPHA: float = 0.7  # Icon transparency (0-1)
+
+    # Performance Parameters
+    CAMERA_WIDTH: int = 1280
+    CAMERA_HEIGHT: int = 720
+    TARGET_FPS: int = 30
+    ADAPTIVE_PERFORMANCE: bool = False  # Step resolution / model / frame skip to hold TARGET_FPS
+
+    @classmethod
+    def from_yaml(cls, path: str) -> 'RPSConfig':
+        """Load configuration from YAML file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f)
+        return cls(**data)
+
+    def to_yaml(self, path: str):
+        """Save configuration to YAML file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            yaml.dump(asdict(self), f, default_flow_style=False)
+
+
+# Default configuration instance
+DEFAULT_CONFIG = RPSConfig()
@@ -0,0 +1,124 @@
+"""
+Config Watcher - Reload the YAML config while the referee loop runs
+設定檔熱重載：偵測 YAML 變更並套用到執行中的裁判
+
+A background thread polls the file's modification stamp every
+``interval`` seconds. When it changes, the YAML is parsed and validated
+on the watcher thread and the new config is passed to the subscribers
+(e.g. ``RefereePipeline.apply_config``), which compile what they need and
+swap it in. The camera loop never touches the file system or the parser.
+A file that fails to load (e.g. saved half-way) is reported and the
+previous config stays active until the next change. A subscriber that
+rejects a config is reported too; it keeps its previous settings (see
+``GestureClassifierV2.apply_config``) and the watcher keeps running.
+"""
+import os
+import threading
+import warnings
+from typing import Callable, List, Optional, Tuple
+
+
+class ConfigWatcher:
+    """
+    Poll a config file and notify subscribers on change
+    監看設定檔，變更時通知訂閱者
+    """
+
+    def __init__(self, path: str, interval: float = 1.0,
+                 loader: Optional[Callable[[str], object]] = None):
+        """
+        Args:
+            path: YAML config file
+            interval: Seconds between modification checks
+            loader: path -> config (default RPSConfig.from_yaml); must raise
+                on invalid content
+        """
+        if loader is None:
+            from .config import RPSConfig
+            loader = RPSConfig.from_yaml
+        self.path = path
+        self.interval = interval
+        self.loader = loader
+
+        self.config = None
+        self.reloads = 0
+        self.error: Optional[str] = None
+        self._callbacks: List[Callable] = []
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable):
+        """Call ``callback(config)`` after every successful reload"""
+        self._callbacks.append(callback)
+
+    def _read_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Load the file now (initial config); raises if it is invalid"""
+        self._stamp = self._read_stamp()
+        self.config = self.loader(self.path)
+        self.error = None
+        return self.config
+
+    def poll(self):
+        """
+        Reload if the file changed since the last load
+
+        Returns:
+            The new config, or None if unchanged or invalid (see ``error``)
+        """
+        stamp = self._read_stamp()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            config = self.loader(self.path)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            warnings.warn(f"Config reload failed, keeping previous config: {self.error}")
+            return None
+
+        self.config = config
+        self.error = None
+        self.reloads += 1
+        for callback in self._callbacks:
+            try:
+                callback(config)
+            except Exception as e:
+                # 單一訂閱者失敗不可中止監看執行緒，其他訂閱者照常套用
+                warnings.warn(f"Config subscriber {callback!r} rejected the reload: "
+                              f"{type(e).__name__}: {e}")
+        return config
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        """Start polling on a daemon thread"""
+        if self._thread is not None:
+            return
+        if self._stamp is None:
+            self._stamp = self._read_stamp()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch_loop, name="rps-config", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(self.interval, 1.0) + 1.0)
+            self._thread = None
+
+    def __enter__(self) -> "ConfigWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,532 @@
+"""
+Referee Events - asyncio event bus and socket fan-out for judgements
+裁判事件：asyncio 事件匯流排，經 Unix / TCP socket 推送給多個訂閱者
+
+``GameEventTracker`` turns successive game engine states (``update()``)
+into typed events (gesture changed, lock, result, lock expired).
+``EventBus.publish`` is safe to call from the frame loop on any thread:
+it only schedules delivery on the bus's event loop and never waits.
+Each subscriber has a bounded buffer; a subscriber that falls behind has
+its pending gesture / result events coalesced to the latest per key
+(lock events are kept), and the oldest event is dropped past the bound,
+so one slow client never holds back the referee or the other clients.
+``EventServer`` fans the events out as JSON lines over a Unix socket or
+TCP, writing every event pending for a client in one write.
+
+Usage:
+    bus = EventBus()
+    bus.start()                                       # background asyncio loop
+    bus.run(EventServer(bus, path="/tmp/rps.sock").start()).result()
+    pipeline = RefereePipeline.from_config(config, events=bus)
+
+    # Client: socat - UNIX-CONNECT:/tmp/rps.sock, or in Python
+    async for event in connect_events("/tmp/rps.sock"):
+        print(event.type, event.to_dict())
+"""
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+from .game_logic import GameMode
+from .judge import judge_rps
+
+PROTOCOL_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base referee event (``type`` names it on the wire)"""
+    timestamp: float
+
+    type: ClassVar[str] = "event"
+    # Pending events with the same key are coalesced (None: always delivered)
+    key: ClassVar[Optional[str]] = None
+    # Latest event per state key is replayed to new subscribers
+    state_key: ClassVar[str] = "event"
+
+    def to_dict(self) -> Dict:
+        return {"type": self.type, **asdict(self)}
+
+
+@dataclass(frozen=True)
+class GestureEvent(Event):
+    """A side's (stabilized) gesture changed; gesture None = no valid hand"""
+    side: str                  # "left" | "right"
+    gesture: Optional[str]
+
+    type: ClassVar[str] = "gesture"
+
+    @property
+    def key(self) -> str:
+        return f"gesture:{self.side}"
+
+    @property
+    def state_key(self) -> str:
+        return f"gesture:{self.side}"
+
+
+@dataclass(frozen=True)
+class ResultEvent(Event):
+    """New live judgement (both sides show a gesture), or a countdown reveal"""
+    left: str
+    right: str
+    result: str                # "left" | "right" | "draw" | "invalid"
+    message: str
+
+    type: ClassVar[str] = "result"
+    key: ClassVar[str] = "result"
+    state_key: ClassVar[str] = "result"
+
+
+@dataclass(frozen=True)
+class LockEvent(Event):
+    """SPACE (or the end of a countdown) locked the current gestures"""
+    left: str
+    right: str
+    result: str
+    message: str
+    duration: float            # seconds until the lock expires
+
+    type: ClassVar[str] = "lock"
+    state_key: ClassVar[str] = "lock"
+
+
+@dataclass(frozen=True)
+class LockExpiredEvent(Event):
+    """The locked result was released; live judging (or waiting) resumed"""
+
+    type: ClassVar[str] = "lock_expired"
+    state_key: ClassVar[str] = "lock"
+
+
+EVENT_TYPES = {cls.type: cls for cls in (GestureEvent, ResultEvent, LockEvent, LockExpiredEvent)}
+_NO_EVENTS: Tuple[Event, ...] = ()
+# Modes showing a locked / revealed result (leaving them expires the lock)
+_HELD_MODES = (GameMode.LOCKED, GameMode.REVEAL)
+
+
+def decode_event(data: Dict) -> Event:
+    """Event from its to_dict() form (e.g. a parsed JSON line)"""
+    fields = dict(data)
+    cls = EVENT_TYPES.get(fields.pop("type", None))
+    if cls is None:
+        raise ValueError(f"Unknown event type in {data!r}")
+    return cls(**fields)
+
+
+class GameEventTracker:
+    """
+    Derive events from successive game states
+    比對相鄰兩幀的遊戲狀態，產生事件（無變化時不配置記憶體）
+    """
+
+    def __init__(self):
+        self.left: Optional[str] = None
+        self.right: Optional[str] = None
+        self.mode = GameMode.LIVE
+        self._result: Optional[Tuple[str, str]] = None
+
+    def observe(self, timestamp: float, left_gesture: Optional[str], right_gesture: Optional[str],
+                state: Dict) -> Sequence[Event]:
+        """
+        Args:
+            timestamp: Frame timestamp
+            left_gesture / right_gesture: The gestures passed to update()
+            state: The dict update() returned
+
+        Returns:
+            Events for what changed since the previous frame (often none)
+        """
+        events = None
+        if left_gesture != self.left:
+            events = [GestureEvent(timestamp, "left", left_gesture)]
+            self.left = left_gesture
+        if right_gesture != self.right:
+            events = events or []
+            events.append(GestureEvent(timestamp, "right", right_gesture))
+            self.right = right_gesture
+
+        mode = state["mode"]
+        if mode != self.mode:
+            locked = state["locked_gestures"]
+            if mode == GameMode.LOCKED:
+                # Countdown mode judges at the reveal; the locked gestures decide it already
+                outcome = state["locked_result"] or judge_rps(locked["left"], locked["right"])
+                event = LockEvent(timestamp, locked["left"], locked["right"], outcome["result"],
+                                  outcome["message"], state["time_remaining"])
+            elif mode == GameMode.REVEAL:
+                outcome = state["locked_result"]
+                event = ResultEvent(timestamp, locked["left"], locked["right"], outcome["result"],
+                                    outcome["message"])
+            elif self.mode in _HELD_MODES:
+                event = LockExpiredEvent(timestamp)
+            else:
+                event = None                     # waiting <-> counting
+            if event is not None:
+                events = events or []
+                events.append(event)
+            self.mode = mode
+
+        live = state["live_result"]
+        result = (left_gesture, right_gesture) if live is not None else None
+        if result != self._result:
+            if live is not None:
+                events = events or []
+                events.append(ResultEvent(timestamp, left_gesture, right_gesture, live["result"],
+                                          live["message"]))
+            self._result = result
+        return events or _NO_EVENTS
+
+
+class Subscription:
+    """
+    One subscriber's bounded, coalescing event buffer
+    單一訂閱者的有界緩衝區（同鍵事件合併，滿了丟最舊的）
+
+    Use ``async for event in subscription`` or ``await next_batch()``
+    (everything pending at once) on the bus's event loop.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int, coalesce: bool):
+        self.bus = bus
+        self.maxsize = maxsize
+        self.coalesce = coalesce
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.closed = False
+        self._pending: "OrderedDict[object, Event]" = OrderedDict()
+        self._serial = 0
+        self._waiter: Optional[asyncio.Future] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _push(self, event: Event):
+        key = event.key if self.coalesce else None
+        if key is None:
+            self._serial += 1
+            key = self._serial
+        elif key in self._pending:
+            # Keep only the latest, at the position of the newest event
+            del self._pending[key]
+            self.coalesced += 1
+        self._pending[key] = event
+        if len(self._pending) > self.maxsize:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._wake()
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _wait(self):
+        while not self._pending:
+            if self.closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+
+    def get_nowait(self) -> List[Event]:
+        """Take every pending event (oldest first)"""
+        events = list(self._pending.values())
+        self._pending.clear()
+        self.delivered += len(events)
+        return events
+
+    async def next_batch(self) -> List[Event]:
+        """
+        Wait for and take every pending event
+
+        Raises:
+            StopAsyncIteration: The subscription was closed and is drained
+        """
+        await self._wait()
+        return self.get_nowait()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> Event:
+        await self._wait()
+        self.delivered += 1
+        return self._pending.popitem(last=False)[1]
+
+    def close(self):
+        """Stop receiving; pending events can still be read"""
+        if not self.closed:
+            self.closed = True
+            self.bus._unsubscribe(self)
+            self._wake()
+
+
+class EventBus:
+    """
+    Thread-safe publisher with asyncio subscribers
+    事件匯流排：任何執行緒皆可發布，訂閱者在 asyncio 迴圈上接收
+    """
+
+    def __init__(self, maxsize: int = 256):
+        """
+        Args:
+            maxsize: Default pending events kept per subscriber
+        """
+        self.maxsize = maxsize
+        self.published = 0
+        self._subscribers: Tuple[Subscription, ...] = ()
+        self._state: Dict[str, Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    @property
+    def state(self) -> List[Event]:
+        """Latest event per state key (what a new subscriber is sent first)"""
+        return list(self._state.values())
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Deliver on ``loop`` (default: the running loop); call from its thread"""
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+
+    def publish(self, event: Event):
+        """
+        Publish an event (any thread; never blocks)
+
+        From the loop's own thread (or before a loop is attached) the
+        event is delivered immediately, otherwise it is handed to the loop.
+        """
+        loop = self._loop
+        if loop is None or threading.get_ident() == self._loop_thread:
+            self._dispatch(event)
+        else:
+            loop.call_soon_threadsafe(self._dispatch, event)
+
+    def publish_all(self, events: Sequence[Event]):
+        """Publish several events with one loop hand-off"""
+        if not events:
+            return
+        loop = self._loop
+        if loop is None or threading.get_ident() == self._loop_thread:
+            self._dispatch_all(events)
+        else:
+            loop.call_soon_threadsafe(self._dispatch_all, events)
+
+    def _dispatch_all(self, events: Sequence[Event]):
+        for event in events:
+            self._dispatch(event)
+
+    def _dispatch(self, event: Event):
+        self.published += 1
+        self._state[event.state_key] = event
+        for subscription in self._subscribers:
+            subscription._push(event)
+
+    def subscribe(self, maxsize: Optional[int] = None, coalesce: bool = True,
+                  snapshot: bool = False) -> Subscription:
+        """
+        Add a subscriber (call on the bus's loop)
+
+        Args:
+            maxsize: Pending events kept (default: the bus's maxsize)
+            coalesce: Merge pending gesture / result events per key
+            snapshot: Start with the latest state (gestures, result, lock)
+        """
+        subscription = Subscription(self, maxsize or self.maxsize, coalesce)
+        if snapshot:
+            for event in self._state.values():
+                subscription._push(event)
+        self._subscribers = self._subscribers + (subscription,)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        self._subscribers = tuple(s for s in self._subscribers if s is not subscription)
+
+    # ------------------------------------------------------------------
+    # Background loop (for synchronous callers such as RefereePipeline)
+    # ------------------------------------------------------------------
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Run a private event loop on a daemon thread and attach to it"""
+        if self._thread is not None:
+            return self._loop
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            self.attach(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="rps-events", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return loop
+
+    def run(self, coroutine):
+        """Schedule a coroutine on the background loop (concurrent.futures.Future)"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def stop(self):
+        """Close subscriptions and stop the background loop"""
+        if self._thread is None:
+            return
+        loop = self._loop
+
+        def shutdown():
+            for subscription in self._subscribers:
+                subscription.close()
+            loop.stop()
+
+        loop.call_soon_threadsafe(shutdown)
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        self._loop = self._loop_thread = None
+        loop.close()
+
+    def __enter__(self) -> "EventBus":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def encode_event(event: Event) -> bytes:
+    """One JSON line (UTF-8)"""
+    return (json.dumps(event.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class EventServer:
+    """
+    Fan bus events out to socket clients as JSON lines
+    以 JSON Lines 將事件推送給 Unix / TCP socket 用戶端
+
+    Every client gets a hello line, the current state, then live events.
+    Each client has its own Subscription and writer: a client that reads
+    slowly is held back by ``drain()`` while its subscription coalesces,
+    and everything pending for it goes out in one write when it catches up.
+    """
+
+    def __init__(self, bus: EventBus, path: Optional[str] = None,
+                 host: str = "127.0.0.1", port: Optional[int] = None,
+                 buffer: int = 64, coalesce: bool = True):
+        """
+        Args:
+            bus: EventBus (the server runs on the bus's loop)
+            path: Unix socket path; None serves TCP on host:port
+            host: TCP interface (local only by default)
+            port: TCP port (0 / None picks a free one; see ``address``)
+            buffer: Pending events kept per client
+            coalesce: Merge a lagging client's pending gesture / result events
+        """
+        self.bus = bus
+        self.path = path
+        self.host = host
+        self.port = port
+        self.buffer = buffer
+        self.coalesce = coalesce
+        self.address = None
+        self.connected = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clients: Dict[asyncio.Task, Subscription] = {}
+
+    @property
+    def clients(self) -> int:
+        return len(self._clients)
+
+    async def start(self) -> "EventServer":
+        """Listen (on the running loop, which the bus is attached to if it is not yet)"""
+        if self.bus.loop is None:
+            self.bus.attach()
+        if self.path is not None:
+            if os.path.exists(self.path):
+                os.unlink(self.path)   # stale socket from a previous run
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+            self.address = self.path
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port or 0)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscription = self.bus.subscribe(self.buffer, self.coalesce, snapshot=True)
+        task = asyncio.current_task()
+        self._clients[task] = subscription
+        self.connected += 1
+        # Clients only listen: EOF from them ends the subscription
+        watcher = asyncio.ensure_future(self._watch_eof(reader, subscription))
+        try:
+            writer.write((json.dumps({"type": "hello", "version": PROTOCOL_VERSION}) + "\n").encode())
+            while True:
+                events = await subscription.next_batch()
+                writer.write(b"".join(encode_event(event) for event in events))
+                await writer.drain()
+        except (StopAsyncIteration, ConnectionError):
+            pass
+        finally:
+            subscription.close()
+            watcher.cancel()
+            self._clients.pop(task, None)
+            writer.close()
+
+    @staticmethod
+    async def _watch_eof(reader: asyncio.StreamReader, subscription: Subscription):
+        try:
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        subscription.close()
+
+    async def close(self):
+        """Stop listening and disconnect every client"""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        for subscription in list(self._clients.values()):
+            subscription.close()
+        if self._clients:
+            await asyncio.gather(*self._clients, return_exceptions=True)
+        if server is not None:
+            await server.wait_closed()
+        if self.path is not None and os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+async def connect_events(path: Optional[str] = None, host: str = "127.0.0.1",
+                         port: Optional[int] = None) -> AsyncIterator[Event]:
+    """
+    Subscribe to an EventServer from Python
+    連線到 EventServer，逐一產生事件
+
+    Args:
+        path: Unix socket path, or None for TCP host:port
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        async for line in reader:
+            data = json.loads(line)
+            if data.get("type") == "hello":
+                continue
+            yield decode_event(data)
+    finally:
+        writer.close()
@@ -0,0 +1,424 @@
+"""
+Game Logic - Clock-injected referee state machines
+遊戲狀態機：可注入時鐘，支援即時鎖定與倒數揭曉兩種模式
+
+Extracted from the notebooks: ``SimpleGameLogic`` is V3's instant-judge
+mode with an optional SPACE lock, ``RPSStateMachine`` the original demo's
+3-2-1 countdown (waiting → counting → locked → reveal). Both read time
+only through an injected clock and share one API:
+
+- ``tick(now, left, right, space_pressed, stability)``: one frame at an
+  explicit time (deterministic; what tests and replays use). Gestures are
+  Gesture codes (the live loop passes ``GestureResult.code`` and judging
+  is one ``judge`` table lookup) or labels; UNKNOWN / None = no gesture
+- ``update(left, right, ...)``: ``tick`` at ``clock()`` (the live loop)
+- ``run(timestamps, left_codes, right_codes, space)``: a whole recorded
+  session in NumPy. Transitions are located with ``searchsorted`` per
+  round instead of stepped frame by frame, so replays process millions of
+  ticks per second, with the same results as calling ``tick`` per frame.
+
+``GameEngine.from_config`` picks the mode from ``RPSConfig.GAME_MODE``.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+
+from .gestures import GESTURE_LABELS, Gesture
+from .judge import RESULT_TABLE, judge
+
+
+class GameMode(Enum):
+    LIVE = "live"            # 即時模式：持續顯示手勢和結果
+    LOCKED = "locked"        # 鎖定模式：顯示鎖定的結果 / 倒數後鎖定手勢
+    WAITING = "waiting"      # 倒數模式：等待雙手
+    COUNTING = "counting"    # 倒數中 (3, 2, 1)
+    REVEAL = "reveal"        # 顯示結果
+
+
+GestureLike = Union[Gesture, int, str]
+
+# GameTimeline.modes codes (index into GAME_MODES)
+GAME_MODES = tuple(GameMode)
+MODE_CODES = {mode: code for code, mode in enumerate(GAME_MODES)}
+_LIVE, _LOCKED, _WAITING, _COUNTING, _REVEAL = (MODE_CODES[mode] for mode in GAME_MODES)
+
+
+# Label (or None) -> code for callers passing strings; codes pass through
+_LABEL_CODES = {label: Gesture(code) for code, label in enumerate(GESTURE_LABELS)}
+_LABEL_CODES[None] = Gesture.UNKNOWN
+# Code -> label shown in state["locked_gestures"] (None = no gesture)
+_SHOWN = (None,) + GESTURE_LABELS[1:]
+
+
+def _as_code(gesture) -> Gesture:
+    """Gesture code of a code, label or None (unknown labels → UNKNOWN)"""
+    if gesture is None or isinstance(gesture, str):
+        return _LABEL_CODES.get(gesture, Gesture.UNKNOWN)
+    return gesture
+
+
+class SystemClock:
+    """Monotonic wall clock in seconds (default for live play)"""
+
+    def __call__(self) -> float:
+        return time.monotonic()
+
+
+class ReplayClock:
+    """
+    Manually advanced clock for injection into game logic
+    重播時鐘：時間由記錄的時間戳決定，而非系統時間
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        self.now += seconds
+        return self.now
+
+
+@dataclass
+class GameTimeline:
+    """
+    Per-frame states of a replayed session (GameEngine.run)
+    重播場次的逐幀狀態
+    """
+    modes: np.ndarray    # (F,) int8 - index into GAME_MODES
+    left: np.ndarray     # (F,) int8 - Gesture codes of the displayed judgement, 0 = none
+    right: np.ndarray    # (F,) int8
+
+    def __len__(self) -> int:
+        return len(self.modes)
+
+    @property
+    def results(self) -> np.ndarray:
+        """(F,) Result codes of the displayed judgement (INVALID where none)"""
+        return RESULT_TABLE[self.left, self.right]
+
+
+def _elapsed_index(timestamps: np.ndarray, start: int, duration: float) -> int:
+    """
+    First frame after ``start`` where ``t - t[start] >= duration`` (len if none)
+
+    Compares exactly what tick() computes, so float rounding cannot make
+    the batch path and the per-frame path disagree on a boundary frame.
+    """
+    begin = timestamps[start]
+    end = len(timestamps)
+    index = max(int(np.searchsorted(timestamps, begin + duration)), start + 1)
+    while index > start + 1 and timestamps[index - 1] - begin >= duration:
+        index -= 1
+    while index < end and not timestamps[index] - begin >= duration:
+        index += 1
+    return index
+
+
+class GameEngine(ABC):
+    """
+    Referee state machine base: clock and the shared tick API
+    裁判狀態機基底：時鐘注入與共用的 tick 介面
+
+    Subclasses implement ``tick`` (one frame) and ``_run`` (a validated
+    recorded session) and register in GAME_ENGINES for ``from_config``.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            clock: Time source in seconds (default SystemClock); inject a
+                ReplayClock to run recorded sessions faster than real time
+        """
+        self.clock = clock or SystemClock()
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config, clock: Optional[Callable[[], float]] = None) -> "GameEngine":
+        """
+        Engine for ``config.GAME_MODE`` ("live" | "countdown")
+
+        Raises:
+            ValueError: Unknown GAME_MODE
+        """
+        name = getattr(config, "GAME_MODE", "live")
+        engine = GAME_ENGINES.get(name)
+        if engine is None:
+            raise ValueError(f"Unknown GAME_MODE {name!r}; expected one of {sorted(GAME_ENGINES)}")
+        return engine.from_config(config, clock)
+
+    def reset(self):
+        """Back to the initial state"""
+
+    def update(self, left_gesture: Optional[GestureLike], right_gesture: Optional[GestureLike],
+               space_pressed: bool = False, stability: float = 1.0) -> Dict:
+        """tick() at the clock's current time"""
+        return self.tick(self.clock(), left_gesture, right_gesture, space_pressed, stability)
+
+    @abstractmethod
+    def tick(self, now: float, left_gesture: Optional[GestureLike], right_gesture: Optional[GestureLike],
+             space_pressed: bool = False, stability: float = 1.0) -> Dict:
+        """
+        Advance one frame
+
+        Args:
+            now: Frame time in seconds (non-decreasing)
+            left_gesture: Left player's Gesture code or label; UNKNOWN / None
+                = no gesture
+            right_gesture: Right player's gesture, likewise
+            space_pressed: SPACE this frame
+            stability: Lower stability of the two gestures (0-1)
+
+        Returns:
+            {"mode", "live_result", "locked_result", "locked_gestures",
+             "time_remaining", ...}
+        """
+
+    def run(self, timestamps, left, right, space=None, stability=None) -> GameTimeline:
+        """
+        Replay a session from the initial state (the engine's own state is untouched)
+
+        Args:
+            timestamps: (F,) non-decreasing seconds
+            left / right: (F,) Gesture codes, 0 (UNKNOWN) = no gesture
+            space: (F,) bool SPACE presses (None = never)
+            stability: (F,) gesture stability (None = always 1.0)
+
+        Returns:
+            GameTimeline equal to calling tick() on every frame
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        left = np.asarray(left, dtype=np.int8)
+        right = np.asarray(right, dtype=np.int8)
+        if not (len(timestamps) == len(left) == len(right)):
+            raise ValueError(f"Length mismatch: {len(timestamps)} timestamps, "
+                             f"{len(left)} left, {len(right)} right")
+        if len(timestamps) > 1 and (np.diff(timestamps) < 0).any():
+            raise ValueError("timestamps must be non-decreasing")
+        space = np.zeros(len(timestamps), dtype=bool) if space is None else np.asarray(space, dtype=bool)
+        return self._run(timestamps, left, right, space, stability)
+
+    @abstractmethod
+    def _run(self, timestamps, left, right, space, stability) -> GameTimeline:
+        """
+        run() after validation: float64 timestamps, int8 codes, bool space
+
+        Returns:
+            GameTimeline equal to calling tick() on every frame
+        """
+
+
+class SimpleGameLogic(GameEngine):
+    """Simplified game logic without countdown"""
+
+    def __init__(self, lock_duration: float = 3.0,
+                 clock: Optional[Callable[[], float]] = None,
+                 min_lock_stability: float = 0.0):
+        """
+        Args:
+            lock_duration: Seconds a SPACE-locked result stays on screen
+            clock: Time source in seconds (default SystemClock); inject a
+                replay clock to run recorded sessions faster than real time
+            min_lock_stability: SPACE only locks when the gestures'
+                stability (see GestureStabilizer) is at least this value
+        """
+        self.lock_duration = lock_duration
+        self.min_lock_stability = min_lock_stability
+        super().__init__(clock)
+
+    @classmethod
+    def from_config(cls, config, clock: Optional[Callable[[], float]] = None) -> "SimpleGameLogic":
+        """Locked results are held for REVEAL_DURATION; SPACE needs MIN_LOCK_STABILITY"""
+        return cls(lock_duration=config.REVEAL_DURATION, clock=clock,
+                   min_lock_stability=config.MIN_LOCK_STABILITY)
+
+    def reset(self):
+        self.mode = GameMode.LIVE
+        self.lock_time = 0
+        self.locked_result = None
+        self.locked_gestures = {"left": None, "right": None}
+
+    def tick(self, now: float, left_gesture: Optional[GestureLike], right_gesture: Optional[GestureLike],
+             space_pressed: bool = False, stability: float = 1.0) -> Dict:
+        left, right = _as_code(left_gesture), _as_code(right_gesture)
+
+        # Check if lock expired
+        if self.mode == GameMode.LOCKED:
+            if now - self.lock_time >= self.lock_duration:
+                self.mode = GameMode.LIVE
+                self.locked_result = None
+                self.locked_gestures = {"left": None, "right": None}
+
+        # Space key pressed - lock current state
+        if space_pressed and self.mode == GameMode.LIVE:
+            if left and right and stability >= self.min_lock_stability:
+                self.mode = GameMode.LOCKED
+                self.lock_time = now
+                self.locked_gestures = {"left": _SHOWN[left], "right": _SHOWN[right]}
+                self.locked_result = judge(left, right)
+
+        # Live mode - calculate result instantly
+        live_result = None
+        if self.mode == GameMode.LIVE and left and right:
+            live_result = judge(left, right)
+
+        return {
+            "mode": self.mode,
+            "live_result": live_result,
+            "locked_result": self.locked_result,
+            "locked_gestures": self.locked_gestures,
+            "time_remaining": max(0, self.lock_duration - (now - self.lock_time)) if self.mode == GameMode.LOCKED else 0
+        }
+
+    def _run(self, timestamps, left, right, space, stability) -> GameTimeline:
+        both = (left > 0) & (right > 0)
+        modes = np.full(len(timestamps), _LIVE, dtype=np.int8)
+        shown_left = np.where(both, left, 0).astype(np.int8)
+        shown_right = np.where(both, right, 0).astype(np.int8)
+
+        presses = space & both
+        if stability is not None:
+            presses &= np.asarray(stability) >= self.min_lock_stability
+        presses = np.flatnonzero(presses)
+        # One iteration per lock: presses while locked are skipped by searchsorted
+        position = 0
+        while position < len(presses):
+            start = int(presses[position])
+            end = _elapsed_index(timestamps, start, self.lock_duration)
+            modes[start:end] = _LOCKED
+            shown_left[start:end] = left[start]
+            shown_right[start:end] = right[start]
+            position = int(np.searchsorted(presses, end))
+        return GameTimeline(modes, shown_left, shown_right)
+
+
+class RPSStateMachine(GameEngine):
+    """
+    Original demo's countdown mode: both hands start a countdown, the
+    gestures shown when it ends are locked, judged after lock_delay and
+    revealed for reveal_duration
+    倒數模式：雙手出現即倒數，倒數結束鎖定手勢，延遲後揭曉結果
+    """
+
+    def __init__(self, countdown: float = 3.0, lock_delay: float = 1.0,
+                 reveal_duration: float = 3.0, clock: Optional[Callable[[], float]] = None):
+        """
+        Args:
+            countdown: Seconds both hands must stay up before the lock
+                (a hand dropping restarts from waiting)
+            lock_delay: Seconds between the lock and the reveal
+            reveal_duration: Seconds the result stays on screen
+            clock: Time source in seconds (default SystemClock)
+        """
+        self.countdown_duration = countdown
+        self.lock_delay = lock_delay
+        self.reveal_duration = reveal_duration
+        super().__init__(clock)
+
+    @classmethod
+    def from_config(cls, config, clock: Optional[Callable[[], float]] = None) -> "RPSStateMachine":
+        """COUNTDOWN, LOCK_DELAY and REVEAL_DURATION from the config"""
+        return cls(countdown=config.COUNTDOWN, lock_delay=config.LOCK_DELAY,
+                   reveal_duration=config.REVEAL_DURATION, clock=clock)
+
+    def reset(self):
+        self.mode = GameMode.WAITING
+        self.countdown = 0
+        self.phase_start = 0
+        self.locked_result = None
+        self.locked_codes = (Gesture.UNKNOWN, Gesture.UNKNOWN)
+        self.locked_gestures = {"left": None, "right": None}
+
+    def tick(self, now: float, left_gesture: Optional[GestureLike], right_gesture: Optional[GestureLike],
+             space_pressed: bool = False, stability: float = 1.0) -> Dict:
+        left, right = _as_code(left_gesture), _as_code(right_gesture)
+        mode = self.mode
+        if mode == GameMode.WAITING:
+            if left and right:
+                self.mode = GameMode.COUNTING
+                self.phase_start = now
+
+        elif mode == GameMode.COUNTING:
+            if not (left and right):
+                self.mode = GameMode.WAITING
+            elif now - self.phase_start >= self.countdown_duration:
+                self.mode = GameMode.LOCKED
+                self.phase_start = now
+                self.locked_codes = (left, right)
+                self.locked_gestures = {"left": _SHOWN[left], "right": _SHOWN[right]}
+
+        elif mode == GameMode.LOCKED:
+            if now - self.phase_start >= self.lock_delay:
+                self.locked_result = judge(*self.locked_codes)
+                self.mode = GameMode.REVEAL
+                self.phase_start = now
+
+        elif now - self.phase_start >= self.reveal_duration:   # REVEAL
+            self.mode = GameMode.WAITING
+            self.locked_result = None
+            self.locked_codes = (Gesture.UNKNOWN, Gesture.UNKNOWN)
+            self.locked_gestures = {"left": None, "right": None}
+
+        mode = self.mode
+        remaining = 0
+        self.countdown = 0
+        if mode == GameMode.COUNTING:
+            remaining = max(0, self.countdown_duration - (now - self.phase_start))
+            self.countdown = math.ceil(remaining)
+        elif mode == GameMode.LOCKED:
+            remaining = max(0, self.lock_delay - (now - self.phase_start))
+        elif mode == GameMode.REVEAL:
+            remaining = max(0, self.reveal_duration - (now - self.phase_start))
+        return {
+            "mode": self.mode,
+            "live_result": None,
+            "locked_result": self.locked_result,
+            "locked_gestures": self.locked_gestures,
+            "time_remaining": remaining,
+            "countdown": self.countdown
+        }
+
+    def _run(self, timestamps, left, right, space, stability) -> GameTimeline:
+        frames = len(timestamps)
+        both = (left > 0) & (right > 0)
+        up, down = np.flatnonzero(both), np.flatnonzero(~both)
+        modes = np.full(frames, _WAITING, dtype=np.int8)
+        shown_left = np.zeros(frames, dtype=np.int8)
+        shown_right = np.zeros(frames, dtype=np.int8)
+
+        # One iteration per round (or per interrupted countdown)
+        index = 0
+        while True:
+            position = int(np.searchsorted(up, index))
+            if position == len(up):
+                break
+            start = int(up[position])                          # waiting → counting
+            position = int(np.searchsorted(down, start + 1))
+            dropped = int(down[position]) if position < len(down) else frames
+            locked = _elapsed_index(timestamps, start, self.countdown_duration)
+            if dropped <= locked:
+                modes[start:dropped] = _COUNTING               # a hand dropped: back to waiting
+                index = dropped + 1
+                continue
+            modes[start:locked] = _COUNTING
+            revealed = _elapsed_index(timestamps, locked, self.lock_delay)
+            modes[locked:revealed] = _LOCKED
+            if revealed >= frames:
+                break
+            waiting = _elapsed_index(timestamps, revealed, self.reveal_duration)
+            modes[revealed:waiting] = _REVEAL
+            shown_left[revealed:waiting] = left[locked]
+            shown_right[revealed:waiting] = right[locked]
+            index = waiting + 1
+        return GameTimeline(modes, shown_left, shown_right)
+
+
+# GAME_MODE -> engine
+GAME_ENGINES = {"live": SimpleGameLogic, "countdown": RPSStateMachine}
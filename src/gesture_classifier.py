@@ -6,6 +6,21 @@ import math
 from dataclasses import dataclass
 from typing import List
 
+import numpy as np
+
+from .landmarks import joint_angles, joint_angles_3d
+
+
+# Define finger joint indices for angle calculation
+# Format: (joint_before, joint_middle, joint_after)
+FINGER_JOINTS = [
+    (1, 2, 3),   # Thumb: CMC-MCP-IP
+    (5, 6, 7),   # Index: MCP-PIP-DIP
+    (9, 10, 11), # Middle: MCP-PIP-DIP
+    (13, 14, 15),# Ring: MCP-PIP-DIP
+    (17, 18, 19) # Pinky: MCP-PIP-DIP
+]
+
 
 @dataclass
 class GestureResult:
@@ -24,14 +39,19 @@ class GestureClassifier:
     - Angle ≤ threshold → finger folded (0)
     """
 
-    def __init__(self, angle_threshold: float = 130.0):
+    def __init__(self, angle_threshold: float = 130.0, angle_mode: str = "2d"):
         """
         Initialize classifier
 
         Args:
             angle_threshold: Angle threshold for finger extension detection (degrees)
+            angle_mode: "2d" (x/y atan2) or "3d" (x/y/z dot product, robust
+                to hands tilted toward the camera)
         """
+        if angle_mode not in ("2d", "3d"):
+            raise ValueError(f"Unknown angle mode {angle_mode!r}; expected '2d' or '3d'")
         self.angle_threshold = angle_threshold
+        self.angle_mode = angle_mode
 
     def _calculate_angle(self, p1, p2, p3) -> float:
         """
@@ -78,25 +98,28 @@ class GestureClassifier:
         - Others: angle at PIP joint
 
         Args:
-            landmarks: List of 21 MediaPipe landmarks
+            landmarks: List of 21 MediaPipe landmarks, or a (21, 3) array
+                such as a LandmarkBuffer slot
 
         Returns:
             List of 5 integers [thumb, index, middle, ring, pinky]
             Each value is 0 (folded) or 1 (extended)
         """
+        if self.angle_mode == "3d":
+            return [
+                1 if angle > self.angle_threshold else 0
+                for angle in joint_angles_3d(landmarks, FINGER_JOINTS)
+            ]
+
+        if isinstance(landmarks, np.ndarray):
+            return [
+                1 if angle > self.angle_threshold else 0
+                for angle in joint_angles(landmarks, FINGER_JOINTS)
+            ]
+
         finger_states = []
 
-        # Define finger joint indices for angle calculation
-        # Format: (joint_before, joint_middle, joint_after)
-        finger_joints = [
-            (1, 2, 3),   # Thumb: CMC-MCP-IP
-            (5, 6, 7),   # Index: MCP-PIP-DIP
-            (9, 10, 11), # Middle: MCP-PIP-DIP
-            (13, 14, 15),# Ring: MCP-PIP-DIP
-            (17, 18, 19) # Pinky: MCP-PIP-DIP
-        ]
-
-        for j1, j2, j3 in finger_joints:
+        for j1, j2, j3 in FINGER_JOINTS:
             angle = self._calculate_angle(
                 landmarks[j1],
                 landmarks[j2],
@@ -143,7 +166,7 @@ class GestureClassifier:
         Classify hand gesture from landmarks
 
         Args:
-            landmarks: List of 21 MediaPipe hand landmarks
+            landmarks: List of 21 MediaPipe hand landmarks or a (21, 3) array
 
         Returns:
             GestureResult with gesture name, finger states, and confidence
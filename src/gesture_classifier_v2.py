@@ -9,22 +9,345 @@ Key Improvements:
 4. 視覺調試模式（顯示角度值）
 """
 import math
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Mapping, NamedTuple, Tuple, Optional, Sequence
+
+import numpy as np
+
+from .gestures import Gesture, GESTURE_LABELS
+from .landmarks import AngleKernel, copy_landmarks, joint_angles, joint_angles_3d
+
+
+# 每根手指的關節三元組 (j1, j2, j3)，角度取在 j2
+FINGER_CONFIGS: List[Tuple[str, List[Tuple[int, int, int]]]] = [
+    ("thumb", [(1, 2, 3), (2, 3, 4)]),        # 大拇指：兩個關節
+    ("index", [(5, 6, 7), (6, 7, 8)]),        # 食指：兩個關節
+    ("middle", [(9, 10, 11), (10, 11, 12)]),  # 中指：兩個關節
+    ("ring", [(13, 14, 15), (14, 15, 16)]),   # 無名指：兩個關節
+    ("pinky", [(17, 18, 19), (18, 19, 20)])   # 小指：兩個關節
+]
+
+# Flattened joint indices for the vectorized batch path (10 joints, 2 per finger)
+_BATCH_JOINTS = np.array(
+    [joint for _, joints in FINGER_CONFIGS for joint in joints], dtype=np.intp
+)
+_ALL_JOINTS = [tuple(joint) for joint in _BATCH_JOINTS.tolist()]
+# Column indices into a flattened (N, 21 * 3) landmark array, gathered in one take:
+# [x1..., y1..., x2..., y2..., x3..., y3...]
+_BATCH_COLUMNS = np.concatenate(
+    [3 * _BATCH_JOINTS[:, k] + axis for k in range(3) for axis in (0, 1)]
+)
+
+# "2d": x/y atan2 angles (original); "3d": x/y/z dot-product angles (tilt-invariant)
+ANGLE_MODES = ("2d", "3d")
+# 3D batch path over the same 10 joints
+_ANGLE_KERNEL = AngleKernel(_ALL_JOINTS)
+
+# Gesture codes used by the batch path: index into GESTURE_NAMES (Gesture values)
+GESTURE_NAMES = np.array(GESTURE_LABELS)
+_GESTURE_CODES = {name: code for code, name in enumerate(GESTURE_NAMES.tolist())}
+_GESTURES = tuple(Gesture)   # code -> Gesture without the enum lookup
+
+# Bit weight of each finger when packing [thumb, index, middle, ring, pinky]
+_FINGER_BITS = np.array([1, 2, 4, 8, 16], dtype=np.uint8)
+
+
+def pack_finger_states(finger_states: List[int]) -> int:
+    """
+    Pack 5 binary finger states into a 0-31 bitmask (thumb = bit 0)
+    將 5 根手指狀態壓縮為 0-31 的位元遮罩
+    """
+    thumb, index, middle, ring, pinky = finger_states
+    return thumb | index << 1 | middle << 2 | ring << 3 | pinky << 4
+
+
+def pack_finger_states_batch(finger_states: np.ndarray) -> np.ndarray:
+    """Pack (N, 5) binary finger states into (N,) bitmasks"""
+    return finger_states.astype(np.uint8) @ _FINGER_BITS
+
+
+def _match_rules(finger_states: List[int], use_fuzzy_matching: bool) -> str:
+    """
+    Reference rule cascade used to compile the gesture table
+    手勢規則（僅在建表時執行，每種設定 32 次）
+    """
+    # 精確匹配模式
+    exact_patterns = {
+        "rock": [0, 0, 0, 0, 0],
+        "paper": [1, 1, 1, 1, 1],
+        "scissors": [0, 1, 1, 0, 0]
+    }
+
+    # 先嘗試精確匹配
+    for gesture_name, pattern in exact_patterns.items():
+        if finger_states == pattern:
+            return gesture_name
+
+    if not use_fuzzy_matching:
+        return "unknown"
+
+    # 模糊匹配規則
+    def hamming_distance(a, b):
+        """計算兩個列表的差異數量"""
+        return sum(1 for x, y in zip(a, b) if x != y)
+
+    # Rock 模糊匹配：允許大拇指或小指誤判
+    rock_variants = [
+        [0, 0, 0, 0, 0],  # 標準
+        [1, 0, 0, 0, 0],  # 大拇指微開
+        [0, 0, 0, 0, 1],  # 小指微開
+    ]
+    for variant in rock_variants:
+        if hamming_distance(finger_states, variant) <= 1:
+            return "rock"
+
+    # Paper 模糊匹配：允許1根手指未完全伸直
+    if sum(finger_states) >= 4:  # 至少4根手指伸直
+        return "paper"
+
+    # Scissors 模糊匹配：食指+中指必須伸直，其他可有1根誤判
+    if finger_states[1] == 1 and finger_states[2] == 1:  # 食指+中指伸直
+        other_fingers = [finger_states[0], finger_states[3], finger_states[4]]
+        if sum(other_fingers) <= 1:  # 其他手指最多1根伸直
+            return "scissors"
+
+    return "unknown"
+
+
+@dataclass(frozen=True)
+class GestureTable:
+    """
+    Precompiled 32-entry gesture lookup table keyed by packed finger bitmask
+    預先編譯的 32 格手勢查找表（以手指位元遮罩為索引）
+    """
+    gestures: Tuple[str, ...]       # scalar path: gestures[mask]
+    gesture_codes: Tuple[Gesture, ...]  # scalar path: gesture_codes[mask]
+    confidences: Tuple[float, ...]  # scalar path: confidences[mask]
+    codes: np.ndarray               # batch path: (32,) codes into GESTURE_NAMES
+    confidence_array: np.ndarray    # batch path: (32,) float64
+
+
+@lru_cache(maxsize=None)
+def build_gesture_table(use_fuzzy_matching: bool) -> GestureTable:
+    """
+    Compile the gesture table for one matching mode (cached per mode)
+    為指定匹配模式建立查找表（每種模式只建一次）
+    """
+    # 模糊匹配的confidence較低，精確匹配較高
+    matched_confidence = 0.85 if use_fuzzy_matching else 1.0
+
+    gestures = []
+    confidences = []
+    for mask in range(32):
+        finger_states = [(mask >> bit) & 1 for bit in range(5)]
+        gesture = _match_rules(finger_states, use_fuzzy_matching)
+        gestures.append(gesture)
+        confidences.append(0.5 if gesture == "unknown" else matched_confidence)
+
+    codes = np.array([_GESTURE_CODES[g] for g in gestures], dtype=np.int8)
+    confidence_array = np.array(confidences, dtype=np.float64)
+    codes.flags.writeable = False
+    confidence_array.flags.writeable = False
+
+    return GestureTable(
+        gestures=tuple(gestures),
+        gesture_codes=tuple(Gesture(code) for code in codes.tolist()),
+        confidences=tuple(confidences),
+        codes=codes,
+        confidence_array=confidence_array
+    )
+
+
+# 針對不同手指設定不同閾值（更符合實際）
+DEFAULT_FINGER_THRESHOLDS: Mapping[str, float] = MappingProxyType({
+    "thumb": 120.0,   # 大拇指較難伸直，降低閾值
+    "index": 140.0,   # 食指標準閾值
+    "middle": 140.0,  # 中指標準閾值
+    "ring": 135.0,    # 無名指較難獨立控制，降低閾值
+    "pinky": 130.0    # 小指最難控制，最低閾值
+})
+
+
+class CompiledThresholds(NamedTuple):
+    """Per-finger thresholds, compiled once per change (FINGER_CONFIGS order)"""
+    by_name: Mapping[str, float]   # read-only view
+    vector: np.ndarray             # (5,) float64, read-only (batch path)
+    values: Tuple[float, ...]      # the same values as floats (single-hand path)
+
+
+def compile_thresholds(thresholds: Mapping[str, float]) -> CompiledThresholds:
+    """
+    Validate per-finger thresholds and precompute their vector forms
+    驗證各指閾值並預先編譯為向量
+
+    Raises:
+        ValueError: If a finger is missing or unknown
+    """
+    names = [name for name, _ in FINGER_CONFIGS]
+    unknown = set(thresholds) - set(names)
+    missing = set(names) - set(thresholds)
+    if unknown or missing:
+        raise ValueError(f"Bad finger thresholds: unknown {sorted(unknown)}, missing {sorted(missing)}")
+    values = tuple(float(thresholds[name]) for name in names)
+    vector = np.array(values, dtype=np.float64)
+    vector.flags.writeable = False
+    return CompiledThresholds(MappingProxyType(dict(zip(names, values))), vector, values)
+
+
+# Shared, immutable per-result constants
+FINGER_NAMES = ("拇指", "食指", "中指", "無名指", "小指")
+# Finger-state tuple of every 5-bit mask (thumb = bit 0)
+_MASK_STATES = tuple(tuple((mask >> bit) & 1 for bit in range(5)) for mask in range(32))
 
 
-@dataclass
 class GestureResult:
-    """Gesture classification result with debug info"""
-    gesture: str  # "rock" | "paper" | "scissors" | "unknown"
-    finger_states: List[int]  # [thumb, index, middle, ring, pinky]
-    confidence: float
-    debug_angles: List[float]  # 每根手指的實際角度（用於調試）
-    finger_names: List[str] = None  # 手指名稱
+    """
+    Gesture classification result with debug info
+    手勢分類結果（__slots__；手指狀態以位元遮罩保存）
+
+    Finger states are stored as the packed 0-31 mask and the angles as a
+    tuple; ``finger_states`` / ``debug_angles`` build their lists only when
+    read. ``finger_names`` is a shared tuple. Pass a result as
+    ``classify(..., out=result)`` to refill it instead of allocating.
+    """
+    __slots__ = ("gesture", "code", "mask", "confidence", "finger_names", "_angles",
+                 "_states_view", "_angles_view")
+
+    def __init__(self, gesture: str, finger_states: Optional[List[int]] = None,
+                 confidence: float = 0.0, debug_angles: Sequence[float] = (),
+                 finger_names: Sequence[str] = FINGER_NAMES, mask: Optional[int] = None,
+                 code: Optional[Gesture] = None):
+        """
+        Args:
+            gesture: "rock" | "paper" | "scissors" | "unknown"
+            finger_states: [thumb, index, middle, ring, pinky] (or give mask)
+            confidence: 0.0 - 1.0
+            debug_angles: 每根手指的實際角度（用於調試）
+            finger_names: 手指名稱 (default: shared FINGER_NAMES)
+            mask: Packed finger states, used when finger_states is None
+            code: Gesture code of ``gesture`` (default: parsed from it)
+        """
+        self.finger_names = finger_names
+        self._set(gesture, pack_finger_states(finger_states) if finger_states is not None else mask or 0,
+                  confidence, debug_angles, Gesture.parse(gesture) if code is None else _GESTURES[code])
+
+    def _set(self, gesture: str, mask: int, confidence: float, angles: Sequence[float],
+             code: Gesture):
+        self.gesture = gesture
+        self.code = code    # 判定表索引，即時判定不再查字串
+        self.mask = mask
+        self.confidence = confidence
+        self._angles = angles
+        self._states_view = None
+        self._angles_view = None
+
+    @property
+    def finger_states(self) -> List[int]:
+        """[thumb, index, middle, ring, pinky] as a list (built on first read)"""
+        if self._states_view is None:
+            self._states_view = list(_MASK_STATES[self.mask])
+        return self._states_view
+
+    @finger_states.setter
+    def finger_states(self, value: List[int]):
+        self.mask = pack_finger_states(value)
+        self._states_view = None
+
+    @property
+    def debug_angles(self) -> List[float]:
+        """Per-finger average angles as a list (built on first read)"""
+        if self._angles_view is None:
+            self._angles_view = list(self._angles)
+        return self._angles_view
+
+    @debug_angles.setter
+    def debug_angles(self, value: Sequence[float]):
+        self._angles = value
+        self._angles_view = None
+
+    def __eq__(self, other):
+        if not isinstance(other, GestureResult):
+            return NotImplemented
+        return (self.gesture == other.gesture and self.mask == other.mask
+                and self.confidence == other.confidence
+                and tuple(self._angles) == tuple(other._angles)
+                and tuple(self.finger_names) == tuple(other.finger_names))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (f"GestureResult(gesture={self.gesture!r}, finger_states={list(_MASK_STATES[self.mask])}, "
+                f"confidence={self.confidence!r}, debug_angles={list(self._angles)})")
 
-    def __post_init__(self):
-        if self.finger_names is None:
-            self.finger_names = ["拇指", "食指", "中指", "無名指", "小指"]
+
+@dataclass
+class BatchGestureResult:
+    """
+    Gesture classification results for N hands
+    批次手勢分類結果（每個欄位的第一維為手的索引）
+    """
+    gestures: np.ndarray        # (N,) str - "rock" | "paper" | "scissors" | "unknown"
+    finger_states: np.ndarray   # (N, 5) uint8 - [thumb, index, middle, ring, pinky]
+    confidences: np.ndarray     # (N,) float64
+    debug_angles: np.ndarray    # (N, 5) float64 - 每根手指的平均角度
+    codes: Optional[np.ndarray] = None   # (N,) int8 Gesture codes (judge_batch input)
+    probabilities: Optional[np.ndarray] = None   # (N, 4) per-Gesture probabilities (model backends)
+
+    def __len__(self) -> int:
+        return len(self.gestures)
+
+
+class GestureBackend(ABC):
+    """
+    Pluggable gesture decision backend for GestureClassifierV2
+    可替換的手勢判定後端介面
+
+    The classifier still computes finger states and angles (debug info);
+    a backend replaces the gesture table lookup that turns them into a
+    gesture and confidence. ``None`` selects the built-in angle rules.
+    """
+    name = "backend"
+
+    @abstractmethod
+    def predict(self, points: np.ndarray) -> Tuple[int, float]:
+        """
+        Args:
+            points: (21, 3) landmark array
+
+        Returns:
+            (Gesture code, confidence)
+        """
+
+    @abstractmethod
+    def predict_batch(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """
+        Args:
+            points: (N, 21, 3) landmark array
+
+        Returns:
+            ((N,) int8 codes, (N,) float64 confidences, (N, 4) probabilities or None)
+        """
+
+
+class ClassifierSettings(NamedTuple):
+    """
+    Everything classify() reads from the classifier, swapped as one object
+    分類器的所有可調設定（整組替換，熱重載不會出現半套設定）
+    """
+    thresholds: CompiledThresholds
+    use_fuzzy_matching: bool
+    gesture_table: GestureTable
+    angle_mode: str
+    backend: Optional[GestureBackend]
+
+
+def _check_angle_mode(value: str) -> str:
+    if value not in ANGLE_MODES:
+        raise ValueError(f"Unknown angle mode {value!r}; expected one of {ANGLE_MODES}")
+    return value
 
 
 class GestureClassifierV2:
@@ -42,7 +365,9 @@ class GestureClassifierV2:
     def __init__(self,
                  angle_threshold: float = 140.0,  # 放寬閾值 130→140
                  use_fuzzy_matching: bool = True,
-                 debug_mode: bool = False):
+                 debug_mode: bool = False,
+                 angle_mode: str = "2d",
+                 backend: Optional[GestureBackend] = None):
         """
         Initialize optimized classifier
 
@@ -50,19 +375,107 @@ class GestureClassifierV2:
             angle_threshold: 手指伸直判定角度（度）- 更寬鬆
             use_fuzzy_matching: 是否使用模糊匹配（允許1-2根手指誤判）
             debug_mode: 是否啟用調試模式（顯示角度值）
+            angle_mode: "2d" (x/y only) or "3d" (uses z; robust to hands
+                tilted toward the camera)
+            backend: Gesture decision backend, e.g. a trained GestureModel;
+                None uses the angle rules (gesture table)
         """
         self.angle_threshold = angle_threshold
-        self.use_fuzzy_matching = use_fuzzy_matching
         self.debug_mode = debug_mode
+        self._settings = ClassifierSettings(
+            thresholds=compile_thresholds(DEFAULT_FINGER_THRESHOLDS),
+            use_fuzzy_matching=bool(use_fuzzy_matching),
+            gesture_table=build_gesture_table(bool(use_fuzzy_matching)),  # 同時選定查找表
+            angle_mode=_check_angle_mode(angle_mode),
+            backend=backend
+        )
+        self._points = np.empty((21, 3), dtype=np.float32)  # landmark objects -> backend
 
-        # 針對不同手指設定不同閾值（更符合實際）
-        self.finger_thresholds = {
-            "thumb": 120.0,   # 大拇指較難伸直，降低閾值
-            "index": 140.0,   # 食指標準閾值
-            "middle": 140.0,  # 中指標準閾值
-            "ring": 135.0,    # 無名指較難獨立控制，降低閾值
-            "pinky": 130.0    # 小指最難控制，最低閾值
-        }
+    @classmethod
+    def from_config(cls, config, **kwargs) -> 'GestureClassifierV2':
+        """Classifier with the config's FINGER_THRESHOLDS, FUZZY_MATCHING, ANGLE_MODE and GESTURE_MODEL"""
+        classifier = cls(**kwargs)
+        classifier.apply_config(config)
+        return classifier
+
+    def apply_config(self, config):
+        """
+        Take thresholds and fuzzy mode from an RPSConfig (hot reload)
+        套用設定（可在執行中呼叫）
+
+        The whole config is validated and compiled into a new
+        ClassifierSettings first and swapped in with one assignment, so a
+        concurrent classify() sees either the old or the new settings, never
+        a mix, and an invalid config changes nothing.
+
+        Raises:
+            ValueError: On unknown finger keys or ANGLE_MODE (nothing applied)
+        """
+        settings = self._settings
+        thresholds = getattr(config, "FINGER_THRESHOLDS", None)
+        if thresholds:
+            settings = settings._replace(
+                thresholds=compile_thresholds({**settings.thresholds.by_name, **thresholds}))
+        fuzzy = bool(getattr(config, "FUZZY_MATCHING", settings.use_fuzzy_matching))
+        settings = settings._replace(use_fuzzy_matching=fuzzy, gesture_table=build_gesture_table(fuzzy),
+                                     angle_mode=_check_angle_mode(
+                                         getattr(config, "ANGLE_MODE", settings.angle_mode)))
+        if hasattr(config, "GESTURE_MODEL"):
+            path = config.GESTURE_MODEL
+            if path:
+                from .gesture_model import GestureModel
+                settings = settings._replace(backend=GestureModel.load(path))
+            else:
+                settings = settings._replace(backend=None)
+        self._settings = settings
+
+    @property
+    def _thresholds(self) -> CompiledThresholds:
+        return self._settings.thresholds
+
+    @property
+    def _gesture_table(self) -> GestureTable:
+        return self._settings.gesture_table
+
+    @property
+    def finger_thresholds(self) -> Mapping[str, float]:
+        """Per-finger extension thresholds (read-only; assign to change)"""
+        return self._settings.thresholds.by_name
+
+    @finger_thresholds.setter
+    def finger_thresholds(self, thresholds: Mapping[str, float]):
+        # 未指定的手指沿用目前閾值；編譯後一次換上
+        merged = {**self._settings.thresholds.by_name, **thresholds}
+        self._settings = self._settings._replace(thresholds=compile_thresholds(merged))
+
+    @property
+    def use_fuzzy_matching(self) -> bool:
+        """Whether fuzzy matching is enabled"""
+        return self._settings.use_fuzzy_matching
+
+    @use_fuzzy_matching.setter
+    def use_fuzzy_matching(self, value: bool):
+        # 切換模式時換成對應的預編譯查找表
+        self._settings = self._settings._replace(use_fuzzy_matching=bool(value),
+                                                 gesture_table=build_gesture_table(bool(value)))
+
+    @property
+    def angle_mode(self) -> str:
+        """Joint angle computation: "2d" or "3d" """
+        return self._settings.angle_mode
+
+    @angle_mode.setter
+    def angle_mode(self, value: str):
+        self._settings = self._settings._replace(angle_mode=_check_angle_mode(value))
+
+    @property
+    def backend(self) -> Optional[GestureBackend]:
+        """Gesture decision backend; None uses the angle rules"""
+        return self._settings.backend
+
+    @backend.setter
+    def backend(self, value: Optional[GestureBackend]):
+        self._settings = self._settings._replace(backend=value)
 
     def _calculate_angle(self, p1, p2, p3) -> float:
         """Calculate angle at p2 formed by p1-p2-p3"""
@@ -97,128 +510,197 @@ class GestureClassifierV2:
         Compute binary finger states with per-finger thresholds
         使用每根手指專屬閾值計算手指狀態
 
+        Args:
+            landmarks: MediaPipe landmarks, or a (21, 3) array such as a
+                LandmarkBuffer slot
+
         Returns:
             (finger_states, debug_angles)
         """
-        finger_configs = [
-            ("thumb", [(1, 2, 3), (2, 3, 4)]),        # 大拇指：兩個關節
-            ("index", [(5, 6, 7), (6, 7, 8)]),        # 食指：兩個關節
-            ("middle", [(9, 10, 11), (10, 11, 12)]),  # 中指：兩個關節
-            ("ring", [(13, 14, 15), (14, 15, 16)]),   # 無名指：兩個關節
-            ("pinky", [(17, 18, 19), (18, 19, 20)])   # 小指：兩個關節
-        ]
+        mask, angles = self._finger_mask(landmarks)
+        return list(_MASK_STATES[mask]), list(angles)
 
-        finger_states = []
-        debug_angles = []
+    def _finger_mask(self, landmarks, thresholds: Optional[CompiledThresholds] = None,
+                     settings: Optional[ClassifierSettings] = None) -> Tuple[int, Tuple[float, ...]]:
+        """
+        Packed finger states and per-finger angles (no intermediate lists)
+        直接計算手指位元遮罩與各指平均角度
 
-        for finger_name, joints in finger_configs:
-            # 計算多關節平均角度（更穩定）
-            avg_angle = self._calculate_multi_joint_angle(landmarks, joints)
-            debug_angles.append(avg_angle)
+        Args:
+            landmarks: MediaPipe landmarks or a (21, 3) array
+            thresholds: Per-player thresholds (default: the classifier's)
+            settings: Settings snapshot of the calling classify() (default:
+                the current ones)
 
-            # 使用該手指的專屬閾值
-            threshold = self.finger_thresholds[finger_name]
-            state = 1 if avg_angle > threshold else 0
-            finger_states.append(state)
+        Returns:
+            (mask 0-31, (thumb, index, middle, ring, pinky) angles)
+        """
+        settings = settings or self._settings
+        if settings.angle_mode == "3d":
+            # 3D 內積角度（陣列或關鍵點物件皆可）
+            a = joint_angles_3d(landmarks, _ALL_JOINTS)
+            angles = ((a[0] + a[1]) / 2, (a[2] + a[3]) / 2, (a[4] + a[5]) / 2,
+                      (a[6] + a[7]) / 2, (a[8] + a[9]) / 2)
+        elif isinstance(landmarks, np.ndarray):
+            # 單手陣列：一次 tolist() 後以純 Python 計算（見 joint_angles）
+            a = joint_angles(landmarks, _ALL_JOINTS)
+            angles = ((a[0] + a[1]) / 2, (a[2] + a[3]) / 2, (a[4] + a[5]) / 2,
+                      (a[6] + a[7]) / 2, (a[8] + a[9]) / 2)
+        else:
+            # 計算多關節平均角度（更穩定）
+            angles = tuple(self._calculate_multi_joint_angle(landmarks, joints)
+                           for _, joints in FINGER_CONFIGS)
 
-        return finger_states, debug_angles
+        # 使用該手指的專屬閾值（預先編譯的數值，無字典查找）
+        t = (settings.thresholds if thresholds is None else thresholds).values
+        mask = ((angles[0] > t[0]) | (angles[1] > t[1]) << 1 | (angles[2] > t[2]) << 2
+                | (angles[3] > t[3]) << 3 | (angles[4] > t[4]) << 4)
+        return mask, angles
 
     def _fuzzy_match_gesture(self, finger_states: List[int]) -> str:
         """
         Fuzzy gesture matching allowing 1-2 finger errors
-        模糊匹配：允許1-2根手指誤判
+        模糊匹配：允許1-2根手指誤判（查表，規則見 _match_rules）
 
         Examples:
         - Rock [0,0,0,0,0] also matches [1,0,0,0,0] (thumb extended)
         - Scissors [0,1,1,0,0] also matches [0,1,1,1,0] (ring finger up)
         """
-        # 精確匹配模式
-        exact_patterns = {
-            "rock": [0, 0, 0, 0, 0],
-            "paper": [1, 1, 1, 1, 1],
-            "scissors": [0, 1, 1, 0, 0]
-        }
-
-        # 先嘗試精確匹配
-        for gesture_name, pattern in exact_patterns.items():
-            if finger_states == pattern:
-                return gesture_name
-
-        if not self.use_fuzzy_matching:
-            return "unknown"
-
-        # 模糊匹配規則
-        def hamming_distance(a, b):
-            """計算兩個列表的差異數量"""
-            return sum(1 for x, y in zip(a, b) if x != y)
-
-        # Rock 模糊匹配：允許大拇指或小指誤判
-        rock_variants = [
-            [0, 0, 0, 0, 0],  # 標準
-            [1, 0, 0, 0, 0],  # 大拇指微開
-            [0, 0, 0, 0, 1],  # 小指微開
-        ]
-        for variant in rock_variants:
-            if hamming_distance(finger_states, variant) <= 1:
-                return "rock"
-
-        # Paper 模糊匹配：允許1根手指未完全伸直
-        if sum(finger_states) >= 4:  # 至少4根手指伸直
-            return "paper"
-
-        # Scissors 模糊匹配：食指+中指必須伸直，其他可有1根誤判
-        if finger_states[1] == 1 and finger_states[2] == 1:  # 食指+中指伸直
-            other_fingers = [finger_states[0], finger_states[3], finger_states[4]]
-            if sum(other_fingers) <= 1:  # 其他手指最多1根伸直
-                return "scissors"
-
-        return "unknown"
+        return self._gesture_table.gestures[pack_finger_states(finger_states)]
 
     def _exact_match_gesture(self, finger_states: List[int]) -> str:
         """Exact pattern matching (original logic)"""
-        patterns = {
-            "rock": [0, 0, 0, 0, 0],
-            "paper": [1, 1, 1, 1, 1],
-            "scissors": [0, 1, 1, 0, 0]
-        }
-
-        for gesture_name, pattern in patterns.items():
-            if finger_states == pattern:
-                return gesture_name
+        return build_gesture_table(False).gestures[pack_finger_states(finger_states)]
 
-        return "unknown"
-
-    def classify(self, landmarks) -> GestureResult:
+    def classify(self, landmarks, out: Optional[GestureResult] = None,
+                 thresholds: Optional[CompiledThresholds] = None) -> GestureResult:
         """
         Classify hand gesture with enhanced detection
 
+        Args:
+            landmarks: 21 MediaPipe landmarks or a (21, 3) landmark array
+            out: Result to refill in place (e.g. one per hand slot) instead
+                of allocating a new one
+            thresholds: Per-player thresholds for this hand, e.g. from a
+                CalibrationStore (default: the classifier's)
+
         Returns:
-            GestureResult with debug information
+            GestureResult with debug information (``out`` if given)
         """
-        # Compute finger states with debug angles
-        finger_states, debug_angles = self._compute_finger_states(landmarks)
+        # One settings snapshot for the whole call (hot reload swaps it)
+        settings = self._settings
+        # Compute packed finger states with debug angles
+        mask, angles = self._finger_mask(landmarks, thresholds, settings)
+
+        backend = settings.backend
+        if backend is not None:
+            if not isinstance(landmarks, np.ndarray):
+                landmarks = copy_landmarks(landmarks, self._points)
+            code, confidence = backend.predict(landmarks)
+            code = _GESTURES[code]
+            gesture = GESTURE_LABELS[code]
+            if out is None:
+                return GestureResult(gesture, confidence=confidence, debug_angles=angles, mask=mask,
+                                     code=code)
+            out._set(gesture, mask, confidence, angles, code)
+            return out
+
+        # Match gesture and confidence with one table lookup
+        table = settings.gesture_table
+        if out is None:
+            return GestureResult(table.gestures[mask], confidence=table.confidences[mask],
+                                 debug_angles=angles, mask=mask, code=table.gesture_codes[mask])
+        out._set(table.gestures[mask], mask, table.confidences[mask], angles, table.gesture_codes[mask])
+        return out
+
+    def _compute_finger_states_batch(self, landmarks: np.ndarray,
+                                     thresholds: Optional[CompiledThresholds] = None,
+                                     settings: Optional[ClassifierSettings] = None
+                                     ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized finger states for N hands
+        批次計算手指狀態（與 _compute_finger_states 相同的數學）
+
+        Args:
+            landmarks: (N, 21, 3) array of landmark coordinates
+            thresholds: Per-player thresholds (default: the classifier's)
+            settings: Settings snapshot (default: the current ones)
 
-        # Match gesture (fuzzy or exact)
-        if self.use_fuzzy_matching:
-            gesture = self._fuzzy_match_gesture(finger_states)
+        Returns:
+            (finger_states (N, 5) uint8, debug_angles (N, 5) float64)
+        """
+        settings = settings or self._settings
+        if settings.angle_mode == "3d":
+            angles = _ANGLE_KERNEL(landmarks)
         else:
-            gesture = self._exact_match_gesture(finger_states)
-
-        # Calculate confidence
-        if gesture == "unknown":
-            confidence = 0.5
-        elif self.use_fuzzy_matching:
-            # 模糊匹配的confidence較低
-            confidence = 0.85
+            # 一次取出所有需要的座標（連續記憶體，比逐點索引快）
+            flat = landmarks.reshape(len(landmarks), 21 * 3)
+            coords = flat[:, _BATCH_COLUMNS].astype(np.float64)
+            x1, y1, x2, y2, x3, y3 = np.split(coords, 6, axis=1)
+
+            radians1 = np.arctan2(y1 - y2, x1 - x2)
+            radians3 = np.arctan2(y3 - y2, x3 - x2)
+            angles = np.abs(np.degrees(radians1 - radians3))
+            angles = np.where(angles > 180, 360 - angles, angles)
+
+        # 兩個關節平均 → (N, 5)
+        angles = angles.reshape(-1, len(FINGER_CONFIGS), 2)
+        debug_angles = (angles[..., 0] + angles[..., 1]) / 2
+
+        vector = (settings.thresholds if thresholds is None else thresholds).vector
+        finger_states = (debug_angles > vector).astype(np.uint8)
+
+        return finger_states, debug_angles
+
+    def _match_gesture_batch(self, finger_states: np.ndarray,
+                             table: Optional[GestureTable] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized gesture matching via the precompiled gesture table
+        批次手勢匹配（每隻手一次查表）
+
+        Returns:
+            ((N,) int codes into GESTURE_NAMES, (N,) float64 confidences)
+        """
+        table = table or self._settings.gesture_table
+        masks = pack_finger_states_batch(finger_states)
+        return table.codes[masks], table.confidence_array[masks]
+
+    def classify_batch(self, landmarks: np.ndarray,
+                       thresholds: Optional[CompiledThresholds] = None) -> BatchGestureResult:
+        """
+        Classify N hands in one vectorized pass
+        批次分類 N 隻手（離線評分 / 多桌使用）
+
+        Args:
+            landmarks: (N, 21, 3) float array (x, y, z per landmark);
+                z is used only in "3d" angle mode, matching classify()
+            thresholds: Per-player thresholds for all N hands (default: the
+                classifier's)
+
+        Returns:
+            BatchGestureResult with per-hand arrays
+        """
+        landmarks = np.asarray(landmarks)
+        if landmarks.ndim != 3 or landmarks.shape[1:] != (21, 3):
+            raise ValueError(
+                f"Expected landmarks of shape (N, 21, 3), got {landmarks.shape}"
+            )
+
+        settings = self._settings
+        finger_states, debug_angles = self._compute_finger_states_batch(landmarks, thresholds, settings)
+        probabilities = None
+        if settings.backend is not None:
+            codes, confidences, probabilities = settings.backend.predict_batch(landmarks)
         else:
-            # 精確匹配的confidence較高
-            confidence = 1.0
+            codes, confidences = self._match_gesture_batch(finger_states, settings.gesture_table)
 
-        return GestureResult(
-            gesture=gesture,
+        return BatchGestureResult(
+            gestures=GESTURE_NAMES[codes],
             finger_states=finger_states,
-            confidence=confidence,
-            debug_angles=debug_angles
+            confidences=confidences,
+            debug_angles=debug_angles,
+            codes=codes,
+            probabilities=probabilities
         )
 
     def get_debug_info(self, result: GestureResult) -> str:
@@ -232,12 +714,12 @@ class GestureClassifierV2:
         lines = []
         lines.append("=== Debug Info ===")
 
-        for i, (name, state, angle) in enumerate(zip(
+        for name, state, angle, threshold in zip(
             result.finger_names,
             result.finger_states,
-            result.debug_angles
-        )):
-            threshold = list(self.finger_thresholds.values())[i]
+            result.debug_angles,
+            self._thresholds.values
+        ):
             status = "伸直✓" if state == 1 else "彎曲✗"
             lines.append(f"{name}: {angle:.1f}° ({status}, 閾值{threshold:.0f}°)")
 
@@ -249,5 +731,3 @@ class GestureClassifierV2:
 
 # Backward compatibility: alias to V2
 GestureClassifier = GestureClassifierV2
-
-print("✅ GestureClassifier V2 loaded - Optimized for laptop webcam")
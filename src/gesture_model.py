@@ -0,0 +1,459 @@
+"""
+Gesture Model - Learned gesture backend with NumPy-only inference
+學習式手勢分類後端：離線訓練，推論只用 NumPy 矩陣乘法
+
+A small softmax classifier (logistic regression, or an MLP with one ReLU
+hidden layer) over normalized landmark features, trained offline from
+labelled sessions (e.g. ``synthesize_session`` or a recording with
+hand-labelled codes). Inference is two small matrix products per
+batch: the wrist offset, the per-hand rotation into the hand frame, the
+feature standardization and the calibration temperature are all folded
+into the weights when the model is built (see GestureModel).
+Probabilities are temperature-scaled on a held-out split, so
+``confidence`` reads as the chance the returned gesture is right.
+
+Usage:
+    model, report = train_gesture_model(points, labels)
+    model.save("gesture_model.npz")
+    classifier = GestureClassifierV2(backend=GestureModel.load("gesture_model.npz"))
+"""
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .gesture_classifier_v2 import GestureBackend
+from .gestures import Gesture
+from .landmarks import NUM_LANDMARKS
+
+# Output classes, in Gesture code order
+NUM_CLASSES = len(Gesture)
+# Features: the 20 non-wrist landmarks in the hand frame, x/y/z each
+NUM_FEATURES = (NUM_LANDMARKS - 1) * 3
+# Middle finger MCP: defines the hand's "up" direction and its size
+_REFERENCE = 9
+
+
+def _hand_frames(flat: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-hand frame coefficients from flattened (N, 63) landmarks
+
+    Returns:
+        (a, b, c), each (N,): x' = a*y - b*x, y' = -(a*x + b*y), z' = c*z
+        for wrist-relative coordinates
+    """
+    r = 3 * _REFERENCE
+    ux, uy, uz = (flat[:, r + axis] - flat[:, axis] for axis in range(3))
+    planar = np.sqrt(ux * ux + uy * uy)
+    size = np.sqrt(planar * planar + uz * uz)
+    # Degenerate hands (landmark 9 on the wrist) keep the image frame
+    inv = np.divide(1.0, planar, out=np.zeros_like(planar), where=planar > 0)
+    c = np.divide(1.0, size, out=np.ones_like(size), where=size > 0)
+    return ux * inv * c, np.where(planar > 0, uy * inv, -1.0) * c, c
+
+
+def hand_features(points: np.ndarray) -> np.ndarray:
+    """
+    Normalized landmark features for N hands
+    手部特徵：以手腕為原點、中指根部朝上、依手掌大小縮放
+
+    Landmarks are moved to the wrist, rotated in the image plane so the
+    wrist -> middle-MCP direction points up, and divided by that
+    distance, so position, in-plane rotation and hand size drop out.
+
+    Args:
+        points: (..., 21, 3) landmark array
+
+    Returns:
+        (N, 60) float32 features (N = number of hands)
+    """
+    points = np.asarray(points)
+    if points.shape[-2:] != (NUM_LANDMARKS, 3):
+        raise ValueError(f"Expected landmarks of shape (..., 21, 3), got {points.shape}")
+    flat = points.reshape(-1, NUM_LANDMARKS * 3).astype(np.float32, copy=False)
+    a, b, c = (v[:, None] for v in _hand_frames(flat))
+    rel = flat.reshape(-1, NUM_LANDMARKS, 3)[:, 1:] - flat[:, None, :3]
+    x, y, z = rel[..., 0], rel[..., 1], rel[..., 2]
+
+    features = np.empty((len(flat), NUM_LANDMARKS - 1, 3), dtype=np.float32)
+    # Hand frame: x' along the palm's width, y' = -up (image y grows downward)
+    features[..., 0] = a * y - b * x
+    features[..., 1] = -(a * x + b * y)
+    features[..., 2] = c * z
+    return features.reshape(len(flat), NUM_FEATURES)
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax (in place on ``logits``)"""
+    logits -= logits.max(axis=1, keepdims=True)
+    np.exp(logits, out=logits)
+    logits /= logits.sum(axis=1, keepdims=True)
+    return logits
+
+
+def calibration_error(probabilities: np.ndarray, labels: np.ndarray, bins: int = 15) -> float:
+    """
+    Expected calibration error of the top class
+    預期校準誤差（信心與實際正確率的平均差距）
+
+    Args:
+        probabilities: (N, classes) predicted probabilities
+        labels: (N,) true class codes
+        bins: Equal-width confidence bins
+
+    Returns:
+        Sample-weighted mean |accuracy - confidence| over the bins
+    """
+    confidence = probabilities.max(axis=1)
+    correct = probabilities.argmax(axis=1) == labels
+    index = np.minimum((confidence * bins).astype(np.intp), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    gap = np.abs(np.bincount(index, correct, bins) - np.bincount(index, confidence, bins))
+    return float(gap.sum() / max(counts.sum(), 1))
+
+
+class GestureModel(GestureBackend):
+    """
+    Softmax gesture classifier over hand_features (logistic or 1-hidden-layer MLP)
+    輕量手勢模型（純 NumPy 推論，輸出校準後機率）
+
+    ``layers`` are (weights, bias) pairs applied to hand_features, with
+    ReLU between them; the last one produces the 4 Gesture logits, which
+    are divided by the temperature.
+
+    Prediction never builds the features. The hand-frame rotation is
+    linear in the wrist-relative coordinates with per-hand coefficients
+    (a, b, c), so the first layer splits into three weight blocks applied
+    to the raw landmarks in one product, ``K @ raw.T`` with K of shape
+    (3 * units, 63), then combined as ``a*A + b*B + c*C + bias``. Every
+    later step works on contiguous (unit, hand) rows, and the temperature
+    is folded into the float32 copy of the last layer.
+    """
+    name = "model"
+
+    def __init__(self, layers: Sequence[Tuple[np.ndarray, np.ndarray]],
+                 temperature: float = 1.0, min_confidence: float = 0.0):
+        """
+        Args:
+            layers: [(W (in, out), b (out,)), ...]; first in = 60, last out = 4
+            temperature: Softmax temperature from calibration (> 0)
+            min_confidence: Hands whose top probability is lower are
+                reported as UNKNOWN
+        """
+        layers = [(np.asarray(w, dtype=np.float64), np.asarray(b, dtype=np.float64))
+                  for w, b in layers]
+        if not layers or layers[0][0].shape[0] != NUM_FEATURES or layers[-1][0].shape[1] != NUM_CLASSES:
+            raise ValueError(f"Layers must map {NUM_FEATURES} features to {NUM_CLASSES} classes")
+        if temperature <= 0:
+            raise ValueError(f"temperature must be positive, got {temperature}")
+        self.layers = layers
+        self.temperature = float(temperature)
+        self.min_confidence = float(min_confidence)
+        compiled = layers[:-1] + [(layers[-1][0] / temperature, layers[-1][1] / temperature)]
+        # Transposed float32 copies: (out, in) weights, (out, 1) biases
+        self._kernel = np.ascontiguousarray(_frame_kernel(compiled[0][0]).T, dtype=np.float32)
+        self._units = compiled[0][0].shape[1]
+        self._compiled = [(np.ascontiguousarray(w.T, dtype=np.float32),
+                           b.astype(np.float32)[:, None]) for w, b in compiled]
+
+    @property
+    def hidden(self) -> int:
+        """Hidden units (0 = logistic regression)"""
+        return self.layers[0][0].shape[1] if len(self.layers) > 1 else 0
+
+    def predict_proba(self, points: np.ndarray) -> np.ndarray:
+        """
+        Calibrated class probabilities
+        各手勢的校準機率
+
+        Args:
+            points: (..., 21, 3) landmark array
+
+        Returns:
+            (N, 4) float32 probabilities in Gesture code order (a
+            transposed view of the (4, N) result)
+        """
+        return self._probabilities(points).T
+
+    def _probabilities(self, points: np.ndarray) -> np.ndarray:
+        """(4, N) probabilities, one contiguous row per class"""
+        points = np.asarray(points)
+        if points.shape[-2:] != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Expected landmarks of shape (..., 21, 3), got {points.shape}")
+        flat = points.reshape(-1, NUM_LANDMARKS * 3).astype(np.float32, copy=False)
+        a, b, c = _hand_frames(flat)
+        blocks = self._kernel @ flat.T
+        n = self._units
+        h = a * blocks[:n]
+        h += b * blocks[n:2 * n]
+        h += c * blocks[2 * n:]
+        h += self._compiled[0][1]
+        for w, bias in self._compiled[1:]:
+            np.maximum(h, 0.0, out=h)
+            h = w @ h
+            h += bias
+        h -= h.max(axis=0)
+        np.exp(h, out=h)
+        h /= h.sum(axis=0)
+        return h
+
+    def _decide(self, probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(4, N) probabilities -> (codes int8, confidences float64)"""
+        codes = probabilities.argmax(axis=0).astype(np.int8)
+        confidences = probabilities.max(axis=0).astype(np.float64)
+        if self.min_confidence > 0:
+            low = confidences < self.min_confidence
+            codes[low] = Gesture.UNKNOWN
+            confidences[low] = probabilities[Gesture.UNKNOWN, low]
+        return codes, confidences
+
+    def predict(self, points: np.ndarray) -> Tuple[int, float]:
+        # 單手：手部座標係數以純 Python 計算，只留兩次矩陣向量乘法給 NumPy
+        flat = np.asarray(points, dtype=np.float32).reshape(NUM_LANDMARKS * 3)
+        r = 3 * _REFERENCE
+        x0, y0, z0, x9, y9, z9 = flat[[0, 1, 2, r, r + 1, r + 2]].tolist()
+        ux, uy, uz = x9 - x0, y9 - y0, z9 - z0
+        planar = math.sqrt(ux * ux + uy * uy)
+        size = math.sqrt(planar * planar + uz * uz)
+        c = 1.0 / size if size > 0 else 1.0
+        a, b = (ux / planar * c, uy / planar * c) if planar > 0 else (0.0, -c)
+
+        blocks = self._kernel @ flat
+        n = self._units
+        h = a * blocks[:n] + b * blocks[n:2 * n] + c * blocks[2 * n:] + self._compiled[0][1][:, 0]
+        for w, bias in self._compiled[1:]:
+            h = w @ np.maximum(h, 0.0) + bias[:, 0]
+        logits = h.tolist()
+        top = max(logits)
+        weights = [math.exp(v - top) for v in logits]
+        total = sum(weights)
+        code = logits.index(top)
+        confidence = weights[code] / total
+        if confidence < self.min_confidence:
+            return int(Gesture.UNKNOWN), weights[Gesture.UNKNOWN] / total
+        return code, confidence
+
+    def predict_batch(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        probabilities = self._probabilities(points)
+        codes, confidences = self._decide(probabilities)
+        return codes, confidences, probabilities.T
+
+    def save(self, path: str):
+        """Write to .npz (written to a temporary file, then renamed)"""
+        arrays = {}
+        for i, (w, b) in enumerate(self.layers):
+            arrays[f"w{i}"], arrays[f"b{i}"] = w, b
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, params=np.array([self.temperature, self.min_confidence]), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, min_confidence: Optional[float] = None) -> "GestureModel":
+        """
+        Load a model written by save()
+
+        Args:
+            path: .npz model file
+            min_confidence: Override the saved UNKNOWN cut-off
+        """
+        with np.load(path) as data:
+            temperature, saved_min = data["params"].tolist()
+            layers = [(data[f"w{i}"], data[f"b{i}"]) for i in range(len(data.files) // 2)]
+        return cls(layers, temperature, saved_min if min_confidence is None else min_confidence)
+
+
+def _frame_kernel(weights: np.ndarray) -> np.ndarray:
+    """
+    Fold the wrist offset and hand-frame rotation into a first layer
+
+    Args:
+        weights: (60, units) first-layer weights over hand_features
+
+    Returns:
+        (63, 3 * units) K such that, for raw flattened landmarks r,
+        features @ weights == a*(r@K)[:, :u] + b*(r@K)[:, u:2u] + c*(r@K)[:, 2u:]
+    """
+    wx, wy, wz = weights.reshape(NUM_LANDMARKS - 1, 3, -1).transpose(1, 0, 2)
+    units = weights.shape[1]
+    # Blocks over wrist-relative (x, y, z) of landmarks 1-20
+    relative = np.zeros((NUM_LANDMARKS - 1, 3, 3 * units))
+    relative[:, 1, :units], relative[:, 0, :units] = wx, -wy     # a: x' = a*y - b*x ...
+    relative[:, 0, units:2 * units], relative[:, 1, units:2 * units] = -wx, -wy
+    relative[:, 2, 2 * units:] = wz
+    # Relative coordinates are raw minus the wrist
+    kernel = np.zeros((NUM_LANDMARKS, 3, 3 * units))
+    kernel[1:] = relative
+    kernel[0] = -relative.sum(axis=0)
+    return kernel.reshape(NUM_LANDMARKS * 3, 3 * units)
+
+
+@dataclass
+class TrainingReport:
+    """Summary of one training run (validation metrics are on the held-out split)"""
+    samples: int
+    validation_samples: int
+    hidden: int
+    epochs: int
+    train_accuracy: float
+    validation_accuracy: float
+    validation_nll: float
+    temperature: float
+    calibration_error: float
+    elapsed: float
+
+    def to_dict(self) -> dict:
+        return {"type": "training", **asdict(self)}
+
+
+def training_data(session, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flatten a labelled session into per-hand training samples
+    將標註的對局展開為逐手訓練資料
+
+    Args:
+        session: replay Session (points (F, H, 21, 3), counts (F,))
+        labels: (F, H) Gesture codes, e.g. from synthesize_session or
+            ``rps-referee synth --labels``
+
+    Returns:
+        (points (M, 21, 3) float32, labels (M,) int8) for the detected hands
+    """
+    labels = np.asarray(labels)
+    if labels.shape != session.points.shape[:2]:
+        raise ValueError(f"Labels shape {labels.shape} does not match session {session.points.shape[:2]}")
+    present = np.arange(labels.shape[1]) < session.counts[:, None]
+    return (np.ascontiguousarray(session.points[present], dtype=np.float32),
+            labels[present].astype(np.int8))
+
+
+def _nll(logits: np.ndarray, labels: np.ndarray, temperature: float) -> float:
+    z = logits / temperature
+    z -= z.max(axis=1, keepdims=True)
+    log_norm = np.log(np.exp(z).sum(axis=1))
+    return float((log_norm - z[np.arange(len(z)), labels]).mean())
+
+
+def fit_temperature(logits: np.ndarray, labels: np.ndarray) -> float:
+    """
+    Temperature minimizing the held-out negative log-likelihood
+    以驗證集負對數似然最小化求溫度（黃金分割搜尋 log T）
+    """
+    lo, hi = np.log(0.05), np.log(20.0)
+    ratio = (np.sqrt(5.0) - 1) / 2
+    for _ in range(40):
+        a, b = hi - ratio * (hi - lo), lo + ratio * (hi - lo)
+        if _nll(logits, labels, np.exp(a)) < _nll(logits, labels, np.exp(b)):
+            hi = b
+        else:
+            lo = a
+    return float(np.exp((lo + hi) / 2))
+
+
+def _forward(layers: List[Tuple[np.ndarray, np.ndarray]], x: np.ndarray) -> List[np.ndarray]:
+    """Activations of every layer (the last entry holds the logits)"""
+    outputs = [x]
+    for i, (w, b) in enumerate(layers):
+        x = x @ w + b
+        if i < len(layers) - 1:
+            x = np.maximum(x, 0.0)
+        outputs.append(x)
+    return outputs
+
+
+def train_gesture_model(points: np.ndarray, labels: np.ndarray, hidden: int = 32,
+                        epochs: int = 30, batch_size: int = 256, learning_rate: float = 0.005,
+                        l2: float = 1e-4, validation: float = 0.2,
+                        seed: Optional[int] = 0) -> Tuple[GestureModel, TrainingReport]:
+    """
+    Train a GestureModel with mini-batch Adam on softmax cross-entropy
+    以小批次 Adam 訓練手勢模型，並在驗證集上校準溫度
+
+    Args:
+        points: (M, 21, 3) hand landmarks
+        labels: (M,) Gesture codes (UNKNOWN samples teach the model to abstain)
+        hidden: Hidden ReLU units; 0 trains logistic regression
+        epochs: Passes over the training split
+        batch_size: Samples per Adam step
+        learning_rate: Adam step size
+        l2: Weight decay on the weight matrices
+        validation: Fraction held out for temperature calibration and metrics
+        seed: Shuffling / initialization seed
+
+    Returns:
+        (calibrated GestureModel, TrainingReport)
+    """
+    begin = time.perf_counter()
+    labels = np.asarray(labels).astype(np.intp)
+    features = hand_features(points).astype(np.float64)
+    if len(features) != len(labels):
+        raise ValueError(f"{len(features)} hands but {len(labels)} labels")
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(labels))
+    held = int(round(len(labels) * validation))
+    if held < 1 or held >= len(labels):
+        raise ValueError(f"Need samples on both sides of the validation split, got {len(labels)}")
+    val_idx, train_idx = order[:held], order[held:]
+
+    # Standardize on the training split; folded into the first layer afterwards
+    mean = features[train_idx].mean(axis=0)
+    std = features[train_idx].std(axis=0)
+    std[std < 1e-6] = 1.0
+    x = (features - mean) / std
+
+    sizes = [NUM_FEATURES] + ([hidden] if hidden else []) + [NUM_CLASSES]
+    layers = [(rng.normal(0.0, np.sqrt(2.0 / n_in), (n_in, n_out)), np.zeros(n_out))
+              for n_in, n_out in zip(sizes[:-1], sizes[1:])]
+    moments = [[np.zeros_like(p) for p in layer + layer] for layer in layers]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    onehot = np.eye(NUM_CLASSES)
+    step = 0
+
+    for _ in range(epochs):
+        rng.shuffle(train_idx)
+        for start in range(0, len(train_idx), batch_size):
+            batch = train_idx[start:start + batch_size]
+            outputs = _forward(layers, x[batch])
+            grad = softmax(outputs[-1].copy())
+            grad -= onehot[labels[batch]]
+            grad /= len(batch)
+            step += 1
+            for i in range(len(layers) - 1, -1, -1):
+                w, b = layers[i]
+                grads = (outputs[i].T @ grad + l2 * w, grad.sum(axis=0))
+                if i:
+                    grad = (grad @ w.T) * (outputs[i] > 0)
+                m_w, m_b, v_w, v_b = moments[i]
+                for param, g, m, v in ((w, grads[0], m_w, v_w), (b, grads[1], m_b, v_b)):
+                    m *= beta1
+                    m += (1 - beta1) * g
+                    v *= beta2
+                    v += (1 - beta2) * g * g
+                    param -= (learning_rate * np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                              * m / (np.sqrt(v) + eps))
+
+    train_acc = float((_forward(layers, x[train_idx])[-1].argmax(axis=1) == labels[train_idx]).mean())
+    val_logits = _forward(layers, x[val_idx])[-1]
+    temperature = fit_temperature(val_logits, labels[val_idx])
+
+    w0, b0 = layers[0]
+    layers[0] = (w0 / std[:, None], b0 - (mean / std) @ w0)
+    model = GestureModel(layers, temperature)
+
+    probabilities = softmax(val_logits / temperature)
+    report = TrainingReport(
+        samples=len(train_idx),
+        validation_samples=held,
+        hidden=hidden,
+        epochs=epochs,
+        train_accuracy=train_acc,
+        validation_accuracy=float((probabilities.argmax(axis=1) == labels[val_idx]).mean()),
+        validation_nll=_nll(val_logits, labels[val_idx], temperature),
+        temperature=temperature,
+        calibration_error=calibration_error(probabilities, labels[val_idx]),
+        elapsed=time.perf_counter() - begin
+    )
+    return model, report
@@ -0,0 +1,31 @@
+"""
+Gesture Codes - Small integer gestures shared by classifier, judge and replay
+手勢代碼：分類器、判定與重播共用的整數列舉
+"""
+from enum import IntEnum
+
+
+class Gesture(IntEnum):
+    """Gesture code; the value indexes GESTURE_LABELS and the judge table"""
+    UNKNOWN = 0
+    ROCK = 1
+    PAPER = 2
+    SCISSORS = 3
+
+    @property
+    def label(self) -> str:
+        """Lowercase name used by the string APIs ("rock", ...)"""
+        return GESTURE_LABELS[self]
+
+    @classmethod
+    def parse(cls, value) -> "Gesture":
+        """Gesture from a label, a code, or None (→ UNKNOWN)"""
+        if value is None:
+            return cls.UNKNOWN
+        if isinstance(value, str):
+            return _BY_LABEL.get(value, cls.UNKNOWN)
+        return cls(value)
+
+
+GESTURE_LABELS = ("unknown", "rock", "paper", "scissors")
+_BY_LABEL = {label: Gesture(code) for code, label in enumerate(GESTURE_LABELS)}
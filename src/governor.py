@@ -0,0 +1,116 @@
+"""
+Adaptive Governor - Hold TARGET_FPS by stepping the inference workload
+自適應效能調節：依實測延遲調整解析度、模型複雜度與推論頻率
+
+The governor keeps an exponential moving average of the per-frame
+inference cost and compares it with the frame budget (1 / TARGET_FPS).
+Above ``high`` x budget it steps down to a cheaper operating point; below
+``low`` x budget it steps back up. Stepping up waits longer than stepping
+down, so the loop does not oscillate between two levels.
+"""
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+
+@dataclass(frozen=True)
+class OperatingPoint:
+    """One inference setting"""
+    scale: float            # detection image scale (1.0 = camera resolution)
+    model_complexity: int   # MediaPipe model (0 = fast, 1 = accurate)
+    every: int              # run detection every Nth frame, reuse landmarks between
+
+    @property
+    def label(self) -> str:
+        return f"{self.scale:g}x c{self.model_complexity} 1/{self.every}"
+
+
+# Cheapest first
+DEFAULT_LEVELS = (
+    OperatingPoint(0.5, 0, 3),
+    OperatingPoint(0.5, 0, 2),
+    OperatingPoint(0.75, 0, 1),
+    OperatingPoint(1.0, 0, 1),
+    OperatingPoint(1.0, 1, 1),
+)
+
+
+class AdaptiveGovernor:
+    """
+    Step through operating points to hold a target frame rate
+    依目標 FPS 在各運作點之間升降
+    """
+
+    def __init__(self, target_fps: float = 30.0,
+                 levels: Sequence[OperatingPoint] = DEFAULT_LEVELS,
+                 start: Optional[int] = None, high: float = 0.9, low: float = 0.5,
+                 alpha: float = 0.1, cooldown: int = 30):
+        """
+        Args:
+            target_fps: Frame rate to hold
+            levels: Operating points, cheapest first
+            start: Index of the initial level (default: the richest)
+            high: Step down when the average cost exceeds high x budget
+            low: Step up when the average cost is below low x budget
+            alpha: EMA smoothing factor per frame
+            cooldown: Frames to wait after a change before stepping down
+                (stepping up waits three times as long)
+        """
+        if not levels:
+            raise ValueError("levels must not be empty")
+        self.levels = tuple(levels)
+        self.budget = 1.0 / target_fps
+        self.high = high
+        self.low = low
+        self.alpha = alpha
+        self.cooldown = cooldown
+
+        self.level = len(self.levels) - 1 if start is None else start
+        self.latency = 0.0          # EMA of per-frame inference seconds
+        self.changes = 0
+        self._since_change = 0
+        self._samples = 0
+
+    @classmethod
+    def from_config(cls, config, **kwargs) -> 'AdaptiveGovernor':
+        """Target TARGET_FPS, starting at full resolution with MODEL_COMPLEXITY"""
+        levels = kwargs.pop("levels", DEFAULT_LEVELS)
+        start = OperatingPoint(1.0, config.MODEL_COMPLEXITY, 1)
+        kwargs.setdefault("start", levels.index(start) if start in levels else None)
+        return cls(config.TARGET_FPS, levels, **kwargs)
+
+    @property
+    def point(self) -> OperatingPoint:
+        return self.levels[self.level]
+
+    def status_text(self) -> str:
+        """Operating point and load for the overlay"""
+        return f"gov {self.point.label} {self.latency * 1e3:.1f}/{self.budget * 1e3:.0f}ms"
+
+    def observe(self, seconds: float) -> Optional[OperatingPoint]:
+        """
+        Feed one frame's inference cost (skipped frames included)
+
+        Returns:
+            The new operating point if the level changed, else None
+        """
+        if self._samples == 0:
+            self.latency = seconds
+        else:
+            self.latency += self.alpha * (seconds - self.latency)
+        self._samples += 1
+        self._since_change += 1
+
+        step = 0
+        if self.latency > self.high * self.budget and self.level > 0:
+            if self._since_change >= self.cooldown:
+                step = -1
+        elif self.latency < self.low * self.budget and self.level < len(self.levels) - 1:
+            if self._since_change >= 3 * self.cooldown:
+                step = 1
+        if not step:
+            return None
+
+        self.level += step
+        self.changes += 1
+        self._since_change = 0
+        return self.point
@@ -1,10 +1,98 @@
 """
 Judge Module - Rock-Paper-Scissors Judging Logic
 
-TDD GREEN Phase: Minimal implementation to pass tests
+Judging is one lookup in a 4x4 table indexed by Gesture codes (including
+UNKNOWN). Every cell holds a shared, read-only Outcome, so judging never
+allocates; ``judge_batch`` applies the same table to whole arrays.
 """
+from enum import IntEnum
 from typing import Dict
 
+import numpy as np
+
+from .gestures import Gesture, GESTURE_LABELS
+
+
+class Result(IntEnum):
+    """Outcome code (judge_batch output)"""
+    INVALID = 0    # at least one gesture is unknown
+    DRAW = 1
+    LEFT = 2
+    RIGHT = 3
+
+
+class Outcome(dict):
+    """
+    Shared, read-only judge result
+    共用且唯讀的判定結果（仍是 dict，相容 judge_rps 的回傳格式）
+    """
+    __slots__ = ("code",)
+
+    def __init__(self, code: Result, result: str, message: str):
+        dict.__init__(self, result=result, message=message)
+        self.code = code
+
+    @property
+    def result(self) -> str:
+        return self["result"]
+
+    @property
+    def message(self) -> str:
+        return self["message"]
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("judge outcomes are shared and read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return Outcome, (self.code, self["result"], self["message"])
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+OUTCOMES = (
+    Outcome(Result.INVALID, "invalid", "無法判定"),
+    Outcome(Result.DRAW, "draw", "平手"),
+    Outcome(Result.LEFT, "left", "左手獲勝"),
+    Outcome(Result.RIGHT, "right", "右手獲勝"),
+)
+
+# Left hand wins: rock > scissors, scissors > paper, paper > rock
+_BEATS = {(Gesture.ROCK, Gesture.SCISSORS), (Gesture.SCISSORS, Gesture.PAPER),
+          (Gesture.PAPER, Gesture.ROCK)}
+
+
+def _judge_codes(left: Gesture, right: Gesture) -> Result:
+    if Gesture.UNKNOWN in (left, right):
+        return Result.INVALID
+    if left == right:
+        return Result.DRAW
+    return Result.LEFT if (left, right) in _BEATS else Result.RIGHT
+
+
+# RESULT_TABLE[left, right] -> Result code; JUDGE_TABLE[left][right] -> Outcome
+RESULT_TABLE = np.array([[_judge_codes(left, right) for right in Gesture] for left in Gesture],
+                        dtype=np.int8)
+RESULT_TABLE.flags.writeable = False
+JUDGE_TABLE = tuple(tuple(OUTCOMES[code] for code in row) for row in RESULT_TABLE.tolist())
+_CODES = {label: code for code, label in enumerate(GESTURE_LABELS)}
+
+
+def judge(left: Gesture, right: Gesture) -> Outcome:
+    """
+    Judge two gesture codes with one table lookup
+
+    Returns:
+        Shared Outcome (do not mutate)
+    """
+    return JUDGE_TABLE[left][right]
+
 
 def judge_rps(left_gesture: str, right_gesture: str) -> Dict[str, str]:
     """
@@ -19,6 +107,8 @@ def judge_rps(left_gesture: str, right_gesture: str) -> Dict[str, str]:
             "result": "left" | "right" | "draw",
             "message": "左手獲勝" | "右手獲勝" | "平手"
         }
+        (a shared read-only Outcome; "invalid" / "無法判定" if a gesture is
+        unknown)
 
     Examples:
         >>> judge_rps("rock", "scissors")
@@ -30,23 +120,19 @@ def judge_rps(left_gesture: str, right_gesture: str) -> Dict[str, str]:
         >>> judge_rps("rock", "rock")
         {"result": "draw", "message": "平手"}
     """
-    # Draw condition
-    if left_gesture == right_gesture:
-        return {"result": "draw", "message": "平手"}
+    return JUDGE_TABLE[_CODES.get(left_gesture, 0)][_CODES.get(right_gesture, 0)]
 
-    # Define winning combinations (left hand wins)
-    left_wins = {
-        ("rock", "scissors"),
-        ("scissors", "paper"),
-        ("paper", "rock")
-    }
 
-    # Check if left hand wins
-    if (left_gesture, right_gesture) in left_wins:
-        return {"result": "left", "message": "左手獲勝"}
-    else:
-        return {"result": "right", "message": "右手獲勝"}
+def judge_batch(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Judge arrays of gesture codes (replay / tournament scoring)
+    批次判定：以整數手勢代碼陣列查表
 
+    Args:
+        left: (N,) Gesture codes of the left hands
+        right: (N,) Gesture codes of the right hands
 
-# TDD GREEN: All tests should now pass!
-# Run: pytest tests/test_judge.py -v
+    Returns:
+        (N,) int8 Result codes; OUTCOMES[code] gives the message
+    """
+    return RESULT_TABLE[np.asarray(left, dtype=np.intp), np.asarray(right, dtype=np.intp)]
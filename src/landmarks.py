@@ -0,0 +1,282 @@
+"""
+Landmark Ingestion - Copy MediaPipe hand landmarks into NumPy buffers
+手部關鍵點擷取：將 MediaPipe 結果複製到預先配置的 NumPy 緩衝區
+
+MediaPipe returns each hand as a protobuf ``NormalizedLandmarkList``; reading
+``landmark[j].x`` costs a Python object per access. ``LandmarkBuffer`` copies a
+whole frame of hands into one reusable (max_hands, 21, 3) float32 array, which
+both classifiers accept directly.
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+NUM_LANDMARKS = 21
+
+# Handedness codes stored alongside each hand slot
+HAND_NONE = -1
+HAND_LEFT = 0
+HAND_RIGHT = 1
+HANDEDNESS_LABELS = ("Left", "Right")
+
+# Wire layout of one serialized NormalizedLandmark with x, y, z set:
+# [0x0a len] [0x0d x:f32] [0x15 y:f32] [0x1d z:f32] = 17 bytes
+_WIRE_RECORD = np.dtype([
+    ("tag", "u1"), ("len", "u1"),
+    ("x_tag", "u1"), ("x", "<f4"),
+    ("y_tag", "u1"), ("y", "<f4"),
+    ("z_tag", "u1"), ("z", "<f4"),
+])
+_WIRE_SIZE = NUM_LANDMARKS * _WIRE_RECORD.itemsize
+_WIRE_TAGS = (
+    (0, b"\n" * NUM_LANDMARKS),
+    (2, b"\r" * NUM_LANDMARKS),
+    (7, b"\x15" * NUM_LANDMARKS),
+    (12, b"\x1d" * NUM_LANDMARKS),
+)
+
+
+def _copy_from_wire(hand_landmarks, out: np.ndarray) -> bool:
+    """
+    Decode a NormalizedLandmarkList from its wire bytes without touching
+    per-landmark objects. Returns False if the layout is not the plain x/y/z one.
+    """
+    raw = hand_landmarks.SerializeToString()
+    if len(raw) != _WIRE_SIZE:
+        return False
+    for offset, expected in _WIRE_TAGS:
+        if raw[offset::_WIRE_RECORD.itemsize] != expected:
+            return False
+
+    records = np.frombuffer(raw, dtype=_WIRE_RECORD)
+    out[:, 0] = records["x"]
+    out[:, 1] = records["y"]
+    out[:, 2] = records["z"]
+    return True
+
+
+def copy_landmarks(hand_landmarks, out: np.ndarray) -> np.ndarray:
+    """
+    Copy one hand into a (21, 3) array
+    將單手 21 個關鍵點複製到 (21, 3) 陣列
+
+    Args:
+        hand_landmarks: MediaPipe NormalizedLandmarkList, or any sequence of
+            21 objects with x, y (and optionally z) attributes
+        out: Destination (21, 3) array (written in place)
+
+    Returns:
+        out
+    """
+    if hasattr(hand_landmarks, "SerializeToString") and _copy_from_wire(hand_landmarks, out):
+        return out
+
+    points = getattr(hand_landmarks, "landmark", hand_landmarks)
+    out.reshape(-1)[:] = [
+        v for lm in points for v in (lm.x, lm.y, getattr(lm, "z", 0.0))
+    ]
+    return out
+
+
+def joint_angles(points: np.ndarray, joints: Sequence[Tuple[int, int, int]]) -> List[float]:
+    """
+    Angles at j2 for each (j1, j2, j3) triplet of one (21, 3) hand array
+    計算單手陣列的關節角度（與分類器 _calculate_angle 相同的數學）
+
+    Single hands are converted with one ``tolist()`` and handled in plain
+    Python, which is several times faster than NumPy on 21 points.
+
+    Returns:
+        List of angles in degrees (0-180), one per triplet
+    """
+    rows = points.tolist()
+    angles = []
+    for j1, j2, j3 in joints:
+        x1, y1 = rows[j1][0], rows[j1][1]
+        x2, y2 = rows[j2][0], rows[j2][1]
+        x3, y3 = rows[j3][0], rows[j3][1]
+        radians1 = math.atan2(y1 - y2, x1 - x2)
+        radians3 = math.atan2(y3 - y2, x3 - x2)
+        angle = abs(math.degrees(radians1 - radians3))
+        if angle > 180:
+            angle = 360 - angle
+        angles.append(angle)
+    return angles
+
+
+# Angle triplets (previous, joint, next) of the 15 finger joints, finger by
+# finger: thumb CMC / MCP / IP, then MCP / PIP / DIP of index ... pinky
+HAND_JOINTS: Tuple[Tuple[int, int, int], ...] = tuple(
+    (0 if k == 0 else base + k - 1, base + k, base + k + 1)
+    for base in range(1, NUM_LANDMARKS, 4) for k in range(3)
+)
+
+
+def joint_angles_3d(points, joints: Sequence[Tuple[int, int, int]]) -> List[float]:
+    """
+    3D angles at j2 for each (j1, j2, j3) triplet of one hand
+    計算單手的 3D 關節角度（使用 z，不受手掌傾斜影響）
+
+    The angle between the vectors j2->j1 and j2->j3, from their dot product,
+    so it does not change when the hand turns or tilts toward the camera.
+    Like joint_angles(), a single hand is handled in plain Python; use
+    AngleKernel for arrays of hands.
+
+    Args:
+        points: (21, 3) array, or 21 landmarks with x, y (and optionally z)
+        joints: (j1, j2, j3) triplets
+
+    Returns:
+        List of angles in degrees (0-180); 0 for a zero-length segment
+    """
+    if isinstance(points, np.ndarray):
+        rows = points.tolist()
+    else:
+        rows = [(lm.x, lm.y, getattr(lm, "z", 0.0)) for lm in points]
+    sqrt, acos, degrees = math.sqrt, math.acos, math.degrees
+    angles = []
+    for j1, j2, j3 in joints:
+        x2, y2, z2 = rows[j2]
+        x1, y1, z1 = rows[j1]
+        x3, y3, z3 = rows[j3]
+        ax, ay, az = x1 - x2, y1 - y2, z1 - z2
+        bx, by, bz = x3 - x2, y3 - y2, z3 - z2
+        norms = sqrt((ax * ax + ay * ay + az * az) * (bx * bx + by * by + bz * bz))
+        cos = (ax * bx + ay * by + az * bz) / norms if norms else 1.0
+        angles.append(180.0 if cos <= -1.0 else 0.0 if cos >= 1.0 else degrees(acos(cos)))
+    return angles
+
+
+class AngleKernel:
+    """
+    Vectorized 3D joint angles for arrays of hands
+    批次 3D 關節角度核心（單一矩陣乘法 + 內積 / arccos）
+
+    The joint vectors of every hand come from one matrix product with a
+    constant difference operator, laid out as contiguous (joint, hand)
+    planes; dot products, norms and arccos are then elementwise. float32
+    landmarks (LandmarkBuffer, recordings) stay in float32 throughout, about
+    twice as fast as float64 and within 0.01° of joint_angles_3d().
+
+    Usage:
+        kernel = AngleKernel()              # the 15 HAND_JOINTS
+        angles = kernel(points)             # (..., 21, 3) -> (..., 15) degrees
+    """
+
+    def __init__(self, joints: Sequence[Tuple[int, int, int]] = HAND_JOINTS):
+        """
+        Args:
+            joints: (j1, j2, j3) triplets; the angle is taken at j2
+        """
+        self.joints = tuple(tuple(joint) for joint in joints)
+        n = len(self.joints)
+        # Rows: [ax, ay, az, bx, by, bz] blocks of n joints; a = j1 - j2, b = j3 - j2
+        operator = np.zeros((6 * n, NUM_LANDMARKS * 3))
+        for row, (j1, j2, j3) in enumerate(self.joints):
+            for axis in range(3):
+                operator[axis * n + row, 3 * j1 + axis] += 1.0
+                operator[axis * n + row, 3 * j2 + axis] -= 1.0
+                operator[(3 + axis) * n + row, 3 * j3 + axis] += 1.0
+                operator[(3 + axis) * n + row, 3 * j2 + axis] -= 1.0
+        operator.flags.writeable = False
+        self._operator = operator
+        self._operator32 = operator.astype(np.float32)
+
+    def __call__(self, points: np.ndarray) -> np.ndarray:
+        """
+        Args:
+            points: (..., 21, 3) landmark array
+
+        Returns:
+            (..., len(joints)) float64 angles in degrees (0-180)
+        """
+        points = np.asarray(points)
+        if points.shape[-2:] != (NUM_LANDMARKS, 3):
+            raise ValueError(f"Expected landmarks of shape (..., 21, 3), got {points.shape}")
+        n = len(self.joints)
+        flat = points.reshape(-1, NUM_LANDMARKS * 3)
+        operator = self._operator32 if flat.dtype == np.float32 else self._operator
+        vectors = operator @ flat.T
+        ax, ay, az, bx, by, bz = vectors.reshape(6, n, -1)
+
+        dots = ax * bx + ay * by + az * bz
+        norms = np.sqrt((ax * ax + ay * ay + az * az) * (bx * bx + by * by + bz * bz))
+        cos = np.divide(dots, norms, out=np.ones_like(dots), where=norms > 0)
+        np.clip(cos, -1.0, 1.0, out=cos)
+        angles = np.degrees(np.arccos(cos, out=cos), out=cos)
+        return angles.T.astype(np.float64).reshape(points.shape[:-2] + (n,))
+
+
+class LandmarkBuffer:
+    """
+    Reusable per-frame landmark buffer
+    可重複使用的每幀關鍵點緩衝區
+
+    Usage:
+        buffer = LandmarkBuffer(max_hands=2)
+        while True:
+            results = hands.process(frame_rgb)
+            for i in range(buffer.load_results(results)):
+                result = classifier.classify(buffer.points[i])
+                label = buffer.label(i)
+    """
+
+    def __init__(self, max_hands: int = 2):
+        """
+        Args:
+            max_hands: Number of hand slots (matches MAX_NUM_HANDS)
+        """
+        self.max_hands = max_hands
+        self.points = np.zeros((max_hands, NUM_LANDMARKS, 3), dtype=np.float32)
+        self.handedness = np.full(max_hands, HAND_NONE, dtype=np.int8)
+        self.count = 0
+
+    @property
+    def hands(self) -> np.ndarray:
+        """View of the filled slots, shape (count, 21, 3)"""
+        return self.points[:self.count]
+
+    def label(self, index: int) -> Optional[str]:
+        """MediaPipe handedness label ("Left" / "Right") of a slot"""
+        code = self.handedness[index]
+        return HANDEDNESS_LABELS[code] if code != HAND_NONE else None
+
+    def clear(self):
+        """Mark the buffer empty (data is left in place)"""
+        self.count = 0
+        self.handedness[:] = HAND_NONE
+
+    def load(self, multi_hand_landmarks, multi_handedness=None) -> int:
+        """
+        Copy a frame of hands into the buffer
+        將一幀的所有手複製進緩衝區
+
+        Args:
+            multi_hand_landmarks: results.multi_hand_landmarks (may be None)
+            multi_handedness: results.multi_handedness (may be None)
+
+        Returns:
+            Number of hands loaded (extra hands beyond max_hands are dropped)
+        """
+        self.clear()
+        if not multi_hand_landmarks:
+            return 0
+
+        for i, hand_landmarks in enumerate(multi_hand_landmarks):
+            if i >= self.max_hands:
+                break
+            copy_landmarks(hand_landmarks, self.points[i])
+            self.count = i + 1
+
+        if multi_handedness:
+            for i, handedness in enumerate(multi_handedness[:self.count]):
+                label = handedness.classification[0].label
+                self.handedness[i] = HAND_RIGHT if label == "Right" else HAND_LEFT
+
+        return self.count
+
+    def load_results(self, results) -> int:
+        """Copy hands from a ``hands.process()`` result"""
+        return self.load(results.multi_hand_landmarks, results.multi_handedness)
@@ -0,0 +1,679 @@
+"""
+Referee Pipeline - Threaded capture / inference / render loop for V3
+三執行緒裁判管線：擷取 → 推論 → 繪製
+
+The notebook's ``run_rps_referee_v3_final`` runs every stage serially, so the
+frame rate is bounded by the *sum* of stage times. Here each stage owns a
+thread and stages are linked by bounded queues that drop the oldest frame
+when full, so a slow stage skips stale frames instead of adding latency.
+
+Usage:
+    pipeline = RefereePipeline.from_config(RPSConfig())
+    pipeline.run()
+"""
+import threading
+import time
+import warnings
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import cv2
+import numpy as np
+
+from .calibration import CALIBRATION_POSES, ThresholdCalibrator
+from .events import EventBus, GameEventTracker
+from .game_logic import GameEngine, SimpleGameLogic
+from .gestures import GESTURE_LABELS, Gesture
+from .governor import AdaptiveGovernor
+from .gesture_classifier_v2 import CompiledThresholds, GestureClassifierV2, GestureResult
+from .landmarks import LandmarkBuffer, HAND_LEFT, HAND_NONE, HAND_RIGHT
+from .roi import ROITracker
+from .stabilizer import GestureStabilizer
+from .timing import StageTimer
+from .ui import draw_hand_skeleton, draw_text_lines, draw_ui_v3
+
+# Gesture code -> event label (None = no valid hand)
+_SHOWN = (None,) + GESTURE_LABELS[1:]
+
+
+class LatestQueue:
+    """
+    Bounded FIFO that drops the oldest item instead of blocking the producer
+    有界佇列：滿了就丟棄最舊的項目（避免延遲累積）
+    """
+
+    def __init__(self, maxsize: int = 1, drop_oldest: bool = True):
+        """
+        Args:
+            maxsize: Queue capacity
+            drop_oldest: Drop the oldest item when full; if False, put() blocks
+                until there is room (lossless, e.g. for offline files)
+        """
+        self.maxsize = maxsize
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item) -> bool:
+        """Add an item; returns False if the queue is closed"""
+        with self._cond:
+            if not self.drop_oldest:
+                while len(self._items) >= self.maxsize and not self.closed:
+                    self._cond.wait()
+            if self.closed:
+                return False
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None):
+        """Pop the oldest item; None on timeout or when closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                return None
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Wake all waiters; remaining items can still be drained"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+@dataclass
+class FramePacket:
+    """Captured (and mirrored) frame"""
+    index: int
+    timestamp: float
+    frame: np.ndarray
+
+
+@dataclass
+class InferencePacket:
+    """Frame plus its detection and classification results"""
+    index: int
+    timestamp: float
+    frame: np.ndarray
+    landmarks: np.ndarray      # (hands, 21, 3) float32
+    handedness: np.ndarray     # (hands,) HAND_LEFT / HAND_RIGHT
+    left_result: Optional[GestureResult]
+    right_result: Optional[GestureResult]
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage counters and queue depths"""
+    captured: int
+    inferred: int
+    rendered: int
+    capture_queue: int       # frames waiting for inference
+    inference_queue: int     # frames waiting for render
+    capture_dropped: int     # stale frames skipped before inference
+    inference_dropped: int   # stale frames skipped before render
+    governor: str = ""       # adaptive operating point, if a governor is active
+
+    def status_text(self) -> str:
+        """One-line summary for the on-screen overlay"""
+        text = (f"Q cap:{self.capture_queue} inf:{self.inference_queue} | "
+                f"drop cap:{self.capture_dropped} inf:{self.inference_dropped}")
+        return f"{text} | {self.governor}" if self.governor else text
+
+
+class OpenCVDisplay:
+    """cv2.imshow window; show() returns the pressed key (or -1)"""
+
+    def __init__(self, window_name: str = 'RPS Referee V3 Final - 最終版猜拳裁判'):
+        self.window_name = window_name
+
+    def show(self, frame: np.ndarray) -> int:
+        cv2.imshow(self.window_name, frame)
+        key = cv2.waitKey(1)
+        return key & 0xFF if key >= 0 else -1
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
+
+
+def open_camera(index: int = 0, width: int = 1280, height: int = 720, fps: int = 30):
+    """Open a webcam with a 1-frame driver buffer (lowest latency)"""
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        cap.release()
+        raise IOError(f"Cannot open webcam: {index}")
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def create_hands(model_complexity: int = 0,
+                 min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.7,
+                 max_num_hands: int = 2):
+    """Create a MediaPipe Hands detector"""
+    import mediapipe as mp
+
+    return mp.solutions.hands.Hands(
+        model_complexity=model_complexity,
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence,
+        max_num_hands=max_num_hands
+    )
+
+
+class RefereePipeline:
+    """
+    Threaded V3 referee loop
+    多執行緒 V3 裁判主迴圈
+
+    - capture thread:   source.read() + cv2.flip
+    - inference thread: cvtColor + detector.process + classify
+    - render (caller):  game logic + draw_ui_v3 + display
+    """
+
+    def __init__(self,
+                 source,
+                 detector,
+                 classifier: Optional[GestureClassifierV2] = None,
+                 game_logic: Optional[GameEngine] = None,
+                 display=None,
+                 mirror: bool = True,
+                 show_landmarks: bool = True,
+                 max_num_hands: int = 2,
+                 queue_size: int = 1,
+                 drop_stale: bool = True,
+                 on_render: Optional[Callable[[InferencePacket, dict], None]] = None,
+                 recorder=None,
+                 timer: Optional[StageTimer] = None,
+                 stable_frames: int = 0,
+                 roi: Optional[ROITracker] = None,
+                 governor: Optional[AdaptiveGovernor] = None,
+                 detector_factory: Optional[Callable[[int], object]] = None,
+                 events: Optional[EventBus] = None):
+        """
+        Args:
+            source: Object with read() -> (ok, frame) and release(), e.g. cv2.VideoCapture
+            detector: Object with process(rgb) -> results and close(), e.g. MediaPipe Hands
+            classifier: Gesture classifier (default GestureClassifierV2)
+            game_logic: Game engine (default SimpleGameLogic(3.0))
+            display: Object with show(frame) -> key and close(); None for headless
+            mirror: Flip frames horizontally (mirror mode)
+            show_landmarks: Draw hand skeletons
+            max_num_hands: Landmark buffer slots
+            queue_size: Capacity of each inter-stage queue
+            drop_stale: Drop the oldest frame when a queue is full (live camera);
+                False makes the pipeline lossless (offline files)
+            on_render: Callback(packet, game_state) after each rendered frame
+            recorder: SessionRecorder that stores every inferred frame's
+                landmarks (written from the inference thread, closed on stop)
+            timer: StageTimer for per-stage latency and the timing overlay;
+                None (default) skips every timing call
+            stable_frames: Smooth each hand's gesture over this many frames
+                (GestureStabilizer) before the game logic; 0 = raw frames
+            roi: ROITracker that crops each frame to the hands' region before
+                detection; landmarks are remapped to full-frame coordinates
+            governor: AdaptiveGovernor that steps detection scale, model
+                complexity and detect-every-Nth-frame to hold its target FPS
+            detector_factory: Callable(model_complexity) -> detector, used
+                when the governor changes model complexity (None = keep)
+            events: EventBus receiving gesture / result / lock events from
+                the render thread (publishing never blocks it)
+        """
+        self.source = source
+        self.detector = detector
+        self.classifier = classifier or GestureClassifierV2(
+            angle_threshold=140.0, use_fuzzy_matching=True, debug_mode=False
+        )
+        self.game_logic = game_logic or SimpleGameLogic(lock_duration=3.0)
+        self.display = display
+        self.mirror = mirror
+        self.show_landmarks = show_landmarks
+        self.max_num_hands = max_num_hands
+        self.on_render = on_render
+        self.recorder = recorder
+        self.timer = timer
+        self.roi = roi
+        self.governor = governor
+        self.detector_factory = detector_factory
+        self.events = events
+        self._event_tracker = GameEventTracker()
+        self._model_complexity = governor.point.model_complexity if governor is not None else None
+        # Per-side player thresholds (index HAND_LEFT / HAND_RIGHT; None = classifier's)
+        self.player_thresholds = (None, None)
+        self._calibration = None
+        self.stabilizers = None
+        if stable_frames > 0:
+            self.stabilizers = (GestureStabilizer(stable_frames), GestureStabilizer(stable_frames))
+
+        self.capture_queue = LatestQueue(queue_size, drop_oldest=drop_stale)
+        self.inference_queue = LatestQueue(queue_size, drop_oldest=drop_stale)
+
+        self.captured = 0
+        self.inferred = 0
+        self.rendered = 0
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._space_pressed = False
+        self._render_times = deque(maxlen=30)
+
+    @classmethod
+    def from_config(cls, config, camera_index: int = 0, **kwargs) -> 'RefereePipeline':
+        """Build a live webcam pipeline from an RPSConfig"""
+        source = open_camera(camera_index, config.CAMERA_WIDTH, config.CAMERA_HEIGHT, config.TARGET_FPS)
+        def detector_factory(model_complexity: int):
+            return create_hands(
+                model_complexity=model_complexity,
+                min_detection_confidence=config.MIN_DETECTION_CONFIDENCE,
+                min_tracking_confidence=config.MIN_TRACKING_CONFIDENCE,
+                max_num_hands=config.MAX_NUM_HANDS
+            )
+
+        detector = detector_factory(config.MODEL_COMPLEXITY)
+        kwargs.setdefault("display", OpenCVDisplay())
+        kwargs.setdefault("classifier", GestureClassifierV2.from_config(config))
+        if getattr(config, "ADAPTIVE_PERFORMANCE", False):
+            kwargs.setdefault("governor", AdaptiveGovernor.from_config(config))
+            kwargs.setdefault("detector_factory", detector_factory)
+        return cls(
+            source, detector,
+            game_logic=GameEngine.from_config(config),
+            mirror=config.MIRROR_MODE,
+            stable_frames=config.STABLE_FRAMES,
+            show_landmarks=config.SHOW_LANDMARKS,
+            max_num_hands=config.MAX_NUM_HANDS,
+            **kwargs
+        )
+
+    def apply_config(self, config):
+        """
+        Hot-reload classifier thresholds, fuzzy mode and STABLE_FRAMES
+        執行中套用新設定（ConfigWatcher 訂閱者）
+
+        Called from the watcher thread; every change is a single reference
+        swap, so the inference and render threads keep running.
+        """
+        self.classifier.apply_config(config)
+        frames = config.STABLE_FRAMES
+        current = self.stabilizers[0].window if self.stabilizers is not None else 0
+        if frames != current:
+            self.stabilizers = ((GestureStabilizer(frames), GestureStabilizer(frames))
+                                if frames > 0 else None)
+
+    def set_player(self, side: int, thresholds: Optional[CompiledThresholds]):
+        """
+        Classify one side with a player's calibrated thresholds
+        設定某一側玩家的個人閾值（可在執行中呼叫）
+
+        Args:
+            side: HAND_LEFT or HAND_RIGHT
+            thresholds: e.g. ``CalibrationStore.get(player)``; None restores
+                the classifier's thresholds
+        """
+        if side not in (HAND_LEFT, HAND_RIGHT):
+            raise ValueError(f"side must be HAND_LEFT or HAND_RIGHT, got {side}")
+        by_side = list(self.player_thresholds)
+        by_side[side] = thresholds
+        self.player_thresholds = tuple(by_side)
+
+    def calibrate(self, side: int, gesture: Optional[str],
+                  calibrator: Optional[ThresholdCalibrator] = None) -> Optional[ThresholdCalibrator]:
+        """
+        Calibration mode: feed one side's finger angles to a ThresholdCalibrator
+        校準模式：玩家擺出 ``gesture`` 時收集該側的手指角度
+
+        Args:
+            side: HAND_LEFT or HAND_RIGHT
+            gesture: Pose the player is holding ("rock" | "paper" |
+                "scissors"); None stops collecting
+            calibrator: ThresholdCalibrator receiving every inferred frame
+                (default: a new one)
+
+        Returns:
+            The calibrator collecting the frames (None when stopped)
+
+        Raises:
+            ValueError: On an unknown side or pose (checked here, not in the
+                inference thread)
+        """
+        if gesture is None:
+            self._calibration = None
+            return None
+        if side not in (HAND_LEFT, HAND_RIGHT):
+            raise ValueError(f"side must be HAND_LEFT or HAND_RIGHT, got {side}")
+        if gesture not in CALIBRATION_POSES:
+            raise ValueError(f"Unknown calibration pose {gesture!r}; expected one of {CALIBRATION_POSES}")
+        if calibrator is None:
+            calibrator = ThresholdCalibrator()
+        self._calibration = (side, gesture, calibrator)
+        return calibrator
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def _capture_loop(self):
+        timer = self.timer
+        try:
+            while not self._stop.is_set():
+                if timer is not None:
+                    start = time.perf_counter_ns()
+                success, frame = self.source.read()
+                if not success:
+                    break
+                if self.mirror:
+                    frame = cv2.flip(frame, 1)
+                if timer is not None:
+                    timer.record("capture", time.perf_counter_ns() - start)
+                packet = FramePacket(self.captured, time.perf_counter(), frame)
+                if not self.capture_queue.put(packet):
+                    break
+                self.captured += 1
+        finally:
+            self.capture_queue.close()
+
+    def _detect(self, frame: np.ndarray, buffer: LandmarkBuffer, timer) -> int:
+        """Crop / scale, convert and run the detector; landmarks go into buffer"""
+        if timer is not None:
+            start = time.perf_counter_ns()
+        image = frame
+        if self.roi is not None:
+            image, box = self.roi.crop(image)
+        if self.governor is not None and self.governor.point.scale != 1.0:
+            scale = self.governor.point.scale
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        frame_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        if timer is not None:
+            converted = time.perf_counter_ns()
+            timer.record("convert", converted - start)
+        results = self.detector.process(frame_rgb)
+        if timer is not None:
+            timer.record("detect", time.perf_counter_ns() - converted)
+        count = buffer.load_results(results)
+        if self.roi is not None:
+            # Normalized landmarks are unaffected by the scaling above
+            self.roi.update(buffer.points, count, box, frame.shape)
+        return count
+
+    def _apply_operating_point(self, point):
+        """Swap the detector when the governor changes MODEL_COMPLEXITY"""
+        if self.detector_factory is None or point.model_complexity == self._model_complexity:
+            return
+        self.detector.close()
+        self.detector = self.detector_factory(point.model_complexity)
+        self._model_complexity = point.model_complexity
+
+    def _inference_loop(self):
+        buffer = LandmarkBuffer(self.max_num_hands)
+        timer = self.timer
+        governor = self.governor
+        count = 0
+        left_result = right_result = None
+        try:
+            while not self._stop.is_set():
+                packet = self.capture_queue.get()
+                if packet is None:
+                    break
+
+                if governor is not None:
+                    work_start = time.perf_counter()
+                # Between detections (every Nth frame) the last landmarks are reused
+                reuse = (governor is not None and self.inferred % governor.point.every != 0)
+                if not reuse:
+                    count = self._detect(packet.frame, buffer, timer)
+                    if timer is not None:
+                        detected = time.perf_counter_ns()
+
+                    left_result = None
+                    right_result = None
+                    player_thresholds = self.player_thresholds
+                    calibration = self._calibration
+                    for i in range(count):
+                        side = buffer.handedness[i]
+                        # 沒有左右手資訊的手無法分邊（與 notebook 相同，略過）
+                        if side == HAND_NONE:
+                            continue
+                        gesture_result = self.classifier.classify(
+                            buffer.points[i], thresholds=player_thresholds[side])
+                        if calibration is not None and calibration[0] == side:
+                            calibration[2].add(calibration[1], gesture_result.debug_angles)
+                        # MediaPipe "Right" = 用戶真實右手 → 右側
+                        if side == HAND_RIGHT:
+                            right_result = gesture_result
+                        else:
+                            left_result = gesture_result
+                    if timer is not None:
+                        timer.record("classify", time.perf_counter_ns() - detected)
+                if self.recorder is not None:
+                    self.recorder.write(packet.timestamp, buffer.points, buffer.handedness, count)
+
+                # Buffer is reused next frame: hand the render thread a copy
+                self.inference_queue.put(InferencePacket(
+                    index=packet.index,
+                    timestamp=packet.timestamp,
+                    frame=packet.frame,
+                    landmarks=buffer.hands.copy(),
+                    handedness=buffer.handedness[:count].copy(),
+                    left_result=left_result,
+                    right_result=right_result
+                ))
+                self.inferred += 1
+
+                if governor is not None:
+                    point = governor.observe(time.perf_counter() - work_start)
+                    if point is not None:
+                        self._apply_operating_point(point)
+        finally:
+            self.inference_queue.close()
+
+    def render_once(self, timeout: Optional[float] = 0.5) -> Optional[InferencePacket]:
+        """
+        Render the next inferred frame (call from the main/GUI thread)
+
+        Returns:
+            The rendered packet, or None on timeout / end of stream
+        """
+        packet = self.inference_queue.get(timeout)
+        if packet is None:
+            return None
+
+        left = packet.left_result
+        right = packet.right_result
+        # Gesture codes from here on: UNKNOWN = no valid hand, judged by table index
+        left_code = left.code if left is not None else Gesture.UNKNOWN
+        right_code = right.code if right is not None else Gesture.UNKNOWN
+
+        timer = self.timer
+        if timer is not None:
+            start = time.perf_counter_ns()
+
+        stability = 1.0
+        stabilizers = self.stabilizers   # may be swapped by apply_config()
+        if stabilizers is not None:
+            left_stabilizer, right_stabilizer = stabilizers
+            left_code = left_stabilizer.push(left_code)
+            right_code = right_stabilizer.push(right_code)
+            stability = min(left_stabilizer.stability, right_stabilizer.stability)
+
+        # SPACE read after the previous frame is applied here
+        game_state = self.game_logic.update(left_code, right_code, self._space_pressed, stability)
+        self._space_pressed = False
+        if self.events is not None:
+            self.events.publish_all(self._event_tracker.observe(
+                packet.timestamp, _SHOWN[left_code], _SHOWN[right_code], game_state))
+
+        if timer is not None:
+            updated = time.perf_counter_ns()
+            timer.record("game", updated - start)
+
+        frame = packet.frame
+        if self.show_landmarks:
+            for points in packet.landmarks:
+                draw_hand_skeleton(frame, points)
+
+        now = time.perf_counter()
+        self._render_times.append(now)
+        fps = self.fps
+        frame = draw_ui_v3(frame, left, right, game_state, fps, self.classifier,
+                           status_text=self.stats().status_text())
+        if timer is not None:
+            draw_text_lines(frame, timer.overlay_lines(), (frame.shape[1] - 330, 25))
+            drawn = time.perf_counter_ns()
+            timer.record("draw", drawn - updated)
+        packet.frame = frame
+
+        if self.display is not None:
+            key = self.display.show(frame)
+            if key == ord('q'):
+                self._stop.set()
+            elif key == ord(' '):
+                self._space_pressed = True
+        if timer is not None:
+            shown = time.perf_counter_ns()
+            timer.record("display", shown - drawn)
+            timer.tick(shown)
+
+        self.rendered += 1
+        if self.on_render:
+            self.on_render(packet, game_state)
+        return packet
+
+    # ------------------------------------------------------------------
+    # Control
+    # ------------------------------------------------------------------
+
+    @property
+    def fps(self) -> float:
+        """Render rate over the last 30 frames"""
+        if len(self._render_times) < 2:
+            return 0.0
+        span = self._render_times[-1] - self._render_times[0]
+        return (len(self._render_times) - 1) / span if span > 0 else 0.0
+
+    @property
+    def running(self) -> bool:
+        return not self._stop.is_set()
+
+    def stats(self) -> PipelineStats:
+        """Snapshot of per-stage counters and queue depths"""
+        return PipelineStats(
+            captured=self.captured,
+            inferred=self.inferred,
+            rendered=self.rendered,
+            capture_queue=len(self.capture_queue),
+            inference_queue=len(self.inference_queue),
+            capture_dropped=self.capture_queue.dropped,
+            inference_dropped=self.inference_queue.dropped,
+            governor=self.governor.status_text() if self.governor is not None else ""
+        )
+
+    def start(self):
+        """Start the capture and inference threads"""
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="rps-capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="rps-inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        """Stop all stages and release the source, detector, recorder and display"""
+        self._stop.set()
+        self.capture_queue.close()
+        self.inference_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        stuck = [thread.name for thread in self._threads if thread.is_alive()]
+        self._threads = []
+
+        # A stage still inside source.read() / detector.process() must not
+        # have its native object released from this thread
+        if stuck:
+            warnings.warn(f"Pipeline threads did not stop: {', '.join(stuck)}; "
+                          f"source and detector were not released", RuntimeWarning)
+        else:
+            self.source.release()
+            self.detector.close()
+            if self.recorder is not None:
+                self.recorder.close()
+        if self.display is not None:
+            self.display.close()
+
+    def run(self, max_frames: Optional[int] = None) -> PipelineStats:
+        """
+        Run until 'q', end of source, or max_frames rendered
+
+        Returns:
+            Final PipelineStats
+        """
+        self.start()
+        try:
+            while self.running:
+                if max_frames is not None and self.rendered >= max_frames:
+                    break
+                packet = self.render_once()
+                if packet is None and self.inference_queue.closed and not len(self.inference_queue):
+                    break
+        finally:
+            self.stop()
+        return self.stats()
+
+
+def run_referee(config=None, camera_index: int = 0,
+                record_path: Optional[str] = None,
+                timing_path: Optional[str] = None,
+                config_path: Optional[str] = None) -> PipelineStats:
+    """
+    Threaded equivalent of the notebook's run_rps_referee_v3_final()
+    啟動多執行緒版 V3 裁判
+
+    Args:
+        config: RPSConfig (default RPSConfig())
+        camera_index: Webcam index
+        record_path: Also record the session's landmarks to this file
+            (replay it with ``rps-referee replay``)
+        timing_path: Enable stage timing (overlay) and dump it here every
+            5 seconds (.json snapshot or appended .csv rows)
+        config_path: Load the config from this YAML file and reload
+            thresholds, fuzzy mode and STABLE_FRAMES when it changes
+    """
+    watcher = None
+    if config_path:
+        from .config_watcher import ConfigWatcher
+        watcher = ConfigWatcher(config_path)
+        config = watcher.load()
+    if config is None:
+        from .config import RPSConfig
+        config = RPSConfig()
+    recorder = None
+    if record_path:
+        from .recording import SessionRecorder
+        recorder = SessionRecorder(record_path, max_hands=config.MAX_NUM_HANDS)
+    timer = StageTimer(dump_path=timing_path) if timing_path else None
+    pipeline = RefereePipeline.from_config(config, camera_index, recorder=recorder, timer=timer)
+    if watcher is not None:
+        watcher.subscribe(pipeline.apply_config)
+        watcher.start()
+    try:
+        stats = pipeline.run()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+    if timer is not None:
+        timer.dump(timing_path)
+    return stats
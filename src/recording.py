@@ -0,0 +1,186 @@
+"""
+Landmark Recording - Append-only fixed-record session files
+關鍵點記錄檔：固定長度記錄、僅附加寫入、以 memmap 零複製讀取
+
+File layout (little-endian):
+    header  16 bytes   magic b"RPSL", version u2, max_hands u2,
+                       record size u4, reserved u4
+    record  per frame  timestamp f8, count i1, handedness i1[max_hands],
+                       padding to 16 bytes, points f4[max_hands, 21, 3]
+
+With two hands a record is 520 bytes (~56 MB per camera hour at 30 FPS).
+A crash can only leave a partial record at the end, which the reader ignores.
+"""
+import struct
+from typing import Optional
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS
+
+MAGIC = b"RPSL"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+HEADER_SIZE = _HEADER.size
+
+
+def record_dtype(max_hands: int = 2) -> np.dtype:
+    """Structured dtype of one frame record"""
+    points_offset = (8 + 1 + max_hands + 15) // 16 * 16
+    return np.dtype({
+        "names": ["timestamp", "count", "handedness", "points"],
+        "formats": ["<f8", "i1", ("i1", (max_hands,)), ("<f4", (max_hands, NUM_LANDMARKS, 3))],
+        "offsets": [0, 8, 9, points_offset],
+        "itemsize": points_offset + max_hands * NUM_LANDMARKS * 3 * 4,
+    })
+
+
+def _read_header(f) -> np.dtype:
+    data = f.read(HEADER_SIZE)
+    if len(data) < HEADER_SIZE:
+        raise ValueError("Not a landmark recording: file too short")
+    magic, version, max_hands, record_size, _ = _HEADER.unpack(data)
+    if magic != MAGIC:
+        raise ValueError(f"Not a landmark recording: bad magic {magic!r}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported recording version: {version}")
+    dtype = record_dtype(max_hands)
+    if dtype.itemsize != record_size:
+        raise ValueError(f"Corrupt recording header: record size {record_size}")
+    return dtype
+
+
+def is_recording(path: str) -> bool:
+    """True if the file starts with the recording magic"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class SessionRecorder:
+    """
+    Append frames to a recording file
+    將每幀手部關鍵點附加寫入記錄檔
+
+    One reusable record is filled per frame and written from its buffer, so
+    recording costs a few microseconds and no per-frame allocations.
+    Timestamps are stored relative to the first recorded frame (appended
+    sessions continue from the last recorded timestamp).
+    """
+
+    def __init__(self, path: str, max_hands: int = 2, buffer_size: int = 1 << 16):
+        """
+        Args:
+            path: Output file; an existing recording is appended to
+            max_hands: Hand slots per record (must match an existing file)
+            buffer_size: Write buffer in bytes
+        """
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.frames = 0
+        self._start: Optional[float] = None
+        self._base = 0.0
+        self._record = np.zeros(1, dtype=self.dtype)
+
+        self._file = open(path, "a+b", buffering=buffer_size)
+        self._file.seek(0, 2)
+        size = self._file.tell()
+        if size == 0:
+            self._file.write(_HEADER.pack(MAGIC, VERSION, max_hands, self.dtype.itemsize, 0))
+        else:
+            self._file.seek(0)
+            if _read_header(self._file) != self.dtype:
+                self._file.close()
+                raise ValueError(f"{path} was recorded with a different max_hands")
+            # Drop a partial record left by an interrupted writer
+            whole = (size - HEADER_SIZE) // self.dtype.itemsize
+            self._file.truncate(HEADER_SIZE + whole * self.dtype.itemsize)
+            if whole:
+                # Appended frames continue the existing timeline
+                self._file.seek(HEADER_SIZE + (whole - 1) * self.dtype.itemsize)
+                self._base = struct.unpack("<d", self._file.read(8))[0]
+            self._file.seek(0, 2)
+
+    def write(self, timestamp: float, points: np.ndarray, handedness: np.ndarray, count: int):
+        """
+        Append one frame
+
+        Args:
+            timestamp: Frame time in seconds (any monotonic clock)
+            points: (max_hands, 21, 3) landmarks; rows >= count are ignored
+            handedness: (max_hands,) HAND_* codes
+            count: Number of valid hands
+        """
+        if self._start is None:
+            self._start = timestamp
+        hands = min(len(points), self.max_hands)
+        record = self._record
+        record["timestamp"] = self._base + (timestamp - self._start)
+        record["count"] = count
+        record["handedness"][0, :hands] = handedness[:hands]
+        record["points"][0, :hands] = points[:hands]
+        self._file.write(record.data)
+        self.frames += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_recording(path: str, session, chunk: int = 1 << 14) -> int:
+    """
+    Write a whole Session as a new recording file in bulk
+    將整個 Session 一次寫成記錄檔（合成資料 / 轉檔用）
+
+    Produces the same file as feeding every frame to a SessionRecorder, but
+    fills ``chunk`` records per write instead of one.
+
+    Returns:
+        Frames written
+    """
+    frames = len(session)
+    dtype = record_dtype(session.max_hands)
+    start = float(session.timestamps[0]) if frames else 0.0
+    records = np.zeros(min(chunk, max(frames, 1)), dtype=dtype)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, session.max_hands, dtype.itemsize, 0))
+        for begin in range(0, frames, chunk):
+            part = session[begin:begin + chunk]
+            block = records[:len(part)]
+            block["timestamp"] = part.timestamps - start
+            block["count"] = part.counts
+            block["handedness"] = part.handedness
+            block["points"] = part.points
+            f.write(block.data)
+    return frames
+
+
+def read_recording(path: str):
+    """
+    Memory-map a recording as a Session without copying
+    以 memmap 開啟記錄檔（不載入記憶體）
+
+    Returns:
+        Session whose arrays are read-only views into the mapped file
+    """
+    from .replay import Session
+
+    with open(path, "rb") as f:
+        dtype = _read_header(f)
+        f.seek(0, 2)
+        frames = (f.tell() - HEADER_SIZE) // dtype.itemsize
+
+    if frames == 0:
+        records = np.zeros(0, dtype=dtype)
+    else:
+        records = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(frames,))
+    return Session(records["timestamp"], records["points"], records["handedness"], records["count"])
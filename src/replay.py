@@ -0,0 +1,218 @@
+"""
+Replay Engine - Run the referee over recorded landmark sessions
+離線重播引擎：不需鏡頭，以記錄的關鍵點重跑完整裁判流程
+
+A session is a sequence of frames ``(timestamp, points (H, 21, 3),
+handedness (H,), count)`` - the same tuple SyntheticSource and
+iter_video_hands yield. The engine classifies every hand of the session in
+one ``classify_batch`` pass, then replays the game engine over the whole
+timeline with ``GameEngine.run`` (vectorized, driven by the frames'
+timestamps instead of a clock), so hours of recorded play replay in seconds.
+"""
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .game_logic import GAME_MODES, GameEngine, SimpleGameLogic
+from .game_logic import ReplayClock  # noqa: F401 - moved to game_logic, kept importable here
+from .gesture_classifier_v2 import GestureClassifierV2
+from .gestures import GESTURE_LABELS, Gesture
+from .judge import OUTCOMES
+from .landmarks import HAND_NONE, HAND_RIGHT, NUM_LANDMARKS
+
+
+@dataclass
+class Session:
+    """
+    A recorded landmark session held as arrays
+    記錄的關鍵點場次（以陣列儲存）
+    """
+    timestamps: np.ndarray   # (F,) float64 seconds
+    points: np.ndarray       # (F, H, 21, 3) float32 normalized landmarks
+    handedness: np.ndarray   # (F, H) int8 - HAND_LEFT | HAND_RIGHT | HAND_NONE
+    counts: np.ndarray       # (F,) int8 - detected hands per frame
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def max_hands(self) -> int:
+        return self.points.shape[1]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield (float(self.timestamps[index]), self.points[index],
+                   self.handedness[index], int(self.counts[index]))
+
+    @classmethod
+    def from_frames(cls, frames: Iterable, max_hands: int = 2) -> "Session":
+        """
+        Collect frame tuples (e.g. SyntheticSource, iter_video_hands) into a
+        session; the per-frame arrays are copied since sources reuse them
+        """
+        timestamps, points, handedness, counts = [], [], [], []
+        for timestamp, frame_points, frame_handedness, count in frames:
+            timestamps.append(timestamp)
+            points.append(np.array(frame_points[:max_hands], dtype=np.float32))
+            handedness.append(np.array(frame_handedness[:max_hands], dtype=np.int8))
+            counts.append(min(count, max_hands))
+
+        if not timestamps:
+            return cls(np.zeros(0), np.zeros((0, max_hands, NUM_LANDMARKS, 3), dtype=np.float32),
+                       np.zeros((0, max_hands), dtype=np.int8), np.zeros(0, dtype=np.int8))
+        return cls(np.array(timestamps, dtype=np.float64), np.stack(points),
+                   np.stack(handedness), np.array(counts, dtype=np.int8))
+
+    def save(self, path: str):
+        """Write the session as an uncompressed .npz archive"""
+        np.savez(path, timestamps=self.timestamps, points=self.points,
+                 handedness=self.handedness, counts=self.counts)
+
+    def __getitem__(self, frames: slice) -> "Session":
+        """Slice of frames (views, no copy)"""
+        return Session(self.timestamps[frames], self.points[frames],
+                       self.handedness[frames], self.counts[frames])
+
+    @classmethod
+    def load(cls, path: str) -> "Session":
+        """Read a session written by save(), or memory-map a SessionRecorder file"""
+        from .recording import is_recording, read_recording
+
+        if is_recording(path):
+            return read_recording(path)
+        with np.load(path) as data:
+            return cls(data["timestamps"], data["points"], data["handedness"], data["counts"])
+
+
+@dataclass
+class TimelineEvent:
+    """One change of the displayed referee result"""
+    frame: int
+    timestamp: float
+    mode: str          # "live" | "locked" | "reveal"
+    left: str
+    right: str
+    result: str        # "left" | "right" | "draw"
+    message: str
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), type="judgement")
+
+
+@dataclass
+class ReplayResult:
+    """Judgement timeline of a replayed session"""
+    events: List[TimelineEvent]
+    frames: int
+    elapsed: float     # wall-clock seconds spent replaying
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {"type": "summary", "frames": self.frames, "judgements": len(self.events),
+                "elapsed": self.elapsed, "fps": self.fps}
+
+
+class ReplayEngine:
+    """
+    Drive classifier, game logic and judge from a recorded session
+    以記錄場次驅動分類器、遊戲邏輯與判定
+    """
+
+    def __init__(self, classifier: Optional[GestureClassifierV2] = None,
+                 lock_duration: float = 3.0, chunk_frames: int = 65536,
+                 game_logic: Optional[GameEngine] = None):
+        """
+        Args:
+            classifier: Gesture classifier (default GestureClassifierV2())
+            lock_duration: Seconds a SPACE-locked result is held
+            chunk_frames: Frames classified per batch; bounds memory when
+                streaming large memory-mapped recordings
+            game_logic: Game engine (default SimpleGameLogic(lock_duration));
+                e.g. GameEngine.from_config(config) for countdown mode
+        """
+        self.classifier = classifier or GestureClassifierV2()
+        self.lock_duration = lock_duration
+        self.chunk_frames = chunk_frames
+        self.game_logic = game_logic or SimpleGameLogic(lock_duration)
+
+    def assign_hands(self, session: Session) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classify every hand and assign gestures to the player sides
+
+        Returns:
+            (left, right) gesture arrays of shape (F,), "" where the side has
+            no valid gesture; like the live loop, the last valid hand wins
+        """
+        left, right = self.assign_codes(session)
+        labels = np.array([""] + list(GESTURE_LABELS[1:]))
+        return labels[left], labels[right]
+
+    def assign_codes(self, session: Session) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        assign_hands() as Gesture codes
+
+        Returns:
+            (left, right) int8 arrays of shape (F,), 0 (UNKNOWN) where the
+            side has no valid gesture
+        """
+        frames, max_hands = session.handedness.shape
+        codes = self.classifier.classify_batch(
+            session.points.reshape(frames * max_hands, NUM_LANDMARKS, 3)).codes.reshape(frames, max_hands)
+
+        valid = ((np.arange(max_hands) < session.counts[:, None])
+                 & (session.handedness != HAND_NONE))
+        is_right = session.handedness == HAND_RIGHT
+
+        left = np.zeros(frames, dtype=np.int8)
+        right = np.zeros(frames, dtype=np.int8)
+        for i in range(max_hands):
+            # UNKNOWN (0) never replaces an earlier hand's gesture
+            known = valid[:, i] & (codes[:, i] != Gesture.UNKNOWN)
+            left = np.where(known & ~is_right[:, i], codes[:, i], left)
+            right = np.where(known & is_right[:, i], codes[:, i], right)
+        return left, right
+
+    def run(self, session, space_times: Sequence[float] = ()) -> ReplayResult:
+        """
+        Replay a session and collect the judgement timeline
+
+        Args:
+            session: Session, or any iterable of frame tuples
+            space_times: Timestamps of SPACE presses; each is applied on the
+                first frame at or after it (as the live loop does)
+
+        Returns:
+            ReplayResult with one event each time the displayed result changes
+        """
+        start = time.perf_counter()
+        if not isinstance(session, Session):
+            session = Session.from_frames(session)
+
+        space = np.zeros(len(session) + 1, dtype=bool)
+        space[np.searchsorted(session.timestamps, np.asarray(space_times, dtype=np.float64))] = True
+
+        sides = [self.assign_codes(session[offset:offset + self.chunk_frames])
+                 for offset in range(0, len(session), self.chunk_frames)]
+        left = np.concatenate([chunk[0] for chunk in sides]) if sides else np.zeros(0, dtype=np.int8)
+        right = np.concatenate([chunk[1] for chunk in sides]) if sides else np.zeros(0, dtype=np.int8)
+        timeline = self.game_logic.run(session.timestamps, left, right, space[:len(session)])
+
+        # One event each time the displayed (mode, left, right) changes
+        shown = timeline.left > 0
+        key = np.where(shown, timeline.modes.astype(np.int32) * 16 + timeline.left * 4 + timeline.right, -1)
+        changed = np.flatnonzero(shown & (key != np.concatenate(([-1], key[:-1]))))
+        results = timeline.results
+        events = [TimelineEvent(index, timestamp, GAME_MODES[mode].value, GESTURE_LABELS[left_code],
+                                GESTURE_LABELS[right_code], OUTCOMES[result]["result"],
+                                OUTCOMES[result]["message"])
+                  for index, timestamp, mode, left_code, right_code, result in zip(
+                      changed.tolist(), session.timestamps[changed].tolist(),
+                      timeline.modes[changed].tolist(), timeline.left[changed].tolist(),
+                      timeline.right[changed].tolist(), results[changed].tolist())]
+
+        return ReplayResult(events, len(session), time.perf_counter() - start)
@@ -0,0 +1,134 @@
+"""
+ROI Tracker - Feed hands.process only the region where the hands are
+手部感興趣區域追蹤：只把手所在的區域送進 hands.process
+
+Once hands are found, the next frame is cropped to their bounding box plus
+a margin (and optionally downscaled), so ``cvtColor`` and MediaPipe work on
+a fraction of a 1280x720 frame. Landmarks come back normalized to the crop
+and are remapped to full-frame coordinates, so the classifier and UI see
+the same values as without the tracker. Tracking falls back to the full
+frame when a hand is lost and every ``refresh`` frames to pick up new hands.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+Box = Tuple[int, int, int, int]   # x0, y0, x1, y1 in pixels
+
+
+class ROITracker:
+    """
+    Predict the detection region from the previous frame's landmarks
+    依上一幀關鍵點預測下一幀的偵測區域
+    """
+
+    def __init__(self, margin: float = 0.5, min_size: float = 0.25,
+                 max_side: Optional[int] = None, refresh: int = 30):
+        """
+        Args:
+            margin: Padding around the hands' bounding box, as a fraction of
+                the box size on each side
+            min_size: Smallest crop side, as a fraction of the frame side
+            max_side: Downscale the region so its longest side is at most
+                this many pixels (None = no downscaling)
+            refresh: Run a full-frame pass at least every N frames
+        """
+        self.margin = margin
+        self.min_size = min_size
+        self.max_side = max_side
+        self.refresh = refresh
+
+        self.box: Optional[Box] = None   # region for the next frame (None = full)
+        self.hands = 0                   # hands seen in the last frame
+        self._since_full = 0
+        self.full_frames = 0
+        self.roi_frames = 0
+
+    def reset(self):
+        """Drop tracking; the next frame is processed in full"""
+        self.box = None
+        self.hands = 0
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Box]:
+        """
+        Region of the frame to run detection on
+
+        Returns:
+            (image, box): the (possibly downscaled) region and its box in
+            full-frame pixels
+        """
+        h, w = frame.shape[:2]
+        box = self.box
+        if box is None or self._since_full >= self.refresh:
+            box = (0, 0, w, h)
+            self._since_full = 0
+            self.full_frames += 1
+        else:
+            self._since_full += 1
+            self.roi_frames += 1
+
+        x0, y0, x1, y1 = box
+        region = frame[y0:y1, x0:x1]
+        if self.max_side is not None:
+            longest = max(x1 - x0, y1 - y0)
+            if longest > self.max_side:
+                import cv2
+
+                scale = self.max_side / longest
+                size = (max(int((x1 - x0) * scale), 1), max(int((y1 - y0) * scale), 1))
+                region = cv2.resize(region, size, interpolation=cv2.INTER_AREA)
+        return region, box
+
+    def update(self, points: np.ndarray, count: int, box: Box, frame_shape) -> np.ndarray:
+        """
+        Remap landmarks detected in ``box`` to full-frame coordinates (in
+        place) and predict the region for the next frame
+
+        Args:
+            points: (max_hands, 21, 3) landmarks normalized to the region
+            count: Hands detected
+            box: Region returned by crop()
+            frame_shape: Full frame shape (h, w, ...)
+
+        Returns:
+            points, now normalized to the full frame
+        """
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        hands = points[:count]
+        if box != (0, 0, w, h):
+            hands[..., 0] = (hands[..., 0] * (x1 - x0) + x0) / w
+            hands[..., 1] = (hands[..., 1] * (y1 - y0) + y0) / h
+            hands[..., 2] *= (x1 - x0) / w
+
+        # A hand disappeared (or none found): look at the whole frame again
+        if count == 0 or count < self.hands:
+            self.box = None
+        else:
+            self.box = self._predict(hands, w, h)
+        self.hands = count
+        return points
+
+    def _predict(self, hands: np.ndarray, w: int, h: int) -> Box:
+        """Bounding box of all hands plus margin (the current box is kept
+        while the hands plus half the margin still fit inside it)"""
+        xs = hands[..., 0] * w
+        ys = hands[..., 1] * h
+        left, right = float(xs.min()), float(xs.max())
+        top, bottom = float(ys.min()), float(ys.max())
+
+        pad_x = max((right - left) * self.margin, (self.min_size * w - (right - left)) / 2)
+        pad_y = max((bottom - top) * self.margin, (self.min_size * h - (bottom - top)) / 2)
+        target = (max(int(left - pad_x), 0), max(int(top - pad_y), 0),
+                  min(int(right + pad_x) + 1, w), min(int(bottom + pad_y) + 1, h))
+
+        # Keep the previous region while the hands stay inside it: a steady
+        # crop keeps MediaPipe's own frame-to-frame tracking valid
+        current = self.box
+        if current is not None:
+            inner = (max(left - pad_x / 2, 0), max(top - pad_y / 2, 0),
+                     min(right + pad_x / 2, w), min(bottom + pad_y / 2, h))
+            if (current[0] <= inner[0] and current[1] <= inner[1]
+                    and inner[2] <= current[2] and inner[3] <= current[3]):
+                return current
+        return target
@@ -0,0 +1,299 @@
+"""
+Referee Server - Headless multi-table referee on a process pool
+多桌裁判伺服器：以行程池同時處理多路影像來源
+
+Each table (video file or synthetic source) runs in a pool worker, which
+opens a fresh MediaPipe ``Hands`` instance for every video table (tracking
+state must not carry over between videos) and pushes judgements for the
+table onto a shared queue. ``serve()`` streams
+them back in arrival order, so throughput scales with the number of cores.
+
+Source specs:
+    "match.mp4"          video file (any path cv2.VideoCapture can open)
+    "synthetic"          300-frame synthetic two-hand table
+    "synthetic:1000"     synthetic table with 1000 frames
+"""
+import multiprocessing
+import os
+import queue
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Union
+
+from .gesture_classifier_v2 import GestureClassifierV2
+from .judge import judge_rps
+from .landmarks import LandmarkBuffer, HAND_NONE, HAND_RIGHT
+from .synthetic import SyntheticSource
+
+
+@dataclass
+class Judgement:
+    """One judged gesture pair on a table"""
+    table: int
+    source: str
+    frame: int
+    timestamp: float   # seconds from the start of the source
+    left: str
+    right: str
+    result: str        # "left" | "right" | "draw"
+    message: str
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), type="judgement")
+
+
+@dataclass
+class TableSummary:
+    """Emitted once when a table's source is exhausted"""
+    table: int
+    source: str
+    frames: int
+    judgements: int
+    elapsed: float     # wall-clock seconds spent in the worker
+    error: Optional[str] = None
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return dict(asdict(self), type="summary", fps=self.fps)
+
+
+@dataclass
+class _TableStarted:
+    """Internal: a worker picked up a table (lets serve() detect dead workers)"""
+    table: int
+    pid: int
+
+
+ServerEvent = Union[Judgement, TableSummary]
+
+
+# ----------------------------------------------------------------------
+# Sources
+# ----------------------------------------------------------------------
+
+def iter_video_hands(path: str, hands, mirror: bool = True, max_num_hands: int = 2,
+                     start: int = 0, stop: Optional[int] = None):
+    """
+    Decode a video file and yield detected hands per frame
+    逐幀解碼影片並偵測手部
+
+    Args:
+        start: First frame to decode (seeks; timestamps stay absolute)
+        stop: Frame to stop before (None = end of file)
+
+    Yields:
+        (timestamp, points (max_hands, 21, 3), handedness, count); the arrays
+        are reused between frames
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video source: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    buffer = LandmarkBuffer(max_num_hands)
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    try:
+        index = start
+        while stop is None or index < stop:
+            success, frame = cap.read()
+            if not success:
+                break
+            if mirror:
+                frame = cv2.flip(frame, 1)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            count = buffer.load_results(hands.process(frame_rgb))
+            yield index / fps, buffer.points, buffer.handedness, count
+            index += 1
+    finally:
+        cap.release()
+
+
+def parse_source(spec: str):
+    """
+    Turn a source spec into a frame iterable, or None for video files
+    (video files need a Hands instance)
+    """
+    if spec == "synthetic" or spec.startswith("synthetic:"):
+        _, _, frames = spec.partition(":")
+        return SyntheticSource(frames=int(frames) if frames else 300)
+    return None
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+
+_worker_state: Dict = {}
+
+
+def _init_worker(event_queue, options: Dict):
+    """Pool initializer: remember the event queue and the detector options"""
+    _worker_state.clear()
+    _worker_state["queue"] = event_queue
+    _worker_state["options"] = options
+
+
+def _table_hands():
+    """
+    A new MediaPipe Hands instance for one table
+    每桌建立新的 Hands（追蹤狀態不可跨影片沿用）
+
+    Hands tracks landmarks from frame to frame, so an instance reused by the
+    worker's next table would start from the previous video's last hands.
+    """
+    from .pipeline import create_hands
+
+    options = _worker_state["options"]
+    # Video files are not a tracked live stream: favour detection
+    return create_hands(
+        model_complexity=options.get("model_complexity", 0),
+        min_detection_confidence=options.get("min_detection_confidence", 0.5),
+        min_tracking_confidence=options.get("min_tracking_confidence", 0.5),
+        max_num_hands=options.get("max_num_hands", 2)
+    )
+
+
+def referee_table(table: int, spec: str, frames, emit) -> TableSummary:
+    """
+    Run classifier + judge over one table's frames
+    對單桌影格執行分類與判定
+
+    A judgement is emitted whenever the pair of valid gestures changes, so a
+    held pair produces one event rather than one per frame.
+    """
+    classifier = GestureClassifierV2()
+    result = None            # one result object refilled for every hand
+    last_pair = None
+    frame_count = 0
+    judgements = 0
+    start = time.perf_counter()
+
+    for index, (timestamp, points, handedness, count) in enumerate(frames):
+        left = right = None
+        for i in range(count):
+            side = handedness[i]
+            # 沒有左右手資訊的手無法分邊（與 RefereePipeline 相同，略過）
+            if side == HAND_NONE:
+                continue
+            result = classifier.classify(points[i], out=result)
+            gesture = result.gesture
+            if gesture == "unknown":
+                continue
+            if side == HAND_RIGHT:
+                right = gesture
+            else:
+                left = gesture
+
+        pair = (left, right) if left and right else None
+        if pair is not None and pair != last_pair:
+            outcome = judge_rps(left, right)
+            emit(Judgement(table, spec, index, timestamp, left, right,
+                           outcome["result"], outcome["message"]))
+            judgements += 1
+        last_pair = pair
+        frame_count = index + 1
+
+    return TableSummary(table, spec, frame_count, judgements,
+                        time.perf_counter() - start)
+
+
+def _run_table(table: int, spec: str):
+    """Pool task: referee one table and report its summary"""
+    event_queue = _worker_state["queue"]
+    event_queue.put(_TableStarted(table, os.getpid()))
+    start = time.perf_counter()
+    hands = None
+    try:
+        frames = parse_source(spec)
+        if frames is None:
+            options = _worker_state["options"]
+            hands = _table_hands()
+            frames = iter_video_hands(spec, hands,
+                                      mirror=options.get("mirror", True),
+                                      max_num_hands=options.get("max_num_hands", 2))
+        summary = referee_table(table, spec, frames, event_queue.put)
+    except Exception as e:
+        summary = TableSummary(table, spec, 0, 0, time.perf_counter() - start,
+                               error=f"{type(e).__name__}: {e}")
+    finally:
+        if hands is not None:
+            hands.close()
+    event_queue.put(summary)
+
+
+# ----------------------------------------------------------------------
+# Main side
+# ----------------------------------------------------------------------
+
+def serve(sources: List[str], workers: Optional[int] = None,
+          start_method: str = "spawn", **options) -> Iterator[ServerEvent]:
+    """
+    Referee many tables in parallel and stream their events
+    平行處理多桌並串流回傳判定事件
+
+    Args:
+        sources: One source spec per table (table id = list index)
+        workers: Pool size (default: min(len(sources), cpu_count))
+        start_method: multiprocessing start method; "spawn" (default) is the
+            only one available on Windows and is safe when the parent already
+            runs MediaPipe or other threads
+        **options: mirror, max_num_hands, model_complexity,
+            min_detection_confidence, min_tracking_confidence
+
+    Yields:
+        Judgement events as they happen, and one TableSummary per table
+    """
+    if not sources:
+        return
+    context = multiprocessing.get_context(start_method)
+    workers = workers or min(len(sources), multiprocessing.cpu_count())
+    # Manager queue puts are synchronous: an event is delivered even if the
+    # worker dies right after sending it (mp.Queue buffers in a feeder thread)
+    manager = context.Manager()
+    event_queue = manager.Queue()
+
+    pool = context.Pool(workers, initializer=_init_worker, initargs=(event_queue, options))
+    try:
+        tasks = [pool.apply_async(_run_table, (table, spec)) for table, spec in enumerate(sources)]
+        running = {}   # table -> worker pid
+        finished = set()
+        pending = len(sources)
+        while pending:
+            try:
+                event = event_queue.get(timeout=0.1)
+            except queue.Empty:
+                # Surface tasks that raised instead of waiting forever
+                for task in tasks:
+                    if task.ready() and not task.successful():
+                        task.get()
+                # A worker that died hard (segfault, OOM kill) is silently
+                # replaced by the pool and its task never completes
+                alive = {process.pid for process in multiprocessing.active_children()}
+                for table, pid in list(running.items()):
+                    if pid not in alive:
+                        del running[table]
+                        finished.add(table)
+                        pending -= 1
+                        yield TableSummary(table, sources[table], 0, 0, 0.0,
+                                           error=f"Worker process {pid} died")
+                continue
+            if isinstance(event, _TableStarted):
+                running[event.table] = event.pid
+                continue
+            if event.table in finished:
+                continue   # late event from a table already reported dead
+            if isinstance(event, TableSummary):
+                running.pop(event.table, None)
+                finished.add(event.table)
+                pending -= 1
+            yield event
+    finally:
+        pool.terminate()
+        pool.join()
+        manager.shutdown()
@@ -0,0 +1,103 @@
+"""
+Gesture Stabilizer - Sliding-window vote between classifier and game logic
+手勢穩定器：以滑動視窗投票過濾單幀誤判
+
+V3 judges every raw frame, so one misclassified frame flips the winner.
+A stabilizer keeps the last ``window`` gestures of one hand in a ring with
+running counts; the shown gesture only changes once another gesture fills
+``min_count`` slots of the window (hysteresis). Each update is O(1).
+
+The ring holds Gesture codes: the live loop pushes ``GestureResult.code``
+with ``push`` and hands the stable code on to the game logic; ``update``
+is the same vote for label strings.
+"""
+from typing import Optional
+
+from .gestures import Gesture
+
+# Label -> ring code; anything else (None, "unknown") counts as "no gesture"
+_CODES = {"rock": Gesture.ROCK, "paper": Gesture.PAPER, "scissors": Gesture.SCISSORS}
+_NAMES = (None, "rock", "paper", "scissors")
+_NO_GESTURE = Gesture.UNKNOWN
+
+
+class GestureStabilizer:
+    """
+    Per-hand majority vote with hysteresis
+    單手穩定器：視窗內達 min_count 幀才切換手勢
+    """
+
+    def __init__(self, window: int = 5, min_count: Optional[int] = None):
+        """
+        Args:
+            window: Frames kept in the ring (RPSConfig.STABLE_FRAMES)
+            min_count: Frames of the window a new gesture needs before it
+                replaces the shown one (default: the whole window)
+        """
+        min_count = window if min_count is None else min_count
+        if not 0 < min_count <= window:
+            raise ValueError(f"min_count must be in 1..{window}, got {min_count}")
+        self.window = window
+        self.min_count = min_count
+        self.reset()
+
+    def reset(self):
+        """Forget the history (e.g. when the hand leaves the frame)"""
+        self._ring = [_NO_GESTURE] * self.window
+        self._counts = [self.window, 0, 0, 0]
+        self._pos = 0
+        self._code = _NO_GESTURE
+
+    @property
+    def gesture(self) -> Optional[str]:
+        """Current stable gesture, or None"""
+        return _NAMES[self._code]
+
+    @property
+    def code(self) -> Gesture:
+        """Current stable gesture code (UNKNOWN = none)"""
+        return self._code
+
+    @property
+    def stability(self) -> float:
+        """Share of the window that agrees with the stable gesture (0-1)"""
+        return self._counts[self._code] / self.window
+
+    def update(self, gesture: Optional[str]) -> Optional[str]:
+        """
+        Push one raw classification and return the stable gesture
+
+        Args:
+            gesture: Raw classifier output ("rock" | "paper" | "scissors"),
+                or None / "unknown" when the hand has no valid gesture
+
+        Returns:
+            Stable gesture, or None
+        """
+        return _NAMES[self.push(_CODES.get(gesture, _NO_GESTURE))]
+
+    def push(self, code: Gesture) -> Gesture:
+        """
+        Push one raw Gesture code and return the stable code
+
+        Args:
+            code: Classifier code (``GestureResult.code``); UNKNOWN when the
+                hand has no valid gesture
+
+        Returns:
+            Stable Gesture code (UNKNOWN = none)
+        """
+        counts = self._counts
+        old = self._ring[self._pos]
+        if old != code:
+            counts[old] -= 1
+            counts[code] += 1
+            self._ring[self._pos] = code
+        self._pos += 1
+        if self._pos == self.window:
+            self._pos = 0
+
+        # Only the pushed gesture's count grew, so only it can take over
+        if code != self._code and counts[code] >= self.min_count:
+            self._code = code
+        return self._code
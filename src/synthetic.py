@@ -0,0 +1,321 @@
+"""
+Synthetic Landmarks - Camera-free hand poses for tests and load runs
+合成手部關鍵點：不需鏡頭即可產生猜拳手勢
+
+``synthesize_hands`` turns an array of Gesture codes into (N, 21, 3) hands
+in a few vectorized passes: template lookup, rotation about the wrist
+(in plane and tilted toward the camera), scaling, a random shift, Gaussian landmark noise and optional
+occlusion of one finger. ``synthesize_session`` builds whole two-hand
+matches (held gestures with blended transitions) as a replay Session plus
+the ground-truth codes, ready for ``Session.save`` or ``write_recording``.
+"""
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .gestures import Gesture
+from .landmarks import HAND_LEFT, HAND_RIGHT, NUM_LANDMARKS
+
+
+# Finger states of the three canonical gestures
+GESTURE_FINGER_STATES = {
+    "rock": [0, 0, 0, 0, 0],
+    "paper": [1, 1, 1, 1, 1],
+    "scissors": [0, 1, 1, 0, 0],
+}
+GESTURES = ("rock", "paper", "scissors")
+
+
+def canonical_hand(finger_states: List[int]) -> np.ndarray:
+    """
+    Build one (21, 3) float32 hand with the given extended fingers
+    依手指狀態產生標準手勢（與測試用 MockLandmark 幾何相同）
+
+    Extended fingers are a straight vertical chain (~180° joints); folded
+    fingers bend back toward the palm (~90° joints).
+    """
+    points = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+    points[0] = (0.5, 0.9, 0.0)  # Wrist
+
+    base_x = [0.3, 0.4, 0.5, 0.6, 0.7]
+    base_y = 0.8
+    folded = [(0.0, 0.0), (0.05, -0.05), (0.06, -0.03), (0.08, 0.02)]
+
+    for finger_idx, is_extended in enumerate(finger_states):
+        x_base = base_x[finger_idx]
+        for joint_idx in range(4):
+            if is_extended:
+                x, y = x_base + joint_idx * 0.001, base_y - joint_idx * 0.15
+            else:
+                dx, dy = folded[joint_idx]
+                x, y = x_base + dx, base_y + dy
+            points[1 + finger_idx * 4 + joint_idx] = (x, y, 0.0)
+
+    return points
+
+
+_CANONICAL = {name: canonical_hand(states) for name, states in GESTURE_FINGER_STATES.items()}
+
+# (4, 21, 3) pose per Gesture code; UNKNOWN is a half-closed hand between rock and paper
+POSE_TEMPLATES = np.stack([(_CANONICAL["rock"] + _CANONICAL["paper"]) / 2]
+                          + [_CANONICAL[Gesture(code).label] for code in range(1, 4)])
+POSE_TEMPLATES.flags.writeable = False
+
+# Landmarks hidden by an occluded finger: PIP, DIP and tip (the MCP stays visible)
+_FINGER_JOINTS = 1 + 4 * np.arange(5)[:, None] + np.arange(1, 4)
+
+# Distinct noise patterns drawn per call for batches larger than this
+NOISE_TABLE = 4096
+
+
+@dataclass
+class Augment:
+    """
+    Per-hand variation applied by synthesize_hands
+    合成手勢的隨機變化參數
+    """
+    noise: float = 0.0                          # landmark Gaussian sigma (normalized units)
+    rotation: float = 0.0                       # max in-plane rotation about the wrist (degrees)
+    tilt: float = 0.0                           # max tilt toward / away from the camera (degrees)
+    scale: Tuple[float, float] = (1.0, 1.0)     # hand size range
+    shift: float = 0.0                          # max wrist displacement (normalized units)
+    occlusion: float = 0.0                      # probability one finger is occluded
+
+
+def transform_hands(points: np.ndarray, angles: np.ndarray, scales: np.ndarray,
+                    shifts: np.ndarray, tilts: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Rotate (radians), scale and shift each hand about its wrist, in place
+
+    Args:
+        points: (N, 21, 3) float32 hands
+        angles, scales: (N,) per-hand rotation and scale
+        shifts: (N, 2) per-hand x/y displacement
+        tilts: Optional (N,) rotation about the image x axis (radians),
+            applied before the in-plane rotation
+
+    Returns:
+        points
+    """
+    # Row-vector transform p @ M: rotate and scale x/y, scale z
+    cos, sin = np.cos(angles) * scales, np.sin(angles) * scales
+    matrices = np.zeros((len(points), 3, 3), dtype=np.float32)
+    matrices[:, 0, 0] = matrices[:, 1, 1] = cos
+    matrices[:, 0, 1], matrices[:, 1, 0] = sin, -sin
+    matrices[:, 2, 2] = scales
+    if tilts is not None:
+        tilt = np.zeros_like(matrices)
+        tilt[:, 0, 0] = 1.0
+        tilt[:, 1, 1] = tilt[:, 2, 2] = np.cos(tilts)
+        tilt[:, 1, 2] = np.sin(tilts)
+        tilt[:, 2, 1] = -tilt[:, 1, 2]
+        matrices = np.matmul(tilt, matrices)
+
+    # Rotating about the wrist: p' = p @ M + (wrist - wrist @ M + shift)
+    wrist = points[:, 0].copy()
+    wrist[:, 2] = 0.0
+    offset = wrist - np.matmul(wrist[:, None], matrices)[:, 0]
+    offset[:, :2] += shifts
+    rotated = np.matmul(points, matrices)
+    np.add(rotated, offset[:, None], out=points)
+    return points
+
+
+def occlude_fingers(points: np.ndarray, hands: np.ndarray, fingers: np.ndarray,
+                    rng: np.random.Generator, spread: float = 0.02) -> np.ndarray:
+    """
+    Replace the hidden joints of one finger per hand with guesses around its
+    knuckle, as a tracker does for a finger it cannot see (in place)
+
+    Args:
+        points: (N, 21, 3) hands
+        hands: (K,) indices of the occluded hands
+        fingers: (K,) finger (0 = thumb ... 4 = pinky) hidden on each
+        spread: Sigma of the guessed joint positions
+    """
+    joints = _FINGER_JOINTS[fingers]
+    knuckles = points[hands, joints[:, 0] - 1]
+    guesses = knuckles[:, None] + rng.normal(0.0, spread, (len(hands), 3, 3))
+    points[hands[:, None], joints] = guesses
+    return points
+
+
+def synthesize_hands(codes: np.ndarray, augment: Optional[Augment] = None,
+                     rng: Optional[np.random.Generator] = None,
+                     out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Build one hand per Gesture code
+    依手勢代碼批次產生手部關鍵點
+
+    Args:
+        codes: (N,) Gesture codes (UNKNOWN gives an ambiguous half-closed hand)
+        augment: Variation to apply (default none: exact templates)
+        rng: Random generator (default a fresh unseeded one)
+        out: Optional (N, 21, 3) float32 array to fill
+
+    Returns:
+        (N, 21, 3) float32 hands
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    if out is None:
+        out = np.empty((len(codes), NUM_LANDMARKS, 3), dtype=np.float32)
+    np.take(POSE_TEMPLATES, codes, axis=0, out=out)
+    if augment is None:
+        return out
+    if rng is None:
+        rng = np.random.default_rng()
+
+    n = len(codes)
+    if augment.rotation or augment.scale != (1.0, 1.0) or augment.shift or augment.tilt:
+        transform_hands(out, np.radians(rng.uniform(-augment.rotation, augment.rotation, n)),
+                        rng.uniform(*augment.scale, n),
+                        rng.uniform(-augment.shift, augment.shift, (n, 2)),
+                        np.radians(rng.uniform(-augment.tilt, augment.tilt, n)) if augment.tilt else None)
+    _finish(out, augment, rng, rng.random(n) < augment.occlusion if augment.occlusion else None)
+    return out
+
+
+def _finish(points: np.ndarray, augment: Augment, rng: np.random.Generator,
+            occluded: Optional[np.ndarray], fingers: Optional[np.ndarray] = None):
+    """Occlusion and landmark noise, the per-frame part of an augmentation"""
+    if occluded is not None and occluded.any():
+        hands = np.flatnonzero(occluded)
+        fingers = rng.integers(0, 5, len(hands)) if fingers is None else fingers[hands]
+        occlude_fingers(points, hands, fingers, rng)
+    if augment.noise:
+        n = len(points)
+        if n <= NOISE_TABLE:
+            noise = rng.standard_normal(points.shape, dtype=np.float32)
+        else:
+            # Per-landmark draws dominate large batches; gather whole-hand
+            # patterns from a fresh Gaussian table instead
+            table = rng.standard_normal((NOISE_TABLE,) + points.shape[1:], dtype=np.float32)
+            noise = table[rng.integers(0, NOISE_TABLE, n)]
+        noise *= augment.noise
+        points += noise
+
+
+def random_hands(n: int, augment: Optional[Augment] = None, seed: Optional[int] = 0,
+                 batch: int = 1 << 16) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream ``n`` random rock/paper/scissors hands in batches
+    以批次串流產生大量隨機手勢
+
+    Yields:
+        (codes (B,) int8, points (B, 21, 3) float32) per batch; the points
+        array is reused between batches
+    """
+    rng = np.random.default_rng(seed)
+    buffer = np.empty((min(n, batch), NUM_LANDMARKS, 3), dtype=np.float32)
+    for start in range(0, n, batch):
+        size = min(batch, n - start)
+        codes = rng.integers(Gesture.ROCK, Gesture.SCISSORS + 1, size).astype(np.int8)
+        yield codes, synthesize_hands(codes, augment, rng, out=buffer[:size])
+
+
+def synthesize_session(frames: int, fps: float = 30.0, hold: int = 15, transition: int = 0,
+                       augment: Optional[Augment] = None, seed: Optional[int] = 0):
+    """
+    Build a two-hand match as arrays
+    產生整場雙手對局（含手勢轉換）
+
+    The match is a series of segments: ``transition`` frames blending from
+    the previous gesture pair to a new one, then ``hold`` frames of the new
+    pair. Rotation, scale, shift and occlusion are drawn per hand and
+    segment (a hand keeps its pose while held); noise is drawn per frame.
+
+    Args:
+        frames: Total frames
+        fps: Frame rate used for timestamps
+        hold: Frames each gesture pair is held
+        transition: Blend frames before each hold after the first (a hand
+            changing gesture is labelled UNKNOWN while it blends)
+        augment: Variation to apply (default none)
+        seed: RNG seed (None for nondeterministic)
+
+    Returns:
+        (Session, labels) - labels is (frames, 2) int8 ground-truth Gesture
+        codes for the left and right hand
+    """
+    from .replay import Session
+
+    rng = np.random.default_rng(seed)
+    period = hold + transition
+    segments = -(-frames // period) if frames else 0
+    pairs = rng.integers(Gesture.ROCK, Gesture.SCISSORS + 1, (segments, 2))
+    previous = np.concatenate([pairs[:1], pairs[:-1]])
+
+    index = np.arange(frames)
+    segment, phase = np.divmod(index, period)
+    # Blend weight of the new pose: ramps over the transition, then 1
+    weight = np.minimum((phase + 1) / (transition + 1), 1.0).astype(np.float32)
+    weight[segment == 0] = 1.0
+    weight = weight[:, None, None, None]
+    points = (weight * POSE_TEMPLATES[pairs[segment]]
+              + (1 - weight) * POSE_TEMPLATES[previous[segment]]).astype(np.float32)
+    # Left hand on the left half of the image, right hand on the right
+    points[:, 0, :, 0] -= 0.2
+    points[:, 1, :, 0] += 0.2
+
+    labels = pairs[segment].astype(np.int8)
+    # Hands that change gesture are unlabelled while they blend
+    blending = (weight[:, 0, 0, 0] < 1.0)[:, None] & (pairs[segment] != previous[segment])
+    labels[blending] = Gesture.UNKNOWN
+
+    flat = points.reshape(-1, NUM_LANDMARKS, 3)
+    if augment is not None:
+        hands = 2 * segments
+        angles = np.radians(rng.uniform(-augment.rotation, augment.rotation, hands))
+        scales = rng.uniform(*augment.scale, hands)
+        shifts = rng.uniform(-augment.shift, augment.shift, (hands, 2))
+        occluded = rng.random(hands) < augment.occlusion
+        fingers = rng.integers(0, 5, hands)
+        tilts = np.radians(rng.uniform(-augment.tilt, augment.tilt, hands)) if augment.tilt else None
+        per_hand = (2 * segment[:, None] + np.arange(2)).ravel()
+        transform_hands(flat, angles[per_hand], scales[per_hand], shifts[per_hand],
+                        None if tilts is None else tilts[per_hand])
+        _finish(flat, augment, rng, occluded[per_hand] if augment.occlusion else None,
+                fingers[per_hand])
+
+    handedness = np.tile(np.array([HAND_LEFT, HAND_RIGHT], dtype=np.int8), (frames, 1))
+    session = Session(index / fps, points, handedness, np.full(frames, 2, dtype=np.int8))
+    return session, labels
+
+
+class SyntheticSource:
+    """
+    Two-hand table source that yields landmark frames instead of images
+    合成雙手來源：每段隨機出拳並維持 hold 幀
+
+    Iterating yields (timestamp, points (2, 21, 3), handedness (2,), count).
+    """
+
+    def __init__(self, frames: int = 300, fps: float = 30.0, hold: int = 15,
+                 seed: Optional[int] = 0):
+        """
+        Args:
+            frames: Total frames to produce
+            fps: Frame rate used for timestamps
+            hold: Frames each gesture pair is held before changing
+            seed: RNG seed (None for nondeterministic)
+        """
+        self.frames = frames
+        self.fps = fps
+        self.hold = hold
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.frames
+
+    def __iter__(self) -> Iterator[Tuple[float, np.ndarray, np.ndarray, int]]:
+        rng = np.random.default_rng(self.seed)
+        points = np.zeros((2, NUM_LANDMARKS, 3), dtype=np.float32)
+        handedness = np.array([HAND_LEFT, HAND_RIGHT], dtype=np.int8)
+
+        for index in range(self.frames):
+            if index % self.hold == 0:
+                left, right = rng.integers(0, len(GESTURES), size=2)
+                points[0] = _CANONICAL[GESTURES[left]]
+                points[1] = _CANONICAL[GESTURES[right]]
+            yield index / self.fps, points, handedness, 2
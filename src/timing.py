@@ -0,0 +1,153 @@
+"""
+Stage Timing - Per-stage latency rings for the referee loop
+各階段延遲量測：以 perf_counter_ns 與預先配置的環形緩衝區記錄每幀耗時
+
+Usage:
+    timer = StageTimer(dump_path="timing.csv")
+    start = time.perf_counter_ns()
+    results = hands.process(frame_rgb)
+    timer.record("detect", time.perf_counter_ns() - start)
+    ...
+    timer.tick()   # once per displayed frame: rolling FPS + periodic dump
+
+Each stage is written by one thread only, so recording needs no lock.
+Recording is one integer store; percentiles are computed only when read.
+"""
+import csv
+import json
+import os
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Stages of the V3 loop, in frame order
+STAGES = ("capture", "convert", "detect", "classify", "game", "draw", "display")
+
+
+@dataclass
+class StageStats:
+    """Latency summary of one stage (milliseconds)"""
+    stage: str
+    count: int
+    mean: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class StageTimer:
+    """
+    Ring buffers of stage durations plus a rolling frame rate
+    環形緩衝區計時器：p50 / p95 / p99 與滾動 FPS
+    """
+
+    def __init__(self, stages: Sequence[str] = STAGES, capacity: int = 1024,
+                 dump_path: Optional[str] = None, dump_interval: float = 5.0,
+                 overlay_refresh: int = 15):
+        """
+        Args:
+            stages: Stage names
+            capacity: Samples kept per stage (and frame timestamps for FPS)
+            dump_path: Periodically write stats here; ".json" overwrites a
+                snapshot, anything else appends CSV rows
+            dump_interval: Seconds between dumps
+            overlay_refresh: Frames between recomputing the overlay text
+        """
+        self.stages = tuple(stages)
+        self.capacity = capacity
+        self.dump_path = dump_path
+        self.dump_interval_ns = int(dump_interval * 1e9)
+        self.overlay_refresh = overlay_refresh
+
+        self._index = {stage: i for i, stage in enumerate(self.stages)}
+        self._samples = np.zeros((len(self.stages), capacity), dtype=np.int64)
+        self._counts = [0] * len(self.stages)
+        self._frame_times = np.zeros(capacity, dtype=np.int64)
+        self.frames = 0
+        self._last_dump = None
+        self._overlay: List[str] = []
+
+    def record(self, stage: str, elapsed_ns: int):
+        """Store one duration for a stage"""
+        i = self._index[stage]
+        n = self._counts[i]
+        self._samples[i, n % self.capacity] = elapsed_ns
+        self._counts[i] = n + 1
+
+    def tick(self, now_ns: Optional[int] = None):
+        """Mark one displayed frame; dumps stats every dump_interval"""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        self._frame_times[self.frames % self.capacity] = now_ns
+        self.frames += 1
+
+        if (self.frames - 1) % self.overlay_refresh == 0:
+            self._overlay = []   # recomputed lazily by overlay_lines()
+        if self.dump_path is not None:
+            if self._last_dump is None:
+                self._last_dump = now_ns
+            elif now_ns - self._last_dump >= self.dump_interval_ns:
+                self.dump(self.dump_path)
+                self._last_dump = now_ns
+
+    @property
+    def fps(self) -> float:
+        """Frame rate over the frames held in the ring"""
+        n = min(self.frames, self.capacity)
+        if n < 2:
+            return 0.0
+        newest = self._frame_times[(self.frames - 1) % self.capacity]
+        oldest = self._frame_times[(self.frames - n) % self.capacity]
+        span = newest - oldest
+        return (n - 1) * 1e9 / span if span > 0 else 0.0
+
+    def samples(self, stage: str) -> np.ndarray:
+        """Durations (ns) currently held for a stage (ring order)"""
+        i = self._index[stage]
+        return self._samples[i, :min(self._counts[i], self.capacity)]
+
+    def stats(self, stage: str) -> StageStats:
+        """Percentiles of one stage in milliseconds"""
+        samples = self.samples(stage)
+        if not len(samples):
+            return StageStats(stage, 0, 0.0, 0.0, 0.0, 0.0)
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99)) / 1e6
+        return StageStats(stage, self._counts[self._index[stage]],
+                          float(samples.mean()) / 1e6, float(p50), float(p95), float(p99))
+
+    def summary(self) -> Dict[str, StageStats]:
+        return {stage: self.stats(stage) for stage in self.stages}
+
+    def overlay_lines(self) -> List[str]:
+        """Short per-stage lines for the on-screen overlay (cached)"""
+        if not self._overlay:
+            lines = [f"FPS {self.fps:.1f}"]
+            for stats in self.summary().values():
+                if stats.count:
+                    lines.append(f"{stats.stage:<8} p50 {stats.p50:5.1f} "
+                                 f"p95 {stats.p95:5.1f} p99 {stats.p99:5.1f} ms")
+            self._overlay = lines
+        return self._overlay
+
+    def to_dict(self) -> Dict:
+        return {"frames": self.frames, "fps": self.fps,
+                "stages": {stage: asdict(stats) for stage, stats in self.summary().items()}}
+
+    def dump(self, path: str):
+        """Write a JSON snapshot (.json) or append CSV rows (other suffixes)"""
+        if path.endswith(".json"):
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2)
+            return
+
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        wall_time = time.time()
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["time", "frames", "fps"] + list(StageStats.__dataclass_fields__))
+            for stats in self.summary().values():
+                writer.writerow([f"{wall_time:.3f}", self.frames, f"{self.fps:.2f}",
+                                 stats.stage, stats.count] +
+                                [f"{value:.4f}" for value in (stats.mean, stats.p50, stats.p95, stats.p99)])
@@ -0,0 +1,251 @@
+"""
+Tournament Scoring - Elo ratings and standings over judged rounds
+聯賽計分：以 NumPy 表格累計大量對局的 Elo 評分與排行榜
+
+Rounds are judged with the same table as ``judge_rps`` (``judge_batch``), so
+a round with an unknown gesture is "invalid" and changes nothing but the
+invalid counter. Per-player state lives in growable NumPy columns indexed
+by a player id; win / draw / loss / invalid counts of a batch are tallied
+with a few ``bincount`` calls.
+
+Ratings follow sequential Elo: each valid round is rated against the
+ratings left by the rounds before it, so a batch (``add_rounds`` /
+``ingest``) gives exactly the ratings of feeding the same rounds to
+``add_round`` one by one, and no rating moves by more than K per round.
+"""
+import os
+from itertools import repeat
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .gestures import Gesture
+from .judge import Outcome, Result, OUTCOMES, judge_batch
+
+# Gesture label or code -> code (anything else is unknown)
+_GESTURE_CODES = {**{g.label: int(g) for g in Gesture}, **{int(g): int(g) for g in Gesture}}
+
+# Column name -> dtype of the per-player tables
+_COLUMNS = {"rating": np.float64, "wins": np.int64, "draws": np.int64,
+            "losses": np.int64, "invalid": np.int64, "last_played": np.float64}
+
+
+@dataclass
+class Standing:
+    """One leaderboard row"""
+    rank: int
+    player: str
+    rating: float
+    played: int
+    wins: int
+    draws: int
+    losses: int
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class League:
+    """
+    Incremental league standings
+    聯賽積分表：逐批加入對局並更新 Elo
+
+    Usage:
+        league = League()
+        league.ingest(rounds)        # (left, right, left_gesture, right_gesture, timestamp)
+        league.save("league.npz")    # checkpoint; League.load() resumes
+        for row in league.standings(top=10):
+            print(row.rank, row.player, round(row.rating))
+    """
+
+    def __init__(self, k_factor: float = 32.0, initial_rating: float = 1500.0,
+                 capacity: int = 64):
+        """
+        Args:
+            k_factor: Elo K (maximum rating change per round)
+            initial_rating: Rating of a new player
+            capacity: Initial player slots (grows by doubling)
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.players: List[str] = []
+        self.rounds = 0
+        self._index: Dict[str, int] = {}
+        self._tables = {name: np.zeros(max(capacity, 1), dtype=dtype)
+                        for name, dtype in _COLUMNS.items()}
+        self._tables["rating"][:] = initial_rating
+        self._tables["last_played"][:] = np.nan
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def column(self, name: str) -> np.ndarray:
+        """Per-player column ("rating", "wins", ...) as a view of length len(self)"""
+        return self._tables[name][:len(self.players)]
+
+    def player_id(self, name: str) -> int:
+        """Id of a player, registering new names"""
+        pid = self._index.get(name)
+        if pid is None:
+            pid = len(self.players)
+            if pid == len(self._tables["rating"]):
+                self._grow(2 * pid)
+            self._index[name] = pid
+            self.players.append(name)
+        return pid
+
+    def _grow(self, capacity: int):
+        for name, table in self._tables.items():
+            fill = self.initial_rating if name == "rating" else (np.nan if name == "last_played" else 0)
+            grown = np.full(capacity, fill, dtype=table.dtype)
+            grown[:len(table)] = table
+            self._tables[name] = grown
+
+    def rating(self, name: str) -> float:
+        return float(self._tables["rating"][self._index[name]])
+
+    def add_rounds(self, left: np.ndarray, right: np.ndarray,
+                   left_codes: np.ndarray, right_codes: np.ndarray,
+                   timestamps: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Score a batch of rounds given as columns (Elo applied in round order)
+
+        Args:
+            left: (N,) player ids of the left hands (see player_id)
+            right: (N,) player ids of the right hands
+            left_codes: (N,) Gesture codes of the left hands
+            right_codes: (N,) Gesture codes of the right hands
+            timestamps: Optional (N,) round times, kept as last_played
+
+        Returns:
+            (N,) int8 Result codes of the rounds
+        """
+        left = np.asarray(left, dtype=np.intp)
+        right = np.asarray(right, dtype=np.intp)
+        results = judge_batch(left_codes, right_codes)
+        n = len(self.players)
+        if len(left) and max(left.max(), right.max()) >= n:
+            raise ValueError("unknown player id; register players with player_id()")
+
+        valid = results != Result.INVALID
+        left_valid, right_valid = left[valid], right[valid]
+        # Score of the left player: 1 win, 0.5 draw, 0 loss
+        score = np.where(results[valid] == Result.LEFT, 1.0,
+                         np.where(results[valid] == Result.DRAW, 0.5, 0.0))
+
+        self._rate(left_valid, right_valid, score)
+
+        wins, losses = score == 1.0, score == 0.0
+        self._tables["wins"][:n] += (np.bincount(left_valid[wins], minlength=n)
+                                     + np.bincount(right_valid[losses], minlength=n))
+        self._tables["losses"][:n] += (np.bincount(left_valid[losses], minlength=n)
+                                       + np.bincount(right_valid[wins], minlength=n))
+        draws = ~(wins | losses)
+        self._tables["draws"][:n] += (np.bincount(left_valid[draws], minlength=n)
+                                      + np.bincount(right_valid[draws], minlength=n))
+        self._tables["invalid"][:n] += (np.bincount(left[~valid], minlength=n)
+                                        + np.bincount(right[~valid], minlength=n))
+
+        if timestamps is not None and len(left):
+            timestamps = np.asarray(timestamps, dtype=np.float64)
+            last = self._tables["last_played"][:n]
+            latest = np.full(n, -np.inf)
+            np.maximum.at(latest, left, timestamps)
+            np.maximum.at(latest, right, timestamps)
+            np.fmax(last, latest, out=last, where=latest > -np.inf)
+
+        self.rounds += len(left)
+        return results
+
+    def _rate(self, left: np.ndarray, right: np.ndarray, score: np.ndarray):
+        """Sequential Elo over valid rounds (plain floats: one pass, no temporaries)"""
+        ratings = self._tables["rating"]
+        players = np.union1d(left, right)
+        current = dict(zip(players.tolist(), ratings[players].tolist()))
+        k = self.k_factor
+        for a, b, s in zip(left.tolist(), right.tolist(), score.tolist()):
+            ra, rb = current[a], current[b]
+            delta = k * (s - 1.0 / (1.0 + 10.0 ** ((rb - ra) / 400.0)))
+            current[a] = ra + delta
+            current[b] = rb - delta
+        ratings[players] = list(current.values())
+
+    def add_round(self, left: str, right: str, left_gesture, right_gesture,
+                  timestamp: Optional[float] = None) -> Outcome:
+        """
+        Score one round (sequential Elo)
+
+        Args:
+            left, right: Player names
+            left_gesture, right_gesture: Gesture labels ("rock", ...) or codes
+
+        Returns:
+            The judge_rps outcome of the round
+        """
+        codes = np.array([[Gesture.parse(left_gesture)], [Gesture.parse(right_gesture)]], dtype=np.int8)
+        results = self.add_rounds([self.player_id(left)], [self.player_id(right)], codes[0], codes[1],
+                                  None if timestamp is None else [timestamp])
+        return OUTCOMES[results[0]]
+
+    def ingest(self, rounds: Iterable[Tuple], chunk: int = 1 << 16) -> int:
+        """
+        Score a stream of (left, right, left_gesture, right_gesture, timestamp)
+        tuples, converted to columns ``chunk`` rounds at a time
+
+        Returns:
+            Rounds ingested
+        """
+        total = 0
+        batch: List[Tuple] = []
+        for round_ in rounds:
+            batch.append(round_)
+            if len(batch) == chunk:
+                total += self._ingest_chunk(batch)
+                batch = []
+        if batch:
+            total += self._ingest_chunk(batch)
+        return total
+
+    def _ingest_chunk(self, batch: Sequence[Tuple]) -> int:
+        left, right, left_gestures, right_gestures, timestamps = zip(*batch)
+        n = len(batch)
+        self.add_rounds(np.fromiter(map(self.player_id, left), np.intp, n),
+                        np.fromiter(map(self.player_id, right), np.intp, n),
+                        np.fromiter(map(_GESTURE_CODES.get, left_gestures, repeat(0)), np.int8, n),
+                        np.fromiter(map(_GESTURE_CODES.get, right_gestures, repeat(0)), np.int8, n),
+                        np.asarray(timestamps, dtype=np.float64))
+        return len(batch)
+
+    def standings(self, top: Optional[int] = None) -> List[Standing]:
+        """Leaderboard sorted by rating (ties: more wins first)"""
+        ratings = self.column("rating")
+        wins = self.column("wins")
+        order = np.lexsort((-wins, -ratings))[:top]
+        draws, losses = self.column("draws"), self.column("losses")
+        return [Standing(rank + 1, self.players[i], float(ratings[i]),
+                         int(wins[i] + draws[i] + losses[i]), int(wins[i]), int(draws[i]), int(losses[i]))
+                for rank, i in enumerate(order.tolist())]
+
+    def save(self, path: str):
+        """Checkpoint to .npz (written to a temporary file, then renamed)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, players=np.array(self.players, dtype=str),
+                     params=np.array([self.k_factor, self.initial_rating, self.rounds], dtype=np.float64),
+                     **{name: self.column(name) for name in _COLUMNS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "League":
+        """Resume from a checkpoint written by save()"""
+        with np.load(path) as data:
+            k_factor, initial_rating, rounds = data["params"].tolist()
+            players = data["players"].tolist()
+            league = cls(k_factor, initial_rating, capacity=max(len(players), 64))
+            for name in players:
+                league.player_id(name)
+            for name in _COLUMNS:
+                league._tables[name][:len(players)] = data[name]
+        league.rounds = int(rounds)
+        return league
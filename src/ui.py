@@ -0,0 +1,304 @@
+"""
+UI Rendering - V3 overlay with Chinese font support
+V3 介面繪製（支援中文字體）
+
+Extracted from RPS_Gesture_Referee_V3_Final.ipynb.
+
+OpenCV and PIL are imported on first draw, so importing this module (for
+FONT_PATH, HAND_CONNECTIONS or the sprite cache) stays cheap.
+"""
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .game_logic import GameMode
+
+
+# Try to find Chinese font (Windows system fonts)
+FONT_PATHS = [
+    r"C:\Windows\Fonts\msjh.ttc",          # Microsoft JhengHei (微軟正黑體)
+    r"C:\Windows\Fonts\msjhbd.ttc",        # Microsoft JhengHei Bold
+    r"C:\Windows\Fonts\kaiu.ttf",          # DFKai-SB (標楷體)
+    "TaipeiSansTCBeta-Regular.ttf",        # Downloaded font
+    "demo/TaipeiSansTCBeta-Regular.ttf",
+]
+
+
+def find_chinese_font(paths: Sequence[str] = FONT_PATHS) -> Optional[str]:
+    """Return the first existing font path, or None"""
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+FONT_PATH = find_chinese_font()
+
+# MediaPipe hand skeleton topology (same as mp.solutions.hands.HAND_CONNECTIONS)
+HAND_CONNECTIONS: Tuple[Tuple[int, int], ...] = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+@dataclass
+class TextSprite:
+    """Pre-rasterized text: alpha mask plus its offset from the draw position"""
+    alpha: np.ndarray        # (h, w, 1) uint16, 0-255
+    color: np.ndarray        # (3,) uint16 BGR
+    offset: Tuple[int, int]  # (dx, dy) of the mask's top-left corner
+
+
+class TextSpriteCache:
+    """
+    LRU cache of rasterized text sprites keyed by (text, font size, color)
+    文字圖塊快取：每段訊息只用 PIL 繪製一次，之後只混合文字框範圍
+
+    Replaces the per-frame BGR→RGB→PIL→BGR round-trip and font load of the
+    original put_chinese_text with one NumPy blend over the text bounding box.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._sprites: "OrderedDict[tuple, TextSprite]" = OrderedDict()
+        self._fonts: Dict[tuple, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sprites)
+
+    def clear(self):
+        self._sprites.clear()
+        self._fonts.clear()
+
+    def _font(self, font_path: Optional[str], font_size: int):
+        """Load each (font, size) once"""
+        key = (font_path, font_size)
+        if key not in self._fonts:
+            from PIL import ImageFont
+
+            try:
+                if font_path and os.path.exists(font_path):
+                    font = ImageFont.truetype(font_path, font_size)
+                else:
+                    # Fallback to default font
+                    font = ImageFont.load_default()
+            except Exception as e:
+                print(f"⚠️ 載入字體失敗: {e}")
+                font = ImageFont.load_default()
+            self._fonts[key] = font
+        return self._fonts[key]
+
+    def sprite(self, text: str, font_size: int, color,
+               font_path: Optional[str] = None) -> TextSprite:
+        """Get (or rasterize once) the sprite for a message"""
+        key = (font_path, text, font_size, tuple(color))
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        from PIL import Image, ImageDraw
+
+        font = self._font(font_path, font_size)
+        left, top, right, bottom = ImageDraw.Draw(Image.new("L", (1, 1))).textbbox(
+            (0, 0), text, font=font
+        )
+        mask = Image.new("L", (max(right - left, 1), max(bottom - top, 1)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+
+        sprite = TextSprite(
+            alpha=np.asarray(mask, dtype=np.uint16)[:, :, None],
+            color=np.array(color[:3], dtype=np.uint16),
+            offset=(left, top)
+        )
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def draw(self, frame: np.ndarray, text: str, position, font_size: int, color,
+             font_path: Optional[str] = None) -> np.ndarray:
+        """Alpha-blend a cached sprite into the frame in place"""
+        sprite = self.sprite(text, font_size, color, font_path)
+        h, w = frame.shape[:2]
+        sh, sw = sprite.alpha.shape[:2]
+        x0 = position[0] + sprite.offset[0]
+        y0 = position[1] + sprite.offset[1]
+
+        # Clip the sprite to the frame
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + sw, w), min(y0 + sh, h)
+        if fx0 >= fx1 or fy0 >= fy1:
+            return frame
+
+        alpha = sprite.alpha[fy0 - y0:fy1 - y0, fx0 - x0:fx1 - x0]
+        roi = frame[fy0:fy1, fx0:fx1]
+        blended = (roi * (255 - alpha) + sprite.color * alpha + 127) // 255
+        roi[...] = blended.astype(np.uint8)
+        return frame
+
+
+TEXT_CACHE = TextSpriteCache()
+
+
+def put_chinese_text(frame, text, position, font_size, color):
+    """
+    Draw Chinese text on OpenCV frame using cached PIL glyph sprites
+
+    Args:
+        frame: OpenCV image (BGR)
+        text: Text to display
+        position: (x, y) tuple for text position
+        font_size: Font size in pixels
+        color: BGR color tuple (e.g., (255, 0, 0) for blue)
+
+    Returns:
+        Modified frame with text (drawn in place)
+    """
+    return TEXT_CACHE.draw(frame, text, position, font_size, color, font_path=FONT_PATH)
+
+
+def draw_hand_skeleton(frame: np.ndarray, points: np.ndarray,
+                       point_color=(0, 255, 0), line_color=(255, 255, 255)):
+    """
+    Draw one hand from a (21, 3) normalized landmark array
+    以關鍵點陣列繪製手部骨架（取代 mp_drawing.draw_landmarks）
+    """
+    import cv2
+
+    h, w = frame.shape[:2]
+    pixels = (points[:, :2] * (w, h)).astype(np.int32).tolist()
+
+    for start, end in HAND_CONNECTIONS:
+        cv2.line(frame, tuple(pixels[start]), tuple(pixels[end]), line_color, 2)
+    for x, y in pixels:
+        cv2.circle(frame, (x, y), 2, point_color, 2)
+
+
+def draw_text_lines(frame: np.ndarray, lines: Sequence[str], origin: Tuple[int, int],
+                    line_height: int = 18, color=(0, 255, 255)):
+    """Draw small monospace-ish lines (e.g. the stage timing overlay) top-down"""
+    import cv2
+
+    x, y = origin
+    for line in lines:
+        cv2.putText(frame, line, (x, y), cv2.FONT_HERSHEY_PLAIN, 1.0, color, 1)
+        y += line_height
+
+
+def draw_ui_v3(frame, left_result, right_result, game_state: Dict, fps: float,
+               classifier=None, status_text: Optional[str] = None) -> np.ndarray:
+    """Enhanced UI V3 with correct hand labeling and Chinese font support"""
+    import cv2
+
+    h, w = frame.shape[:2]
+
+    # FPS
+    cv2.putText(frame, f"FPS: {fps:.1f}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+    # Left hand (用戶左手 = 畫面左側)
+    if left_result:
+        gesture_text = f"Left: {left_result.gesture.upper()}"
+        cv2.putText(frame, gesture_text, (10, h - 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 100, 100), 3)
+
+        # Show simple binary state [0, 1]
+        finger_state_text = str(left_result.finger_states)
+        cv2.putText(frame, finger_state_text, (10, h - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 200, 200), 2)
+
+    # Right hand (用戶右手 = 畫面右側)
+    if right_result:
+        gesture_text = f"Right: {right_result.gesture.upper()}"
+        cv2.putText(frame, gesture_text, (w - 350, h - 100), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (100, 100, 255), 3)
+
+        # Show simple binary state [0, 1]
+        finger_state_text = str(right_result.finger_states)
+        cv2.putText(frame, finger_state_text, (w - 350, h - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 255), 2)
+
+    # Game state display
+    mode = game_state["mode"]
+
+    if mode == GameMode.LIVE:
+        # Live mode - show instant result if both hands present
+        live_result = game_state["live_result"]
+        if live_result:
+            message = live_result["message"]
+            color = (0, 255, 0) if live_result["result"] == "draw" else (255, 255, 0)
+            # Use Chinese font for result message
+            if FONT_PATH:
+                frame = put_chinese_text(frame, message, (w//2 - 80, h//2 - 40), 60, color)
+            else:
+                cv2.putText(frame, message, (w//2 - 120, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2.0, color, 4)
+
+            # Instruction
+            cv2.putText(frame, "Press SPACE to lock", (w//2 - 150, h//2 + 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
+        else:
+            # Use Chinese font for "顯示雙手"
+            if FONT_PATH:
+                frame = put_chinese_text(frame, "顯示雙手", (w//2 - 80, h//2 - 30), 40, (255, 255, 255))
+            else:
+                cv2.putText(frame, "Show Both Hands", (w//2 - 150, h//2),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+
+    elif mode == GameMode.WAITING:
+        # Countdown mode - waiting for both hands
+        if FONT_PATH:
+            frame = put_chinese_text(frame, "顯示雙手開始", (w//2 - 120, h//2 - 30), 40, (255, 255, 255))
+        else:
+            cv2.putText(frame, "Show both hands to start", (w//2 - 200, h//2),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2)
+
+    elif mode == GameMode.COUNTING:
+        countdown = game_state.get("countdown", 0)
+        if countdown > 0:
+            cv2.putText(frame, str(countdown), (w//2 - 50, h//2),
+                        cv2.FONT_HERSHEY_SIMPLEX, 5.0, (0, 255, 255), 10)
+
+    elif mode == GameMode.LOCKED and not game_state["locked_result"]:
+        # Countdown mode - gestures locked, result not revealed yet
+        cv2.putText(frame, "LOCKED!", (w//2 - 100, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2.0, (0, 255, 255), 3)
+
+    elif mode in (GameMode.LOCKED, GameMode.REVEAL):
+        # Locked / revealed result
+        locked_result = game_state["locked_result"]
+        if locked_result:
+            message = locked_result["message"]
+            color = (0, 255, 0) if locked_result["result"] == "draw" else (0, 255, 255)
+            # Use Chinese font for locked result
+            if FONT_PATH:
+                frame = put_chinese_text(frame, f"🔒 {message}", (w//2 - 120, h//2 - 50), 70, color)
+            else:
+                cv2.putText(frame, f"🔒 {message}", (w//2 - 180, h//2), cv2.FONT_HERSHEY_SIMPLEX, 2.5, color, 5)
+
+            # Show locked gestures
+            locked = game_state["locked_gestures"]
+            cv2.putText(frame, f"L: {locked['left'].upper()}", (50, h//2 + 100),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+            cv2.putText(frame, f"R: {locked['right'].upper()}", (w - 250, h//2 + 100),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 3)
+
+            # Time remaining
+            time_left = game_state["time_remaining"]
+            cv2.putText(frame, f"{time_left:.1f}s", (w//2 - 40, h//2 + 150),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2)
+
+    # Instructions (simplified)
+    cv2.putText(frame, "'q'-quit | SPACE-lock", (10, 60),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 1)
+
+    # Pipeline status (queue depth etc.)
+    if status_text:
+        cv2.putText(frame, status_text, (10, 85),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+
+    return frame
@@ -0,0 +1,167 @@
+"""
+Tests for per-player threshold calibration
+測試玩家閾值校準與 LRU 快取
+"""
+import json
+import math
+
+import numpy as np
+import pytest
+
+from src.calibration import (CALIBRATION_POSES, THRESHOLD_RANGE, CalibrationStore,
+                             ThresholdCalibrator, calibrate_from_session)
+from src.cli import main
+from src.gesture_classifier_v2 import DEFAULT_FINGER_THRESHOLDS, GestureClassifierV2, compile_thresholds
+from src.gestures import Gesture
+from src.landmarks import HAND_RIGHT
+from src.synthetic import GESTURE_FINGER_STATES, POSE_TEMPLATES, Augment, synthesize_session
+
+
+def player_hand(finger_states, straight=170.0, bent=145.0):
+    """Hand whose finger joints all have the given angle (degrees) when straight / bent"""
+    points = POSE_TEMPLATES[Gesture.PAPER].copy()
+    for finger, extended in enumerate(finger_states):
+        base = 1 + 4 * finger
+        bend = math.radians(180.0 - (straight if extended else bent))
+        direction = math.radians(-90.0)
+        point = points[base].copy()
+        for joint in range(1, 4):
+            point = point + 0.05 * np.array([math.cos(direction), math.sin(direction), 0.0])
+            points[base + joint] = point
+            direction += bend
+    return points
+
+
+def pose_hands(gesture, frames=60, seed=0, **player):
+    rng = np.random.default_rng(seed)
+    hand = player_hand(GESTURE_FINGER_STATES[gesture], **player)
+    return (hand + rng.normal(0.0, 0.002, (frames, 21, 3))).astype(np.float32)
+
+
+def calibrated(classifier=None, **player):
+    classifier = classifier or GestureClassifierV2()
+    calibrator = ThresholdCalibrator()
+    for gesture in CALIBRATION_POSES:
+        calibrator.add(gesture, classifier.classify_batch(pose_hands(gesture, **player)).debug_angles)
+    return calibrator
+
+
+class TestThresholdCalibrator:
+    """Thresholds from held poses"""
+
+    def test_loose_player_rock_fixed_by_calibration(self):
+        classifier = GestureClassifierV2()
+        rock = pose_hands("rock", seed=5)
+        # Fingers never fold below 145°: the defaults read this rock as extended fingers
+        assert (classifier.classify_batch(rock).gestures != "rock").all()
+
+        thresholds = calibrated().thresholds()
+        assert all(150.0 < value < 165.0 for value in thresholds.values())
+        compiled = compile_thresholds(thresholds)
+        for gesture in CALIBRATION_POSES:
+            result = classifier.classify_batch(pose_hands(gesture, seed=7), thresholds=compiled)
+            assert (result.gestures == gesture).all()
+            single = classifier.classify(pose_hands(gesture, frames=1, seed=8)[0], thresholds=compiled)
+            assert single.gesture == gesture
+
+    def test_threshold_between_bent_and_extended(self):
+        calibrator = ThresholdCalibrator(min_frames=1)
+        calibrator.add("rock", [[100.0] * 5])
+        calibrator.add("paper", [[160.0] * 5])
+        calibrator.add("scissors", [100.0, 160.0, 160.0, 100.0, 100.0])
+        assert calibrator.thresholds() == {name: 130.0 for name in DEFAULT_FINGER_THRESHOLDS}
+
+    def test_overlap_uses_medians_and_is_clipped(self):
+        calibrator = ThresholdCalibrator(min_frames=3)
+        calibrator.add("rock", np.array([[60.0] * 5, [62.0] * 5, [175.0] * 5]))
+        calibrator.add("paper", np.array([[70.0] * 5, [72.0] * 5, [66.0] * 5]))
+        calibrator.add("scissors", np.array([[60.0, 70.0, 70.0, 60.0, 60.0]] * 3))
+        assert set(calibrator.thresholds().values()) == {THRESHOLD_RANGE[0]}
+
+    def test_needs_frames_of_every_pose(self):
+        calibrator = ThresholdCalibrator(min_frames=10)
+        assert calibrator.add("rock", np.full((10, 5), 100.0)) == 10
+        assert not calibrator.ready
+        with pytest.raises(ValueError):
+            calibrator.thresholds()
+        with pytest.raises(ValueError):
+            calibrator.add("unknown", [0.0] * 5)
+        calibrator.reset()
+        assert calibrator.frames("rock") == 0
+
+    def test_calibrate_from_session(self):
+        session, labels = synthesize_session(900, hold=15, transition=3,
+                                             augment=Augment(noise=0.01, rotation=30.0), seed=3)
+        thresholds = calibrate_from_session(session, labels, HAND_RIGHT)
+        classifier = GestureClassifierV2()
+        result = classifier.classify_batch(session.points[:, 1], thresholds=compile_thresholds(thresholds))
+        held = labels[:, 1] != Gesture.UNKNOWN
+        assert (result.codes[held] == labels[held, 1]).mean() > 0.99
+
+
+class TestCalibrationStore:
+    """Keyed on-disk store with LRU eviction"""
+
+    def test_round_trip_returns_compiled_thresholds(self, tmp_path):
+        path = str(tmp_path / "calibration.json")
+        with CalibrationStore(path) as store:
+            store.put("alice", {"ring": 150.0})
+        again = CalibrationStore(path)
+        compiled = again.get("alice")
+        assert compiled.by_name == {**DEFAULT_FINGER_THRESHOLDS, "ring": 150.0}
+        assert compiled.vector.tolist() == list(compiled.values)
+        assert again.get("bob") is None
+        assert "alice" in again and len(again) == 1
+        assert not (tmp_path / "calibration.json.tmp").exists()
+
+    def test_least_recently_used_is_evicted(self, tmp_path):
+        path = str(tmp_path / "calibration.json")
+        store = CalibrationStore(path, capacity=2)
+        store.put("a", {})
+        store.put("b", {})
+        store.get("a")
+        store.put("c", {})
+        assert store.players == ["a", "c"] and store.evictions == 1
+        assert CalibrationStore(path).players == ["a", "c"]
+        # A smaller capacity trims the file's oldest players on load
+        assert CalibrationStore(path, capacity=1).players == ["c"]
+
+    def test_recency_saved_on_close(self, tmp_path):
+        path = str(tmp_path / "calibration.json")
+        with CalibrationStore(path) as store:
+            store.put("a", {})
+            store.put("b", {})
+        with CalibrationStore(path) as store:
+            store.get("a")
+        assert CalibrationStore(path).players == ["b", "a"]
+
+    def test_remove(self, tmp_path):
+        store = CalibrationStore(str(tmp_path / "calibration.json"))
+        store.put("a", {})
+        assert store.remove("a") and not store.remove("a")
+        assert len(CalibrationStore(store.path)) == 0
+
+    def test_unreadable_file_starts_empty(self, tmp_path):
+        path = tmp_path / "calibration.json"
+        path.write_text('{"players": [["a", {"elbow": 1}]]}', encoding="utf-8")
+        with pytest.warns(UserWarning):
+            store = CalibrationStore(str(path))
+        assert len(store) == 0
+        with pytest.raises(ValueError):
+            CalibrationStore(str(path), capacity=0)
+
+
+class TestCalibrateCommand:
+    """rps-referee calibrate"""
+
+    def test_stores_player(self, tmp_path, capsys):
+        session, labels = tmp_path / "match.npz", tmp_path / "labels.npy"
+        store = tmp_path / "calibration.json"
+        assert main(["synth", str(session), "--frames", "600", "--labels", str(labels)]) == 0
+        capsys.readouterr()
+        assert main(["calibrate", "alice", "--data", str(session), str(labels), "--side", "left",
+                     "--store", str(store), "--min-frames", "20"]) == 0
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["player"] == "alice" and summary["players"] == 1
+        assert set(summary["thresholds"]) == set(DEFAULT_FINGER_THRESHOLDS)
+        assert CalibrationStore(str(store)).get("alice") is not None
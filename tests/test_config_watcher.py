@@ -0,0 +1,96 @@
+"""
+Tests for config hot reload
+測試設定檔熱重載
+"""
+import os
+import time
+
+import pytest
+import yaml
+
+from src.config_watcher import ConfigWatcher
+
+
+def write_config(path, **values):
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(values, f)
+    # Make every write visible even on coarse mtime clocks
+    stamp = time.time_ns() + write_config.bump
+    write_config.bump += 10 ** 9
+    os.utime(path, ns=(stamp, stamp))
+
+
+write_config.bump = 0
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = str(tmp_path / "config.yaml")
+    write_config(path, STABLE_FRAMES=5)
+    return path
+
+
+class TestPoll:
+    """Change detection and validation"""
+
+    def test_load_then_unchanged(self, config_path):
+        watcher = ConfigWatcher(config_path)
+        assert watcher.load().STABLE_FRAMES == 5
+        assert watcher.poll() is None
+        assert watcher.reloads == 0
+
+    def test_reload_notifies_subscribers(self, config_path):
+        seen = []
+        watcher = ConfigWatcher(config_path)
+        watcher.load()
+        watcher.subscribe(seen.append)
+
+        write_config(config_path, STABLE_FRAMES=3, FINGER_THRESHOLDS={"thumb": 100.0})
+        config = watcher.poll()
+        assert config.STABLE_FRAMES == 3
+        assert seen == [config]
+        assert watcher.config is config and watcher.reloads == 1
+
+    def test_invalid_file_keeps_previous_config(self, config_path):
+        watcher = ConfigWatcher(config_path)
+        previous = watcher.load()
+        write_config(config_path, NOT_A_SETTING=1)
+        with pytest.warns(UserWarning, match="keeping previous config"):
+            assert watcher.poll() is None
+        assert watcher.config is previous
+        assert "TypeError" in watcher.error
+
+        write_config(config_path, STABLE_FRAMES=2)
+        assert watcher.poll().STABLE_FRAMES == 2
+        assert watcher.error is None
+
+    def test_failing_subscriber_is_reported(self, config_path):
+        seen = []
+        watcher = ConfigWatcher(config_path)
+        watcher.load()
+        watcher.subscribe(lambda config: 1 / 0)
+        watcher.subscribe(seen.append)
+
+        write_config(config_path, STABLE_FRAMES=3)
+        with pytest.warns(UserWarning, match="ZeroDivisionError"):
+            config = watcher.poll()
+        assert seen == [config] and watcher.reloads == 1
+
+    def test_missing_file_is_ignored(self, tmp_path):
+        watcher = ConfigWatcher(str(tmp_path / "missing.yaml"))
+        assert watcher.poll() is None
+
+
+class TestWatchThread:
+    """Background polling"""
+
+    def test_thread_picks_up_change(self, config_path):
+        seen = []
+        with ConfigWatcher(config_path, interval=0.01) as watcher:
+            watcher.subscribe(seen.append)
+            write_config(config_path, STABLE_FRAMES=7)
+            deadline = time.time() + 5
+            while not seen and time.time() < deadline:
+                time.sleep(0.01)
+        assert seen and seen[0].STABLE_FRAMES == 7
+        assert watcher._thread is None
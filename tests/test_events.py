@@ -0,0 +1,246 @@
+"""
+Tests for the referee event bus and socket server
+測試裁判事件匯流排與 socket 推送
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from src.events import (EventBus, EventServer, GameEventTracker, GestureEvent, LockEvent,
+                        LockExpiredEvent, ResultEvent, connect_events, decode_event, encode_event)
+from src.game_logic import RPSStateMachine, SimpleGameLogic
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def play(frames, lock_at=(), logic=None):
+    """Events for a scripted match: frames of (left, right), SPACE at lock_at indices"""
+    clock = FakeClock()
+    logic = logic or SimpleGameLogic(lock_duration=1.0)
+    logic.clock, tracker = clock, GameEventTracker()
+    events = []
+    for index, (left, right) in enumerate(frames):
+        clock.now = index * 0.25
+        state = logic.update(left, right, index in lock_at)
+        events.extend(tracker.observe(clock.now, left, right, state))
+    return events
+
+
+def run(coroutine, timeout=5.0):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout))
+
+
+async def receive(stream, count):
+    return [await stream.__anext__() for _ in range(count)]
+
+
+async def until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        await asyncio.sleep(0.005)
+
+
+class TestGameEventTracker:
+    """Events from successive game states"""
+
+    def test_match_sequence(self):
+        events = play([("rock", None), ("rock", None), ("rock", "paper"), ("rock", "paper"),
+                       ("rock", "paper"), ("rock", "paper"), ("rock", "paper"), ("rock", "paper"),
+                       ("rock", "paper")], lock_at={3})
+        assert [event.type for event in events] == ["gesture", "gesture", "result", "lock",
+                                                    "lock_expired", "result"]
+        assert events[0] == GestureEvent(0.0, "left", "rock")
+        assert events[2] == ResultEvent(0.5, "rock", "paper", "right", "右手獲勝")
+        assert events[3].duration == 1.0 and events[3].result == "right"
+        assert events[4] == LockExpiredEvent(1.75)
+
+    def test_no_events_without_changes(self):
+        assert play([(None, None)] * 5) == []
+        assert play([("rock", "rock")] * 5)[-1].result == "draw"
+        assert len(play([("rock", "rock")] * 5)) == 3
+
+    def test_hand_lost_clears_result(self):
+        events = play([("rock", "paper"), ("rock", None), ("rock", "paper")])
+        assert [event.type for event in events] == ["gesture", "gesture", "result", "gesture",
+                                                    "gesture", "result"]
+        assert events[3] == GestureEvent(0.25, "right", None)
+
+    def test_countdown_mode(self):
+        machine = RPSStateMachine(countdown=0.5, lock_delay=0.25, reveal_duration=0.5)
+        events = play([("rock", "paper")] * 8, logic=machine)
+        # Counting at 0.0, locked at 0.5, revealed at 0.75, waiting again at 1.25
+        assert [(event.type, event.timestamp) for event in events] == [
+            ("gesture", 0.0), ("gesture", 0.0), ("lock", 0.5), ("result", 0.75), ("lock_expired", 1.25)]
+        assert events[2].result == events[3].result == "right"
+
+    def test_round_trip_through_json(self):
+        for event in play([("rock", "scissors")] * 2, lock_at={1}):
+            assert decode_event(json.loads(encode_event(event))) == event
+        with pytest.raises(ValueError):
+            decode_event({"type": "judgement"})
+
+
+class TestEventBus:
+    """Subscriptions: coalescing, bounds and threads"""
+
+    def test_lagging_subscriber_coalesces_gestures(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=8)
+        for i in range(1000):
+            bus.publish(GestureEvent(float(i), "left", ("rock", "paper")[i % 2]))
+            bus.publish(GestureEvent(float(i), "right", "scissors"))
+        bus.publish(LockEvent(1000.0, "paper", "scissors", "right", "右手獲勝", 3.0))
+        events = subscription.get_nowait()
+        # Only the latest gesture per side survives, ordered by their last update
+        assert events == [GestureEvent(999.0, "left", "paper"), GestureEvent(999.0, "right", "scissors"),
+                          LockEvent(1000.0, "paper", "scissors", "right", "右手獲勝", 3.0)]
+        assert subscription.coalesced == 1998 and subscription.dropped == 0
+        assert bus.published == 2001
+
+    def test_bound_drops_oldest(self):
+        bus = EventBus()
+        subscription = bus.subscribe(maxsize=4, coalesce=False)
+        for i in range(10):
+            bus.publish(GestureEvent(float(i), "left", "rock"))
+        assert [event.timestamp for event in subscription.get_nowait()] == [6.0, 7.0, 8.0, 9.0]
+        assert subscription.dropped == 6 and subscription.delivered == 4
+
+    def test_snapshot_replays_latest_state(self):
+        bus = EventBus()
+        for event in play([("rock", "paper"), ("rock", "scissors")]):
+            bus.publish(event)
+        late = bus.subscribe(snapshot=True)
+        assert [(event.type, getattr(event, "gesture", None)) for event in late.get_nowait()] == [
+            ("gesture", "rock"), ("gesture", "scissors"), ("result", None)]
+        assert late.get_nowait() == [] and bus.subscribe().get_nowait() == []
+
+    def test_publish_from_another_thread(self):
+        async def main():
+            bus = EventBus()
+            bus.attach()
+            subscription = bus.subscribe(coalesce=False)
+            publisher = threading.Thread(target=lambda: [
+                bus.publish(GestureEvent(float(i), "left", "rock")) for i in range(50)])
+            publisher.start()
+            received = [event.timestamp async for event in _take(subscription, 50)]
+            publisher.join()
+            subscription.close()
+            assert [event async for event in subscription] == []
+            assert bus.subscribers == 0
+            return received
+
+        assert run(main()) == [float(i) for i in range(50)]
+
+    def test_background_loop(self):
+        with EventBus() as bus:
+            assert bus.start() is bus.loop
+            subscription = bus.run(_subscribe(bus)).result(1.0)
+            bus.publish_all(play([("rock", "paper")]))
+            events = bus.run(subscription.next_batch()).result(1.0)
+            assert [event.type for event in events] == ["gesture", "gesture", "result"]
+        assert subscription.closed and bus.loop is None
+
+
+async def _subscribe(bus):
+    return bus.subscribe()
+
+
+async def _take(subscription, count):
+    for _ in range(count):
+        yield await subscription.__anext__()
+
+
+class TestEventServer:
+    """Fan-out to in-process socket clients"""
+
+    def test_unix_socket_fans_out_to_every_client(self, tmp_path):
+        path = str(tmp_path / "events.sock")
+
+        async def main():
+            bus = EventBus()
+            server = await EventServer(bus, path=path).start()
+            clients = [connect_events(path) for _ in range(3)]
+            first = asyncio.ensure_future(clients[0].__anext__())
+            await until(lambda: server.clients == 1)
+            bus.publish(GestureEvent(0.0, "left", "rock"))
+            assert await first == GestureEvent(0.0, "left", "rock")
+            # Late joiners start from the current state
+            pending = [asyncio.ensure_future(client.__anext__()) for client in clients[1:]]
+            assert await asyncio.gather(*pending) == [GestureEvent(0.0, "left", "rock")] * 2
+
+            match = play([("rock", "paper")] * 3, lock_at={2})[1:]
+            bus.publish_all(match)
+            received = await asyncio.gather(*(receive(client, len(match)) for client in clients))
+            assert received == [match] * 3
+
+            await clients[0].aclose()
+            await until(lambda: server.clients == 2 and bus.subscribers == 2)
+            await server.close()
+            assert bus.subscribers == 0 and server.connected == 3
+            for client in clients[1:]:
+                with pytest.raises(StopAsyncIteration):
+                    await client.__anext__()
+
+        run(main())
+
+    def test_slow_client_does_not_hold_back_others(self, tmp_path):
+        path = str(tmp_path / "events.sock")
+
+        async def main():
+            bus = EventBus()
+            server = await EventServer(bus, path=path, buffer=16).start()
+            stalled = await asyncio.open_unix_connection(path)   # never reads
+            fast = connect_events(path)
+
+            async def consume():
+                received = [await fast.__anext__()]
+                while not isinstance(received[-1], LockEvent):
+                    received.append(await fast.__anext__())
+                return received
+
+            consumer = asyncio.ensure_future(consume())
+            await until(lambda: server.clients == 2)
+            # ~2 MB of results: more than the stalled socket and its transport buffer hold
+            for i in range(20000):
+                bus.publish(ResultEvent(float(i), "rock", "paper", "right", "x" * 1000))
+                if i % 10 == 0:
+                    await asyncio.sleep(0)
+            bus.publish(LockEvent(20000.0, "paper", "rock", "left", "左手獲勝", 3.0))
+
+            received = await consumer
+            assert received[-1].timestamp == 20000.0
+            assert received[-2].timestamp == 19999.0
+            # The stalled client is parked in drain() with a bounded, coalesced backlog
+            backlog = [sub for sub in server._clients.values() if len(sub)]
+            assert len(backlog) == 1 and len(backlog[0]) <= 16 and backlog[0].coalesced > 0
+            stalled[1].close()
+            await fast.aclose()
+            await server.close()
+
+        run(main(), timeout=20.0)
+
+    def test_tcp(self):
+        async def main():
+            bus = EventBus()
+            server = await EventServer(bus, port=0).start()
+            host, port = server.address
+            client = connect_events(host=host, port=port)
+            first = asyncio.ensure_future(client.__anext__())
+            await until(lambda: server.clients == 1)
+            bus.publish(LockExpiredEvent(1.0))
+            assert await first == LockExpiredEvent(1.0)
+            await server.close()
+            await client.aclose()
+
+        run(main())
+
@@ -0,0 +1,268 @@
+"""
+Tests for V3 game logic
+測試 V3 即時判定遊戲邏輯
+"""
+import numpy as np
+import pytest
+
+import src.game_logic as game_logic
+from config import RPSConfig
+from src.game_logic import (GAME_MODES, MODE_CODES, GameEngine, GameMode, ReplayClock, RPSStateMachine,
+                            SimpleGameLogic, SystemClock)
+from src.gestures import GESTURE_LABELS, Gesture
+from src.judge import Result
+
+
+@pytest.fixture
+def clock():
+    """Injected, manually advanced clock"""
+    return ReplayClock(1000.0)
+
+
+def displayed(state):
+    """(mode, left, right) codes of what a tick's state shows (GameTimeline layout)"""
+    mode = state["mode"]
+    if mode == GameMode.LIVE and state["live_result"] is not None:
+        return MODE_CODES[mode], state["shown"][0], state["shown"][1]
+    if state["locked_result"] is not None:
+        locked = state["locked_gestures"]
+        return MODE_CODES[mode], Gesture.parse(locked["left"]), Gesture.parse(locked["right"])
+    return MODE_CODES[mode], 0, 0
+
+
+def tick_all(engine, timestamps, left, right, space=None, stability=None):
+    states = []
+    for i, now in enumerate(timestamps.tolist()):
+        left_gesture = GESTURE_LABELS[left[i]] if left[i] else None
+        right_gesture = GESTURE_LABELS[right[i]] if right[i] else None
+        state = engine.tick(now, left_gesture, right_gesture,
+                            bool(space[i]) if space is not None else False,
+                            float(stability[i]) if stability is not None else 1.0)
+        states.append(displayed(dict(state, shown=(left[i], right[i]))))
+    return np.array(states, dtype=np.int8).reshape(-1, 3)
+
+
+def random_match(frames, seed, present=0.9, hold=20):
+    """Held gestures with dropouts, jittered ~30 FPS timestamps"""
+    rng = np.random.default_rng(seed)
+    held = np.repeat(rng.integers(1, 4, size=(2, frames // hold + 1)), hold, axis=1)[:, :frames]
+    codes = np.where(rng.random((2, frames)) < present, held, 0).astype(np.int8)
+    timestamps = np.cumsum(rng.uniform(0.02, 0.05, frames))
+    # Exact boundary hits: repeated and rounded timestamps
+    timestamps[frames // 2:frames // 2 + 5] = timestamps[frames // 2]
+    return np.round(timestamps, 2), codes[0], codes[1]
+
+
+class TestSimpleGameLogic:
+    """Test live / locked transitions"""
+
+    def test_live_result_when_both_hands(self, clock):
+        logic = SimpleGameLogic(clock=clock)
+        state = logic.update("rock", "scissors")
+
+        assert state["mode"] == GameMode.LIVE
+        assert state["live_result"] == {"result": "left", "message": "左手獲勝"}
+        assert state["time_remaining"] == 0
+
+    def test_no_result_with_one_hand(self, clock):
+        state = SimpleGameLogic(clock=clock).update("rock", None)
+        assert state["live_result"] is None
+
+    def test_space_locks_then_expires(self, clock):
+        logic = SimpleGameLogic(lock_duration=3.0, clock=clock)
+        state = logic.update("paper", "rock", space_pressed=True)
+
+        assert state["mode"] == GameMode.LOCKED
+        assert state["locked_gestures"] == {"left": "paper", "right": "rock"}
+        assert state["live_result"] is None
+
+        clock.advance(1.0)
+        state = logic.update("scissors", "scissors")
+        assert state["mode"] == GameMode.LOCKED
+        assert state["time_remaining"] == pytest.approx(2.0)
+
+        clock.advance(2.0)
+        state = logic.update("scissors", "scissors")
+        assert state["mode"] == GameMode.LIVE
+        assert state["locked_result"] is None
+        assert state["live_result"]["result"] == "draw"
+
+    def test_space_ignored_without_both_hands(self, clock):
+        state = SimpleGameLogic(clock=clock).update("rock", None, space_pressed=True)
+        assert state["mode"] == GameMode.LIVE
+
+    def test_gesture_codes_match_labels(self, clock):
+        by_code = SimpleGameLogic(clock=clock).update(Gesture.PAPER, Gesture.ROCK, space_pressed=True)
+        by_label = SimpleGameLogic(clock=clock).update("paper", "rock", space_pressed=True)
+        assert by_code == by_label
+        assert by_code["locked_gestures"] == {"left": "paper", "right": "rock"}
+        # UNKNOWN is no gesture, like 0 in run()
+        assert SimpleGameLogic(clock=clock).update(Gesture.UNKNOWN, Gesture.ROCK)["live_result"] is None
+
+
+class TestInjectedClock:
+    """SimpleGameLogic reads time only through its clock"""
+
+    def test_clock_drives_lock_expiry(self):
+        now = [0.0]
+        logic = SimpleGameLogic(lock_duration=2.0, clock=lambda: now[0])
+        logic.update("rock", "paper", space_pressed=True)
+
+        now[0] = 1.5
+        assert logic.update(None, None)["time_remaining"] == pytest.approx(0.5)
+        now[0] = 2.0
+        assert logic.update(None, None)["mode"] == GameMode.LIVE
+
+    def test_default_clock_is_monotonic(self, monkeypatch):
+        monkeypatch.setattr(game_logic.time, "time", lambda: pytest.fail("wall clock read"))
+        logic = SimpleGameLogic()
+        assert isinstance(logic.clock, SystemClock)
+        assert logic.update("rock", "paper")["mode"] == GameMode.LIVE
+
+    def test_tick_ignores_clock(self):
+        logic = SimpleGameLogic(lock_duration=1.0, clock=lambda: pytest.fail("clock read"))
+        logic.tick(10.0, "rock", "paper", space_pressed=True)
+        assert logic.tick(11.0, None, None)["mode"] == GameMode.LIVE
+
+    def test_replay_clock_advance(self):
+        clock = ReplayClock(5.0)
+        assert clock.advance(0.5) == clock() == 5.5
+
+
+class TestLockStability:
+    """SPACE respects min_lock_stability"""
+
+    def test_unstable_gestures_do_not_lock(self, clock):
+        logic = SimpleGameLogic(min_lock_stability=0.8, clock=clock)
+
+        assert logic.update("rock", "paper", True, stability=0.6)["mode"] == GameMode.LIVE
+        assert logic.update("rock", "paper", True, stability=0.8)["mode"] == GameMode.LOCKED
+
+    def test_threshold_from_config(self, clock):
+        logic = GameEngine.from_config(RPSConfig(MIN_LOCK_STABILITY=0.9), clock=clock)
+        assert logic.min_lock_stability == 0.9
+        assert logic.update("rock", "paper", True, stability=0.8)["mode"] == GameMode.LIVE
+        assert logic.update("rock", "paper", True, stability=0.9)["mode"] == GameMode.LOCKED
+
+
+class TestRPSStateMachine:
+    """Countdown mode: waiting → counting → locked → reveal"""
+
+    def test_full_round(self, clock):
+        machine = RPSStateMachine(countdown=3.0, lock_delay=1.0, reveal_duration=2.0, clock=clock)
+        assert machine.update("rock", None)["mode"] == GameMode.WAITING
+
+        state = machine.update("rock", "paper")
+        assert state["mode"] == GameMode.COUNTING and state["countdown"] == 3
+        clock.advance(1.5)
+        state = machine.update("scissors", "paper")
+        assert state["countdown"] == 2 and state["time_remaining"] == pytest.approx(1.5)
+
+        clock.advance(1.5)
+        state = machine.update("scissors", "paper")
+        assert state["mode"] == GameMode.LOCKED
+        assert state["locked_gestures"] == {"left": "scissors", "right": "paper"}
+        assert state["locked_result"] is None             # judged at the reveal
+
+        clock.advance(1.0)
+        state = machine.update(None, None)
+        assert state["mode"] == GameMode.REVEAL
+        assert state["locked_result"] == {"result": "left", "message": "左手獲勝"}
+        assert state["live_result"] is None
+
+        clock.advance(2.0)
+        state = machine.update("rock", "rock")
+        assert state["mode"] == GameMode.WAITING and state["locked_result"] is None
+        assert machine.update("rock", "rock")["mode"] == GameMode.COUNTING
+
+    def test_dropped_hand_restarts_countdown(self, clock):
+        machine = RPSStateMachine(clock=clock)
+        machine.update("rock", "paper")
+        clock.advance(2.9)
+        assert machine.update("rock", None)["mode"] == GameMode.WAITING
+        clock.advance(0.2)
+        assert machine.update("rock", "paper")["countdown"] == 3
+
+    def test_reset(self, clock):
+        machine = RPSStateMachine(clock=clock)
+        machine.update("rock", "paper")
+        machine.reset()
+        assert machine.mode == GameMode.WAITING
+
+
+class TestFromConfig:
+    """GAME_MODE selects the engine"""
+
+    def test_modes(self):
+        logic = GameEngine.from_config(RPSConfig(REVEAL_DURATION=2.0))
+        assert isinstance(logic, SimpleGameLogic) and logic.lock_duration == 2.0
+
+        clock = ReplayClock()
+        machine = GameEngine.from_config(RPSConfig(GAME_MODE="countdown", COUNTDOWN=2.0, LOCK_DELAY=0.5),
+                                         clock=clock)
+        assert isinstance(machine, RPSStateMachine) and machine.clock is clock
+        assert (machine.countdown_duration, machine.lock_delay, machine.reveal_duration) == (2.0, 0.5, 3.0)
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            GameEngine.from_config(RPSConfig(GAME_MODE="tournament"))
+
+    def test_engine_interface_is_abstract(self):
+        class TickOnly(GameEngine):
+            def tick(self, now, left_gesture, right_gesture, space_pressed=False, stability=1.0):
+                return {}
+
+        with pytest.raises(TypeError):
+            GameEngine()
+        with pytest.raises(TypeError, match="_run"):
+            TickOnly()
+
+
+class TestBatchRun:
+    """GameEngine.run matches tick() frame by frame"""
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_live_matches_ticks(self, seed):
+        timestamps, left, right = random_match(3000, seed)
+        rng = np.random.default_rng(seed)
+        space = rng.random(3000) < 0.02
+        stability = rng.random(3000)
+        for engine in (SimpleGameLogic(lock_duration=1.0), SimpleGameLogic(0.5, min_lock_stability=0.5)):
+            timeline = engine.run(timestamps, left, right, space, stability)
+            expected = tick_all(type(engine)(engine.lock_duration,
+                                             min_lock_stability=engine.min_lock_stability),
+                                timestamps, left, right, space, stability)
+            np.testing.assert_array_equal(np.stack([timeline.modes, timeline.left, timeline.right], axis=1),
+                                          expected)
+            assert (timeline.modes == MODE_CODES[GameMode.LOCKED]).any()
+
+    @pytest.mark.parametrize("seed", range(4))
+    def test_countdown_matches_ticks(self, seed):
+        timestamps, left, right = random_match(3000, seed, present=0.995, hold=40)
+        engine = RPSStateMachine(countdown=1.0, lock_delay=0.2, reveal_duration=0.5)
+        timeline = engine.run(timestamps, left, right)
+        expected = tick_all(RPSStateMachine(1.0, 0.2, 0.5), timestamps, left, right)
+        np.testing.assert_array_equal(np.stack([timeline.modes, timeline.left, timeline.right], axis=1),
+                                      expected)
+        assert (timeline.modes == MODE_CODES[GameMode.REVEAL]).any()
+        assert (timeline.results[timeline.modes == MODE_CODES[GameMode.REVEAL]] != Result.INVALID).all()
+        # The engine's own live state is untouched by run()
+        assert engine.mode == GameMode.WAITING
+
+    def test_boundaries_on_exact_durations(self):
+        timestamps = np.arange(10) * 0.1              # 0.1 steps do not add up exactly
+        both = np.full(10, Gesture.ROCK, dtype=np.int8)
+        space = np.zeros(10, dtype=bool)
+        space[1] = True
+        timeline = SimpleGameLogic(lock_duration=0.3).run(timestamps, both, both, space)
+        expected = tick_all(SimpleGameLogic(lock_duration=0.3), timestamps, both, both, space)
+        assert timeline.modes.tolist() == expected[:, 0].tolist()
+
+    def test_validation_and_empty(self):
+        engine = SimpleGameLogic()
+        assert len(engine.run([], [], [])) == 0
+        with pytest.raises(ValueError):
+            engine.run([0.0, 1.0], [1], [1, 1])
+        with pytest.raises(ValueError):
+            engine.run([1.0, 0.0], [1, 1], [1, 1])
+        assert [mode.value for mode in GAME_MODES][:2] == ["live", "locked"]
@@ -55,6 +55,31 @@ class TestGestureClassifierAngleCalculation:
         assert 0 <= angle <= 180  # Valid angle range
 
 
+class TestGestureClassifierAngleMode3D:
+    """Test the optional 3D angle mode"""
+
+    def test_depth_bend_detected(self):
+        """Test a finger folded toward the camera reads as folded only in 3D"""
+        from src.synthetic import POSE_TEMPLATES
+        hand = POSE_TEMPLATES[2].copy()   # paper
+        # Fold the index finger straight toward the camera (invisible in x/y)
+        hand[7:9, 2] = -0.1
+        hand[7:9, :2] = hand[6, :2]
+
+        assert GestureClassifier(angle_mode="3d").classify(hand).finger_states == [1, 0, 1, 1, 1]
+
+    def test_flat_hands_unchanged(self):
+        """Test 3D mode agrees with 2D when z is zero"""
+        from src.synthetic import POSE_TEMPLATES
+        for hand in POSE_TEMPLATES[1:]:
+            assert (GestureClassifier(angle_mode="3d").classify(hand)
+                    == GestureClassifier().classify(hand))
+
+    def test_invalid_mode(self):
+        with pytest.raises(ValueError):
+            GestureClassifier(angle_mode="xyz")
+
+
 class TestGestureClassifierFingerStates:
     """Test finger state computation"""
 
@@ -2,9 +2,16 @@
 Tests for GestureClassifier V2
 測試改進版手勢分類器
 """
+import itertools
+
+import numpy as np
 import pytest
 from dataclasses import dataclass
-from src.gesture_classifier_v2 import GestureClassifierV2, GestureResult
+from src.gesture_classifier_v2 import (
+    GestureClassifierV2, GestureResult, BatchGestureResult, FINGER_NAMES,
+    build_gesture_table, pack_finger_states, pack_finger_states_batch, _match_rules,
+    compile_thresholds, DEFAULT_FINGER_THRESHOLDS
+)
 
 
 @dataclass
@@ -139,6 +146,165 @@ class TestGestureClassifierV2DebugMode:
         assert "信心" in debug_text
 
 
+class TestGestureResultSlots:
+    """Slotted, reusable GestureResult"""
+
+    def hand(self, extended):
+        return np.array([[lm.x, lm.y, lm.z] for lm in
+                         TestGestureClassifierV2Integration().create_mock_landmarks(extended)], dtype=np.float32)
+
+    def test_no_instance_dict(self):
+        result = GestureResult("rock", [0, 0, 0, 0, 0], 1.0, [0.0] * 5)
+        assert not hasattr(result, "__dict__")
+        with pytest.raises(AttributeError):
+            result.extra = 1
+
+    def test_shared_finger_names(self):
+        classifier = GestureClassifierV2()
+        a = classifier.classify(self.hand([False] * 5))
+        b = classifier.classify(self.hand([True] * 5))
+        assert a.finger_names is b.finger_names is FINGER_NAMES
+
+    def test_packed_states_and_list_views(self):
+        result = GestureResult("scissors", [0, 1, 1, 0, 0], 0.9, (1.0, 2.0, 3.0, 4.0, 5.0))
+        assert result.mask == 0b00110
+        assert result.finger_states == [0, 1, 1, 0, 0]
+        assert isinstance(result.debug_angles, list)
+        assert result.finger_states is result.finger_states   # built once
+
+        result.finger_states = [1, 1, 1, 1, 1]
+        assert result.mask == 31 and result.finger_states == [1] * 5
+        assert GestureResult("paper", mask=31) == GestureResult("paper", [1] * 5)
+
+    def test_reuse_matches_new_result(self):
+        classifier = GestureClassifierV2()
+        out = GestureResult("unknown")
+        for extended in ([False] * 5, [True] * 5, [False, True, True, False, False]):
+            hand = self.hand(extended)
+            reused = classifier.classify(hand, out=out)
+            assert reused is out
+            fresh = classifier.classify(hand)
+            assert reused == fresh
+            assert reused.finger_states == fresh.finger_states
+
+    def test_reuse_allocates_nothing_retained(self):
+        import tracemalloc
+        classifier = GestureClassifierV2()
+        hand = self.hand([False, True, True, False, False])
+        out = classifier.classify(hand)
+        classifier.classify(hand, out=out)
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        for _ in range(200):
+            classifier.classify(hand, out=out)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+        assert blocks < 20
+
+
+class TestCompiledThresholds:
+    """Thresholds compiled once and swapped in on change"""
+
+    def test_read_only_view(self):
+        classifier = GestureClassifierV2()
+        with pytest.raises(TypeError):
+            classifier.finger_thresholds["thumb"] = 100.0
+
+    def test_partial_update_merges_and_recompiles(self):
+        classifier = GestureClassifierV2()
+        classifier.finger_thresholds = {"thumb": 100.0, "pinky": 150.0}
+        assert dict(classifier.finger_thresholds) == {
+            "thumb": 100.0, "index": 140.0, "middle": 140.0, "ring": 135.0, "pinky": 150.0}
+        assert classifier._thresholds.vector.tolist() == [100.0, 140.0, 140.0, 135.0, 150.0]
+        assert not classifier._thresholds.vector.flags.writeable
+
+    def test_invalid_fingers_rejected(self):
+        classifier = GestureClassifierV2()
+        with pytest.raises(ValueError):
+            classifier.finger_thresholds = {"toe": 100.0}
+        with pytest.raises(ValueError):
+            compile_thresholds({"thumb": 100.0})
+        assert classifier.finger_thresholds["thumb"] == 120.0
+
+    def test_new_thresholds_apply_to_both_paths(self):
+        helper = TestGestureClassifierV2Integration()
+        hand = np.array([[lm.x, lm.y, lm.z] for lm in helper.create_mock_landmarks([True] * 5)],
+                        dtype=np.float32)
+        classifier = GestureClassifierV2()
+        assert classifier.classify(hand).gesture == "paper"
+
+        classifier.finger_thresholds = {name: 180.0 for name in DEFAULT_FINGER_THRESHOLDS}
+        single = classifier.classify(hand)
+        batch = classifier.classify_batch(hand[None])
+        assert single.finger_states == [0, 0, 0, 0, 0]
+        assert batch.finger_states[0].tolist() == single.finger_states
+
+    def test_debug_info_uses_current_thresholds(self):
+        classifier = GestureClassifierV2(debug_mode=True)
+        classifier.finger_thresholds = {"thumb": 111.0}
+        result = GestureResult("rock", [0, 0, 0, 0, 0], 1.0, [0.0] * 5)
+        assert "閾值111°" in classifier.get_debug_info(result)
+
+    def test_from_config(self):
+        from config import RPSConfig
+        config = RPSConfig(FINGER_THRESHOLDS={"index": 150.0}, FUZZY_MATCHING=False)
+        classifier = GestureClassifierV2.from_config(config)
+        assert classifier.finger_thresholds["index"] == 150.0
+        assert classifier.finger_thresholds["thumb"] == 120.0
+        assert classifier._gesture_table is build_gesture_table(False)
+
+    def test_invalid_config_applies_nothing(self):
+        from config import RPSConfig
+        classifier = GestureClassifierV2()
+        settings = classifier._settings
+        for config in (RPSConfig(FINGER_THRESHOLDS={"index": 150.0}, FUZZY_MATCHING=False, ANGLE_MODE="4d"),
+                       RPSConfig(FINGER_THRESHOLDS={"toe": 100.0}, FUZZY_MATCHING=False)):
+            with pytest.raises(ValueError):
+                classifier.apply_config(config)
+            assert classifier._settings is settings
+        assert classifier.use_fuzzy_matching and classifier.finger_thresholds["index"] == 140.0
+
+
+class TestAngleMode3D:
+    """3D joint angles (robust to hands tilted toward the camera)"""
+
+    def test_tilted_hands_keep_their_labels(self):
+        from src.synthetic import Augment, random_hands
+        codes, points = next(random_hands(2000, Augment(rotation=30.0, tilt=70.0)))
+        flat = GestureClassifierV2().classify_batch(points).codes
+        tilted = GestureClassifierV2(angle_mode="3d").classify_batch(points).codes
+        assert (tilted == codes).all()
+        assert (flat == codes).mean() < 0.95
+
+    def test_single_and_batch_paths_agree(self):
+        from src.synthetic import Augment, random_hands
+        _, points = next(random_hands(50, Augment(noise=0.01, tilt=40.0), seed=4))
+        classifier = GestureClassifierV2(angle_mode="3d")
+        batch = classifier.classify_batch(points)
+        for hand, code, angles in zip(points, batch.codes, batch.debug_angles):
+            single = classifier.classify(hand)
+            assert single.code == code
+            np.testing.assert_allclose(single.debug_angles, angles, atol=1e-2)
+            objects = [MockLandmark(*map(float, point)) for point in hand]
+            assert classifier.classify(objects) == single
+
+    def test_flat_hands_match_2d(self):
+        helper = TestGestureClassifierV2Integration()
+        hand = helper.create_mock_landmarks([False, True, True, False, False])
+        assert GestureClassifierV2(angle_mode="3d").classify(hand).gesture == "scissors"
+
+    def test_mode_validated_and_configurable(self):
+        from config import RPSConfig
+        with pytest.raises(ValueError):
+            GestureClassifierV2(angle_mode="4d")
+        classifier = GestureClassifierV2.from_config(RPSConfig(ANGLE_MODE="3d"))
+        assert classifier.angle_mode == "3d"
+        classifier.apply_config(RPSConfig())
+        assert classifier.angle_mode == "2d"
+
+
 class TestGestureClassifierV2Compatibility:
     """Test backward compatibility"""
 
@@ -223,6 +389,133 @@ class TestGestureClassifierV2Integration:
         assert result.gesture == "scissors"
 
 
+class TestGestureClassifierV2GestureTable:
+    """Test precompiled 32-entry gesture lookup table"""
+
+    ALL_PATTERNS = [list(p) for p in itertools.product([0, 1], repeat=5)]
+
+    def test_pack_finger_states(self):
+        """Test bitmask packing (thumb = bit 0)"""
+        assert pack_finger_states([0, 0, 0, 0, 0]) == 0
+        assert pack_finger_states([1, 0, 0, 0, 0]) == 1
+        assert pack_finger_states([0, 0, 0, 0, 1]) == 16
+        assert pack_finger_states([1, 1, 1, 1, 1]) == 31
+
+    def test_pack_batch_matches_scalar(self):
+        """Test batch packing agrees with scalar packing"""
+        masks = pack_finger_states_batch(np.array(self.ALL_PATTERNS, dtype=np.uint8))
+        assert masks.tolist() == [pack_finger_states(p) for p in self.ALL_PATTERNS]
+
+    @pytest.mark.parametrize("fuzzy", [True, False])
+    def test_table_matches_rules(self, fuzzy):
+        """Test every table entry equals the reference rule cascade"""
+        table = build_gesture_table(fuzzy)
+
+        assert len(table.gestures) == 32
+        for pattern in self.ALL_PATTERNS:
+            mask = pack_finger_states(pattern)
+            assert table.gestures[mask] == _match_rules(pattern, fuzzy)
+
+    def test_table_confidences(self):
+        """Test confidences: unknown 0.5, fuzzy 0.85, exact 1.0"""
+        fuzzy = build_gesture_table(True)
+        exact = build_gesture_table(False)
+
+        assert fuzzy.confidences[0] == 0.85
+        assert exact.confidences[0] == 1.0
+        assert fuzzy.confidences[pack_finger_states([1, 0, 1, 0, 1])] == 0.5
+        assert exact.confidences[pack_finger_states([1, 0, 0, 0, 0])] == 0.5
+
+    def test_table_built_once_per_config(self):
+        """Test classifiers with the same config share one read-only table"""
+        a = GestureClassifierV2(use_fuzzy_matching=True)
+        b = GestureClassifierV2(use_fuzzy_matching=True)
+
+        assert a._gesture_table is b._gesture_table
+        assert not a._gesture_table.codes.flags.writeable
+
+    def test_toggle_fuzzy_swaps_table(self):
+        """Test changing use_fuzzy_matching switches the table"""
+        classifier = GestureClassifierV2(use_fuzzy_matching=True)
+        assert classifier._fuzzy_match_gesture([1, 0, 0, 0, 0]) == "rock"
+
+        classifier.use_fuzzy_matching = False
+        assert classifier._fuzzy_match_gesture([1, 0, 0, 0, 0]) == "unknown"
+
+
+class TestGestureClassifierV2Batch:
+    """Test vectorized classify_batch against the per-hand path"""
+
+    ALL_PATTERNS = [list(p) for p in itertools.product([0, 1], repeat=5)]
+
+    def to_array(self, landmarks):
+        """Convert MockLandmark list to a (21, 3) float32 array"""
+        return np.array([[lm.x, lm.y, lm.z] for lm in landmarks], dtype=np.float32)
+
+    def from_array(self, hand):
+        """Convert a (21, 3) array back to MockLandmark list"""
+        return [MockLandmark(float(x), float(y), float(z)) for x, y, z in hand]
+
+    @pytest.mark.parametrize("fuzzy", [True, False])
+    def test_batch_matching_all_32_patterns(self, fuzzy):
+        """Test batch matcher agrees with the rule cascade on every finger pattern"""
+        classifier = GestureClassifierV2(use_fuzzy_matching=fuzzy)
+        codes, _ = classifier._match_gesture_batch(np.array(self.ALL_PATTERNS, dtype=np.uint8))
+        batch = [["unknown", "rock", "paper", "scissors"][c] for c in codes]
+
+        assert batch == [_match_rules(p, fuzzy) for p in self.ALL_PATTERNS]
+
+    @pytest.mark.parametrize("fuzzy", [True, False])
+    def test_batch_matches_per_hand_path(self, fuzzy):
+        """Test batch output equals classify() on the same hands"""
+        classifier = GestureClassifierV2(use_fuzzy_matching=fuzzy)
+        helper = TestGestureClassifierV2Integration()
+
+        rng = np.random.default_rng(0)
+        hands = []
+        for pattern in self.ALL_PATTERNS:
+            base = self.to_array(helper.create_mock_landmarks([bool(v) for v in pattern]))
+            hands.append(base)
+            hands.append(base + rng.normal(0, 0.01, base.shape).astype(np.float32))
+        landmarks = np.stack(hands)
+
+        batch = classifier.classify_batch(landmarks)
+
+        assert isinstance(batch, BatchGestureResult)
+        assert len(batch) == len(hands)
+        for i, hand in enumerate(landmarks):
+            single = classifier.classify(self.from_array(hand))
+            assert batch.gestures[i] == single.gesture
+            assert batch.codes[i] == single.code
+            assert batch.finger_states[i].tolist() == single.finger_states
+            assert batch.confidences[i] == single.confidence
+            assert np.allclose(batch.debug_angles[i], single.debug_angles)
+
+    def test_batch_output_shapes(self):
+        """Test batch result array shapes"""
+        classifier = GestureClassifierV2()
+        batch = classifier.classify_batch(np.zeros((7, 21, 3), dtype=np.float32))
+
+        assert batch.gestures.shape == (7,)
+        assert batch.finger_states.shape == (7, 5)
+        assert batch.confidences.shape == (7,)
+        assert batch.debug_angles.shape == (7, 5)
+
+    def test_batch_empty(self):
+        """Test batch of zero hands"""
+        classifier = GestureClassifierV2()
+        batch = classifier.classify_batch(np.zeros((0, 21, 3), dtype=np.float32))
+
+        assert len(batch) == 0
+
+    def test_batch_rejects_bad_shape(self):
+        """Test wrong input shape raises ValueError"""
+        classifier = GestureClassifierV2()
+
+        with pytest.raises(ValueError):
+            classifier.classify_batch(np.zeros((4, 20, 3), dtype=np.float32))
+
+
 # Run tests
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
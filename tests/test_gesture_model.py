@@ -0,0 +1,238 @@
+"""
+Tests for the learned gesture backend
+測試學習式手勢模型後端
+"""
+import json
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from config import RPSConfig
+from src.cli import main
+from src.gesture_classifier_v2 import GestureBackend, GestureClassifierV2, GestureResult
+from src.gesture_model import (GestureModel, calibration_error, fit_temperature, hand_features,
+                               softmax, train_gesture_model, training_data)
+from src.gestures import Gesture
+from src.synthetic import Augment, POSE_TEMPLATES, synthesize_session, transform_hands
+
+TILTED = Augment(noise=0.01, rotation=40.0, tilt=50.0, scale=(0.6, 1.4), shift=0.2, occlusion=0.1)
+
+
+@dataclass
+class MockLandmark:
+    x: float
+    y: float
+    z: float = 0.0
+
+
+def labelled_hands(frames, seed):
+    session, labels = synthesize_session(frames, hold=12, transition=4, augment=TILTED, seed=seed)
+    return training_data(session, labels)
+
+
+@pytest.fixture(scope="module")
+def trained():
+    points, labels = labelled_hands(6000, seed=1)
+    return train_gesture_model(points, labels, hidden=32, epochs=15)
+
+
+@pytest.fixture(scope="module")
+def held_out():
+    return labelled_hands(1500, seed=9)
+
+
+def reference_probabilities(model, points):
+    """Plain forward pass over hand_features, without the folded kernel"""
+    h = hand_features(points).astype(np.float64)
+    for i, (w, b) in enumerate(model.layers):
+        h = h @ w + b
+        if i < len(model.layers) - 1:
+            h = np.maximum(h, 0.0)
+    return softmax(h / model.temperature)
+
+
+class TestHandFeatures:
+    """Normalization into the hand frame"""
+
+    def test_invariant_to_position_rotation_and_size(self):
+        hands = POSE_TEMPLATES[[Gesture.ROCK, Gesture.PAPER, Gesture.SCISSORS]].copy()
+        moved = transform_hands(hands.copy(), np.radians([30.0, -75.0, 160.0]),
+                                np.array([0.5, 1.7, 1.1]), np.array([[0.2, -0.1], [0.0, 0.3], [-0.3, 0.1]]))
+        np.testing.assert_allclose(hand_features(moved), hand_features(hands), atol=1e-5)
+
+    def test_middle_mcp_points_up_at_unit_length(self):
+        # Image coordinates: up is -y
+        features = hand_features(POSE_TEMPLATES).reshape(-1, 20, 3)
+        np.testing.assert_allclose(features[:, 8], [[0.0, -1.0, 0.0]] * 4, atol=1e-6)
+
+    def test_degenerate_hand_is_finite(self):
+        assert np.isfinite(hand_features(np.zeros((2, 21, 3)))).all()
+
+    def test_bad_shape(self):
+        with pytest.raises(ValueError):
+            hand_features(np.zeros((5, 20, 3)))
+
+
+class TestGestureModel:
+    """Folded inference, decisions and persistence"""
+
+    def test_folded_kernel_matches_reference(self, trained, held_out):
+        model, _ = trained
+        points, _ = held_out
+        np.testing.assert_allclose(model.predict_proba(points), reference_probabilities(model, points),
+                                   atol=1e-4)
+
+    def test_logistic_regression(self, held_out):
+        points, labels = held_out
+        model, report = train_gesture_model(points, labels, hidden=0, epochs=5)
+        assert model.hidden == 0 and len(model.layers) == 1
+        np.testing.assert_allclose(model.predict_proba(points), reference_probabilities(model, points),
+                                   atol=1e-4)
+        assert report.validation_accuracy > 0.8
+
+    def test_single_hand_matches_batch(self, trained, held_out):
+        model, _ = trained
+        points = held_out[0][:300]
+        codes, confidences, probabilities = model.predict_batch(points)
+        assert probabilities.shape == (300, 4)
+        np.testing.assert_allclose(probabilities.sum(axis=1), 1.0, atol=1e-5)
+        single = [model.predict(hand) for hand in points]
+        assert [code for code, _ in single] == codes.tolist()
+        np.testing.assert_allclose([conf for _, conf in single], confidences, atol=1e-5)
+
+    def test_min_confidence_abstains(self, trained, held_out):
+        model, _ = trained
+        points = held_out[0]
+        strict = GestureModel(model.layers, model.temperature, min_confidence=0.999)
+        codes, confidences, probabilities = strict.predict_batch(points)
+        low = probabilities.max(axis=1) < 0.999
+        assert low.any()
+        assert (codes[low] == Gesture.UNKNOWN).all()
+        np.testing.assert_allclose(confidences[low], probabilities[low, Gesture.UNKNOWN])
+        assert [strict.predict(hand)[0] for hand in points[:200]] == codes[:200].tolist()
+
+    def test_save_load_round_trip(self, trained, held_out, tmp_path):
+        model, _ = trained
+        path = str(tmp_path / "model.npz")
+        model.min_confidence = 0.4
+        model.save(path)
+        loaded = GestureModel.load(path)
+        assert loaded.temperature == model.temperature and loaded.min_confidence == 0.4
+        assert GestureModel.load(path, min_confidence=0.0).min_confidence == 0.0
+        np.testing.assert_array_equal(loaded.predict_proba(held_out[0]), model.predict_proba(held_out[0]))
+        assert not (tmp_path / "model.npz.tmp").exists()
+        model.min_confidence = 0.0
+
+    def test_rejects_bad_layers(self):
+        with pytest.raises(ValueError):
+            GestureModel([(np.zeros((63, 4)), np.zeros(4))])
+        with pytest.raises(ValueError):
+            GestureModel([(np.zeros((60, 4)), np.zeros(4))], temperature=0.0)
+
+
+class TestTraining:
+    """Accuracy and calibration on held-out synthetic matches"""
+
+    def test_accurate_where_rules_miss_tilted_hands(self, trained, held_out):
+        model, report = trained
+        points, labels = held_out
+        codes = model.predict_batch(points)[0]
+        rules = GestureClassifierV2().classify_batch(points).codes
+        assert (codes == labels).mean() > 0.95
+        assert (codes == labels).mean() > (rules == labels).mean() + 0.05
+        assert report.samples + report.validation_samples == 12000
+        assert report.validation_accuracy > 0.95
+
+    def test_probabilities_are_calibrated(self, trained, held_out):
+        model, report = trained
+        points, labels = held_out
+        assert calibration_error(model.predict_proba(points), labels) < 0.03
+        assert report.calibration_error < 0.03
+
+    def test_fit_temperature_recovers_scale(self):
+        rng = np.random.default_rng(0)
+        logits = rng.normal(0.0, 2.0, (20000, 4))
+        probabilities = softmax(logits.copy())
+        labels = (rng.random((20000, 1)) > probabilities.cumsum(axis=1)).sum(axis=1)
+        assert fit_temperature(logits * 3.0, labels) == pytest.approx(3.0, rel=0.05)
+
+    def test_calibration_error_of_perfect_forecast(self):
+        probabilities = np.array([[0.0, 1.0, 0.0, 0.0]] * 10)
+        assert calibration_error(probabilities, np.ones(10, dtype=int)) == 0.0
+        assert calibration_error(probabilities, np.zeros(10, dtype=int)) == 1.0
+
+    def test_training_data_keeps_present_hands(self):
+        session, labels = synthesize_session(20)
+        session.counts[:5] = 1
+        points, codes = training_data(session, labels)
+        assert points.shape == (35, 21, 3) and codes.shape == (35,)
+        with pytest.raises(ValueError):
+            training_data(session, labels[:10])
+
+    def test_validation_split_needs_both_sides(self):
+        with pytest.raises(ValueError):
+            train_gesture_model(POSE_TEMPLATES[1:], np.array([1, 2, 3]), validation=0.0)
+
+
+class TestClassifierBackend:
+    """GestureClassifierV2 with a learned backend"""
+
+    def test_classify_uses_backend(self, trained, held_out):
+        model, _ = trained
+        classifier = GestureClassifierV2(backend=model)
+        hand = held_out[0][0]
+        code, confidence = model.predict(hand)
+        result = classifier.classify(hand)
+        assert result.code == code and result.confidence == confidence
+        # Finger states and angles stay available for debugging
+        assert result.debug_angles == GestureClassifierV2().classify(hand).debug_angles
+
+        objects = [MockLandmark(*point) for point in hand.tolist()]
+        assert classifier.classify(objects).code == code
+        out = GestureResult("unknown")
+        assert classifier.classify(hand, out=out) is out and out.code == code
+
+    def test_classify_batch_returns_probabilities(self, trained, held_out):
+        model, _ = trained
+        points = held_out[0]
+        result = GestureClassifierV2(backend=model).classify_batch(points)
+        codes, confidences, _ = model.predict_batch(points)
+        assert result.codes.tolist() == codes.tolist()
+        assert result.gestures[0] == Gesture(codes[0]).label
+        assert result.probabilities.shape == (len(points), 4)
+        np.testing.assert_array_equal(result.confidences, confidences)
+        assert GestureClassifierV2().classify_batch(points).probabilities is None
+
+    def test_config_loads_and_clears_model(self, trained, tmp_path):
+        model, _ = trained
+        path = str(tmp_path / "model.npz")
+        model.save(path)
+        classifier = GestureClassifierV2.from_config(RPSConfig(GESTURE_MODEL=path))
+        assert isinstance(classifier.backend, GestureModel)
+        classifier.apply_config(RPSConfig())
+        assert classifier.backend is None
+
+    def test_backend_interface_is_abstract(self):
+        class Partial(GestureBackend):
+            def predict(self, points):
+                return Gesture.ROCK, 1.0
+
+        with pytest.raises(TypeError, match="predict_batch"):
+            Partial()
+
+
+class TestTrainCommand:
+    """rps-referee train"""
+
+    def test_trains_from_synthetic_session(self, tmp_path, capsys):
+        session, labels = tmp_path / "match.npz", tmp_path / "labels.npy"
+        model = tmp_path / "model.npz"
+        assert main(["synth", str(session), "--frames", "600", "--transition", "3",
+                     "--rotation", "20", "--labels", str(labels)]) == 0
+        capsys.readouterr()
+        assert main(["train", str(model), "--data", str(session), str(labels),
+                     "--hidden", "8", "--epochs", "3", "--min-confidence", "0.3"]) == 0
+        report = json.loads(capsys.readouterr().out)
+        assert report["type"] == "training" and report["samples"] == 960
+        assert GestureModel.load(str(model)).min_confidence == 0.3
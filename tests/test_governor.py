@@ -0,0 +1,63 @@
+"""
+Tests for the adaptive performance governor
+測試自適應效能調節
+"""
+import pytest
+
+from config import RPSConfig
+from src.governor import DEFAULT_LEVELS, AdaptiveGovernor, OperatingPoint
+
+
+def run(governor, seconds, frames):
+    return [point for point in (governor.observe(seconds) for _ in range(frames)) if point]
+
+
+class TestAdaptiveGovernor:
+    """Test stepping between operating points"""
+
+    def test_starts_at_richest_level(self):
+        governor = AdaptiveGovernor(30)
+        assert governor.point == DEFAULT_LEVELS[-1]
+        assert governor.budget == pytest.approx(1 / 30)
+
+    def test_steps_down_when_over_budget(self):
+        governor = AdaptiveGovernor(30, cooldown=10)
+
+        changes = run(governor, 0.050, 25)
+
+        assert changes == [DEFAULT_LEVELS[-2], DEFAULT_LEVELS[-3]]
+        assert governor.changes == 2
+
+    def test_bottoms_out_at_cheapest_level(self):
+        governor = AdaptiveGovernor(30, cooldown=1)
+        run(governor, 1.0, 100)
+        assert governor.point == DEFAULT_LEVELS[0]
+
+    def test_steps_up_slower_than_down(self):
+        governor = AdaptiveGovernor(30, start=0, cooldown=10)
+
+        assert run(governor, 0.005, 29) == []
+        assert run(governor, 0.005, 1) == [DEFAULT_LEVELS[1]]
+
+    def test_holds_inside_band(self):
+        governor = AdaptiveGovernor(30, start=2, cooldown=1)
+        assert run(governor, 0.7 / 30, 200) == []
+
+    def test_ema_smooths_single_spike(self):
+        governor = AdaptiveGovernor(30, cooldown=1, alpha=0.1)
+        run(governor, 0.010, 50)
+        assert governor.observe(0.2) is None   # one slow frame is not enough
+
+    def test_from_config_starts_at_configured_model(self):
+        governor = AdaptiveGovernor.from_config(RPSConfig(MODEL_COMPLEXITY=0, TARGET_FPS=60))
+        assert governor.point == OperatingPoint(1.0, 0, 1)
+        assert governor.budget == pytest.approx(1 / 60)
+
+    def test_status_text(self):
+        governor = AdaptiveGovernor(30, start=0)
+        governor.observe(0.012)
+        assert governor.status_text() == "gov 0.5x c0 1/3 12.0/33ms"
+
+    def test_empty_levels(self):
+        with pytest.raises(ValueError):
+            AdaptiveGovernor(30, levels=[])
@@ -4,8 +4,14 @@ Test-Driven Development - Write tests first!
 
 These tests will FAIL until judge.py is implemented.
 """
+import copy
+import pickle
+
+import numpy as np
 import pytest
-from src.judge import judge_rps
+from src.gestures import Gesture
+from src.judge import (judge_rps, judge, judge_batch, Outcome, Result,
+                       JUDGE_TABLE, OUTCOMES, RESULT_TABLE)
 
 
 class TestJudgeRPS:
@@ -123,6 +129,82 @@ class TestJudgeRPSEdgeCases:
         assert result["result"] == "left"
 
 
+class TestGestureCodes:
+    """Gesture enum shared by classifier and judge"""
+
+    def test_parse(self):
+        assert Gesture.parse("rock") is Gesture.ROCK
+        assert Gesture.parse("scissors") is Gesture.SCISSORS
+        assert Gesture.parse(None) is Gesture.UNKNOWN
+        assert Gesture.parse("lizard") is Gesture.UNKNOWN
+        assert Gesture.parse(2) is Gesture.PAPER
+
+    def test_labels_round_trip(self):
+        for gesture in Gesture:
+            assert Gesture.parse(gesture.label) is gesture
+
+
+class TestJudgeTable:
+    """Precomputed 4x4 outcome table"""
+
+    def test_table_matches_judge_rps(self):
+        for left in Gesture:
+            for right in Gesture:
+                assert judge(left, right) is judge_rps(left.label, right.label)
+                assert judge(left, right).code == RESULT_TABLE[left, right]
+
+    def test_unknown_is_invalid(self):
+        for gesture in ("rock", "unknown", None, "lizard"):
+            outcome = judge_rps(gesture, "unknown")
+            assert outcome["result"] == "invalid"
+            assert outcome["message"] == "無法判定"
+            assert outcome.code == Result.INVALID
+
+    def test_outcomes_are_shared(self):
+        assert judge_rps("rock", "scissors") is judge_rps("paper", "rock")
+        assert JUDGE_TABLE[Gesture.ROCK][Gesture.ROCK] is OUTCOMES[Result.DRAW]
+
+    def test_outcomes_are_read_only(self):
+        outcome = judge_rps("rock", "scissors")
+        with pytest.raises(TypeError):
+            outcome["result"] = "right"
+        with pytest.raises(TypeError):
+            outcome.update(result="right")
+        with pytest.raises(TypeError):
+            outcome.pop("result")
+        with pytest.raises(ValueError):
+            RESULT_TABLE[0, 0] = 1
+        assert outcome == {"result": "left", "message": "左手獲勝"}
+
+    def test_copy_and_pickle(self):
+        outcome = judge_rps("scissors", "rock")
+        assert copy.copy(outcome) is outcome
+        assert copy.deepcopy(outcome) is outcome
+        loaded = pickle.loads(pickle.dumps(outcome))
+        assert isinstance(loaded, Outcome)
+        assert loaded == outcome and loaded.code == Result.RIGHT
+        assert loaded.result == "right" and loaded.message == "右手獲勝"
+
+
+class TestJudgeBatch:
+    """Vectorized judging over code arrays"""
+
+    def test_matches_scalar_judge(self):
+        left, right = np.meshgrid(np.arange(4), np.arange(4), indexing="ij")
+        codes = judge_batch(left.ravel(), right.ravel())
+        assert codes.dtype == np.int8
+        expected = [judge(l, r).code for l, r in zip(left.ravel(), right.ravel())]
+        np.testing.assert_array_equal(codes, expected)
+
+    def test_classifier_codes(self):
+        from src.gesture_classifier_v2 import GESTURE_NAMES
+        left = np.array([Gesture.ROCK, Gesture.PAPER, Gesture.UNKNOWN], dtype=np.int8)
+        right = np.array([Gesture.SCISSORS, Gesture.SCISSORS, Gesture.ROCK], dtype=np.int8)
+        np.testing.assert_array_equal(judge_batch(left, right),
+                                      [Result.LEFT, Result.RIGHT, Result.INVALID])
+        assert list(GESTURE_NAMES) == [g.label for g in Gesture]
+
+
 # Test coverage goal: 100% for judge.py
 # Run with: pytest tests/test_judge.py -v
 # Coverage: pytest tests/test_judge.py --cov=src.judge --cov-report=term-missing
@@ -0,0 +1,258 @@
+"""
+Tests for landmark ingestion buffer
+測試關鍵點擷取緩衝區
+"""
+import numpy as np
+import pytest
+from dataclasses import dataclass, field
+from typing import List
+
+from src.gesture_classifier import GestureClassifier
+from src.gesture_classifier_v2 import GestureClassifierV2
+from src.landmarks import (
+    LandmarkBuffer, copy_landmarks, joint_angles, joint_angles_3d, AngleKernel,
+    HAND_JOINTS, HAND_LEFT, HAND_RIGHT, HAND_NONE
+)
+
+
+@dataclass
+class MockLandmark:
+    """Mock MediaPipe landmark"""
+    x: float
+    y: float
+    z: float = 0.0
+
+
+@dataclass
+class MockHandLandmarks:
+    """Mock NormalizedLandmarkList"""
+    landmark: List[MockLandmark]
+
+
+@dataclass
+class MockCategory:
+    label: str
+
+
+@dataclass
+class MockHandedness:
+    """Mock ClassificationList"""
+    classification: List[MockCategory]
+
+
+@dataclass
+class MockResults:
+    """Mock hands.process() result"""
+    multi_hand_landmarks: list = None
+    multi_handedness: list = None
+
+
+def make_points(seed=0):
+    """Random (21, 3) float32 hand"""
+    return np.random.default_rng(seed).random((21, 3)).astype(np.float32)
+
+
+def to_mock_hand(points):
+    return MockHandLandmarks([MockLandmark(*map(float, p)) for p in points])
+
+
+def to_proto_hand(points, visibility=False):
+    landmark_pb2 = pytest.importorskip("mediapipe.framework.formats.landmark_pb2")
+    hand = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in points:
+        lm = hand.landmark.add()
+        lm.x, lm.y, lm.z = float(x), float(y), float(z)
+        if visibility:
+            lm.visibility = 0.9
+    return hand
+
+
+class TestCopyLandmarks:
+    """Test single-hand copy paths"""
+
+    def test_copy_from_mock_objects(self):
+        """Test attribute fallback for plain landmark objects"""
+        points = make_points()
+        out = np.zeros((21, 3), dtype=np.float32)
+
+        copy_landmarks(to_mock_hand(points), out)
+
+        assert np.array_equal(out, points)
+
+    def test_copy_from_landmark_list(self):
+        """Test a bare list of landmarks (hand_landmarks.landmark)"""
+        points = make_points(1)
+        out = np.zeros((21, 3), dtype=np.float32)
+
+        copy_landmarks(to_mock_hand(points).landmark, out)
+
+        assert np.array_equal(out, points)
+
+    def test_copy_from_protobuf_wire(self):
+        """Test wire-format decoding of a real NormalizedLandmarkList"""
+        points = make_points(2)
+        out = np.zeros((21, 3), dtype=np.float32)
+
+        copy_landmarks(to_proto_hand(points), out)
+
+        assert np.array_equal(out, points)
+
+    def test_copy_protobuf_with_extra_fields_falls_back(self):
+        """Test protobufs with visibility set still copy correctly"""
+        points = make_points(3)
+        out = np.zeros((21, 3), dtype=np.float32)
+
+        copy_landmarks(to_proto_hand(points, visibility=True), out)
+
+        assert np.array_equal(out, points)
+
+
+class TestLandmarkBuffer:
+    """Test per-frame buffer"""
+
+    def test_load_results(self):
+        """Test hands and handedness are copied into slots"""
+        left, right = make_points(4), make_points(5)
+        results = MockResults(
+            multi_hand_landmarks=[to_mock_hand(left), to_mock_hand(right)],
+            multi_handedness=[
+                MockHandedness([MockCategory("Left")]),
+                MockHandedness([MockCategory("Right")]),
+            ]
+        )
+        buffer = LandmarkBuffer(max_hands=2)
+
+        assert buffer.load_results(results) == 2
+        assert np.array_equal(buffer.hands[0], left)
+        assert np.array_equal(buffer.hands[1], right)
+        assert buffer.handedness.tolist() == [HAND_LEFT, HAND_RIGHT]
+        assert buffer.label(0) == "Left"
+        assert buffer.label(1) == "Right"
+
+    def test_buffer_is_reused(self):
+        """Test loading does not reallocate the points array"""
+        buffer = LandmarkBuffer()
+        points_id = id(buffer.points)
+
+        buffer.load([to_mock_hand(make_points())])
+        buffer.load([to_mock_hand(make_points(1))])
+
+        assert id(buffer.points) == points_id
+        assert buffer.points.dtype == np.float32
+
+    def test_no_hands(self):
+        """Test empty frame clears the buffer"""
+        buffer = LandmarkBuffer()
+        buffer.load([to_mock_hand(make_points())])
+
+        assert buffer.load_results(MockResults()) == 0
+        assert buffer.hands.shape == (0, 21, 3)
+        assert buffer.label(0) is None
+        assert buffer.handedness[0] == HAND_NONE
+
+    def test_extra_hands_dropped(self):
+        """Test hands beyond max_hands are ignored"""
+        buffer = LandmarkBuffer(max_hands=1)
+        hands = [to_mock_hand(make_points(i)) for i in range(3)]
+
+        assert buffer.load(hands) == 1
+
+
+class TestClassifiersAcceptArrays:
+    """Test both classifiers accept buffer slots directly"""
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_v2_array_matches_objects(self, seed):
+        """Test V2 gives identical results for arrays and landmark objects"""
+        classifier = GestureClassifierV2()
+        points = make_points(seed)
+
+        from_array = classifier.classify(points)
+        from_objects = classifier.classify(to_mock_hand(points).landmark)
+
+        assert from_array.gesture == from_objects.gesture
+        assert from_array.finger_states == from_objects.finger_states
+        assert from_array.debug_angles == from_objects.debug_angles
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_v1_array_matches_objects(self, seed):
+        """Test V1 gives identical results for arrays and landmark objects"""
+        classifier = GestureClassifier(angle_threshold=130.0)
+        points = make_points(seed)
+
+        from_array = classifier.classify(points)
+        from_objects = classifier.classify(to_mock_hand(points).landmark)
+
+        assert from_array.gesture == from_objects.gesture
+        assert from_array.finger_states == from_objects.finger_states
+
+    def test_joint_angles_straight_and_right(self):
+        """Test angle kernel on known geometry"""
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[0] = (0.0, 0.5, 0.0)
+        points[1] = (0.5, 0.5, 0.0)
+        points[2] = (1.0, 0.5, 0.0)
+        points[3] = (0.5, 1.0, 0.0)
+
+        straight, right = joint_angles(points, [(0, 1, 2), (0, 1, 3)])
+
+        assert straight == pytest.approx(180.0)
+        assert right == pytest.approx(90.0)
+
+
+class TestJointAngles3D:
+    """Test the 3D dot-product angle kernel"""
+
+    def test_uses_z(self):
+        """Test a joint bent toward the camera is not seen as straight"""
+        points = np.zeros((21, 3), dtype=np.float32)
+        points[0] = (0.0, 0.5, 0.0)
+        points[1] = (0.5, 0.5, 0.0)
+        points[2] = (0.5, 0.5, 0.5)   # straight ahead in x/y, bent 90° in depth
+
+        assert joint_angles_3d(points, [(0, 1, 2)])[0] == pytest.approx(90.0)
+        assert joint_angles(points, [(0, 1, 2)])[0] != pytest.approx(90.0)
+
+    def test_rotation_and_scale_invariant(self):
+        """Test angles do not change under any 3D rotation and scaling"""
+        points = make_points(3).astype(np.float64)
+        rotation, _ = np.linalg.qr(np.random.default_rng(1).normal(size=(3, 3)))
+        moved = 2.5 * points @ rotation.T + 0.1
+
+        np.testing.assert_allclose(joint_angles_3d(moved, HAND_JOINTS),
+                                   joint_angles_3d(points, HAND_JOINTS), atol=1e-9)
+
+    def test_kernel_matches_scalar_path(self):
+        """Test the batch kernel gives the single-hand angles"""
+        hands = np.stack([make_points(seed) for seed in range(8)])
+        kernel = AngleKernel()
+
+        angles = kernel(hands)
+
+        assert angles.shape == (8, 15)
+        for hand, row in zip(hands, angles):
+            np.testing.assert_allclose(row, joint_angles_3d(hand, HAND_JOINTS), atol=1e-2)
+        np.testing.assert_allclose(kernel(hands.astype(np.float64)), angles, atol=1e-2)
+        assert kernel(hands[0]).shape == (15,)
+        assert kernel(hands.reshape(2, 4, 21, 3)).shape == (2, 4, 15)
+
+    def test_landmark_objects_and_degenerate_joints(self):
+        """Test landmark objects are accepted and zero-length segments give 0°"""
+        points = make_points(4)
+        points[6] = points[5]
+
+        from_objects = joint_angles_3d(to_mock_hand(points).landmark, HAND_JOINTS)
+
+        assert from_objects == pytest.approx(joint_angles_3d(points, HAND_JOINTS))
+        assert from_objects[3] == 0.0
+        assert AngleKernel()(points)[3] == 0.0
+
+    def test_hand_joints_layout(self):
+        """Test the 15 joints are CMC/MCP/IP of the thumb and MCP/PIP/DIP of the fingers"""
+        assert len(HAND_JOINTS) == 15
+        assert HAND_JOINTS[:3] == ((0, 1, 2), (1, 2, 3), (2, 3, 4))
+        assert HAND_JOINTS[3:6] == ((0, 5, 6), (5, 6, 7), (6, 7, 8))
+
+    def test_rejects_bad_shape(self):
+        with pytest.raises(ValueError):
+            AngleKernel()(np.zeros((4, 20, 3)))
@@ -0,0 +1,51 @@
+"""
+Tests for import-time behaviour of the package
+測試套件匯入：無副作用、核心模組不載入 OpenCV / PIL / MediaPipe
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import src
+
+HEAVY = ("cv2", "PIL", "mediapipe")
+ROOT = Path(src.__file__).resolve().parents[1]
+
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=str(ROOT), check=True)
+
+
+class TestCoreImports:
+    """Classifier, judge and game logic start without the heavy stacks"""
+
+    @pytest.mark.parametrize("module", ["src", "src.gesture_classifier_v2", "src.judge",
+                                        "src.game_logic", "src.replay", "src.tournament",
+                                        "src.ui", "src.roi"])
+    def test_no_heavy_modules(self, module):
+        result = run_python(f"import sys, {module}; "
+                            f"print([m for m in {HEAVY!r} if m in sys.modules])")
+        assert result.stdout.strip() == "[]"
+
+    def test_import_is_silent(self):
+        result = run_python("import src.gesture_classifier_v2, src.judge, src.game_logic")
+        assert result.stdout == ""
+        assert result.stderr == ""
+
+
+class TestLazyExports:
+    """``from src import X`` resolves on first access"""
+
+    def test_exports_resolve(self):
+        from src.judge import judge_rps
+        assert src.judge_rps is judge_rps
+        for name in src.__all__:
+            assert getattr(src, name) is not None
+        assert set(src.__all__) <= set(dir(src))
+
+    def test_unknown_name(self):
+        with pytest.raises(AttributeError):
+            src.not_a_name
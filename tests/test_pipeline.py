@@ -0,0 +1,484 @@
+"""
+Tests for threaded referee pipeline
+測試多執行緒裁判管線
+"""
+import threading
+
+import numpy as np
+import pytest
+from dataclasses import dataclass
+from typing import List
+
+from src.events import EventBus
+from src.game_logic import GameMode, SimpleGameLogic
+import src.pipeline as pipeline_module
+from src.pipeline import LatestQueue, RefereePipeline, PipelineStats, open_camera
+
+
+@dataclass
+class MockLandmark:
+    """Mock MediaPipe landmark"""
+    x: float
+    y: float
+    z: float = 0.0
+
+
+@dataclass
+class MockHandLandmarks:
+    landmark: List[MockLandmark]
+
+
+@dataclass
+class MockCategory:
+    label: str
+
+
+@dataclass
+class MockHandedness:
+    classification: List[MockCategory]
+
+
+@dataclass
+class MockResults:
+    multi_hand_landmarks: list = None
+    multi_handedness: list = None
+
+
+def create_mock_landmarks(finger_states):
+    """Mock hand with the given extended fingers (same geometry as classifier tests)"""
+    landmarks = [MockLandmark(0.5, 0.9)]
+    base_x = [0.3, 0.4, 0.5, 0.6, 0.7]
+    base_y = 0.8
+    for finger_idx, is_extended in enumerate(finger_states):
+        x_base = base_x[finger_idx]
+        for joint_idx in range(4):
+            if is_extended:
+                x, y = x_base + joint_idx * 0.001, base_y - joint_idx * 0.15
+            elif joint_idx == 0:
+                x, y = x_base, base_y
+            elif joint_idx == 1:
+                x, y = x_base + 0.05, base_y - 0.05
+            elif joint_idx == 2:
+                x, y = x_base + 0.06, base_y - 0.03
+            else:
+                x, y = x_base + 0.08, base_y + 0.02
+            landmarks.append(MockLandmark(x, y))
+    return MockHandLandmarks(landmarks)
+
+
+ROCK = create_mock_landmarks([False] * 5)
+SCISSORS = create_mock_landmarks([False, True, True, False, False])
+
+
+class FakeSource:
+    """Finite frame source with cv2.VideoCapture interface"""
+
+    def __init__(self, frames=10, shape=(48, 64, 3)):
+        self.remaining = frames
+        self.shape = shape
+        self.released = False
+
+    def read(self):
+        if self.remaining <= 0:
+            return False, None
+        self.remaining -= 1
+        return True, np.zeros(self.shape, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class FakeDetector:
+    """Always reports left rock + right scissors"""
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+
+    def process(self, frame_rgb):
+        self.calls += 1
+        return MockResults(
+            multi_hand_landmarks=[ROCK, SCISSORS],
+            multi_handedness=[MockHandedness([MockCategory("Left")]),
+                              MockHandedness([MockCategory("Right")])]
+        )
+
+    def close(self):
+        self.closed = True
+
+
+class NoHandednessDetector(FakeDetector):
+    """Hands without multi_handedness"""
+
+    def process(self, frame_rgb):
+        return MockResults(multi_hand_landmarks=[ROCK, SCISSORS])
+
+
+class BlockingSource(FakeSource):
+    """read() blocks until released by the test"""
+
+    def __init__(self):
+        super().__init__(frames=1)
+        self.gate = threading.Event()
+
+    def read(self):
+        self.gate.wait()
+        return False, None
+
+
+class FakeDisplay:
+    """Returns scripted key codes"""
+
+    def __init__(self, keys=()):
+        self.keys = list(keys)
+        self.frames = 0
+        self.closed = False
+
+    def show(self, frame):
+        self.frames += 1
+        return self.keys.pop(0) if self.keys else -1
+
+    def close(self):
+        self.closed = True
+
+
+class TestLatestQueue:
+    """Test bounded drop-oldest queue"""
+
+    def test_drops_oldest_when_full(self):
+        queue = LatestQueue(maxsize=2)
+        for i in range(5):
+            queue.put(i)
+
+        assert len(queue) == 2
+        assert queue.dropped == 3
+        assert queue.get() == 3
+        assert queue.get() == 4
+
+    def test_get_timeout_returns_none(self):
+        assert LatestQueue().get(timeout=0.01) is None
+
+    def test_closed_queue_drains_then_returns_none(self):
+        queue = LatestQueue(maxsize=2)
+        queue.put("a")
+        queue.close()
+
+        assert queue.put("b") is False
+        assert queue.get() == "a"
+        assert queue.get() is None
+
+    def test_lossless_mode_blocks_producer(self):
+        """Test drop_oldest=False applies backpressure instead of dropping"""
+        queue = LatestQueue(maxsize=1, drop_oldest=False)
+        queue.put(1)
+        producer = threading.Thread(target=queue.put, args=(2,))
+        producer.start()
+        producer.join(timeout=0.05)
+
+        assert producer.is_alive()
+        assert queue.get() == 1
+        producer.join(timeout=1.0)
+        assert queue.get() == 2
+        assert queue.dropped == 0
+
+
+class TestRefereePipeline:
+    """Test end-to-end pipeline with fake camera, detector and display"""
+
+    def test_lossless_run_renders_every_frame_in_order(self):
+        rendered = []
+        pipeline = RefereePipeline(
+            FakeSource(frames=12), FakeDetector(), display=FakeDisplay(),
+            drop_stale=False,
+            on_render=lambda packet, state: rendered.append((packet.index, state))
+        )
+
+        stats = pipeline.run()
+
+        assert isinstance(stats, PipelineStats)
+        assert stats.captured == stats.inferred == stats.rendered == 12
+        assert [index for index, _ in rendered] == list(range(12))
+        assert rendered[0][1]["live_result"]["message"] == "左手獲勝"
+
+    def test_results_mapped_by_handedness(self):
+        packets = []
+        pipeline = RefereePipeline(
+            FakeSource(frames=1), FakeDetector(), drop_stale=False,
+            on_render=lambda packet, state: packets.append(packet)
+        )
+        pipeline.run()
+
+        assert packets[0].left_result.gesture == "rock"
+        assert packets[0].right_result.gesture == "scissors"
+        assert packets[0].landmarks.shape == (2, 21, 3)
+
+    def test_game_logic_receives_gesture_codes(self):
+        from src.gestures import Gesture
+
+        seen = []
+
+        class Recording(SimpleGameLogic):
+            def tick(self, now, left, right, space_pressed=False, stability=1.0):
+                seen.append((left, right))
+                return super().tick(now, left, right, space_pressed, stability)
+
+        packets = []
+        RefereePipeline(FakeSource(frames=2), FakeDetector(), game_logic=Recording(), drop_stale=False,
+                        on_render=lambda packet, state: packets.append(state)).run()
+        assert seen == [(Gesture.ROCK, Gesture.SCISSORS)] * 2
+        assert all(type(code) is Gesture for pair in seen for code in pair)
+        assert packets[0]["live_result"]["result"] == "left"
+
+    def test_space_locks_result(self):
+        states = []
+        pipeline = RefereePipeline(
+            FakeSource(frames=3), FakeDetector(), display=FakeDisplay([ord(' ')]),
+            drop_stale=False, on_render=lambda packet, state: states.append(state)
+        )
+        pipeline.run()
+
+        assert states[0]["mode"] == GameMode.LIVE
+        assert states[1]["mode"] == GameMode.LOCKED
+        assert states[1]["locked_result"]["result"] == "left"
+
+    def test_q_quits_and_releases(self):
+        source, detector, display = FakeSource(frames=1000), FakeDetector(), FakeDisplay([-1, ord('q')])
+        pipeline = RefereePipeline(source, detector, display=display, drop_stale=False)
+
+        stats = pipeline.run()
+
+        assert stats.rendered == 2
+        assert source.released and detector.closed and display.closed
+
+    def test_records_inferred_frames(self, tmp_path):
+        from src.recording import SessionRecorder
+        from src.replay import ReplayEngine, Session
+
+        path = str(tmp_path / "live.rpsl")
+        recorder = SessionRecorder(path)
+        RefereePipeline(FakeSource(frames=5), FakeDetector(), drop_stale=False,
+                        recorder=recorder).run()
+
+        session = Session.load(path)
+        assert len(session) == 5
+        assert session.timestamps[0] == 0.0
+        assert (session.counts == 2).all()
+        events = ReplayEngine().run(session).events
+        assert [(e.left, e.right) for e in events] == [("rock", "scissors")]
+
+    def test_stage_timer_records_every_stage(self):
+        from src.timing import STAGES, StageTimer
+
+        timer = StageTimer()
+        RefereePipeline(FakeSource(frames=6), FakeDetector(), display=FakeDisplay(),
+                        drop_stale=False, timer=timer).run()
+
+        for stage in STAGES:
+            assert timer.stats(stage).count == 6, stage
+        assert timer.frames == 6
+
+    def test_stable_frames_delay_first_result(self):
+        states = []
+        RefereePipeline(FakeSource(frames=5), FakeDetector(), drop_stale=False, stable_frames=3,
+                        on_render=lambda packet, state: states.append(state)).run()
+
+        shown = [state["live_result"] is not None for state in states]
+        assert shown == [False, False, True, True, True]
+
+    def test_apply_config_hot_reloads(self):
+        from config import RPSConfig
+
+        pipeline = RefereePipeline(FakeSource(frames=1), FakeDetector(), stable_frames=3)
+        stabilizers = pipeline.stabilizers
+        pipeline.apply_config(RPSConfig(STABLE_FRAMES=3, FUZZY_MATCHING=False,
+                                        FINGER_THRESHOLDS={"thumb": 150.0}))
+        assert pipeline.stabilizers is stabilizers          # same window: kept
+        assert pipeline.classifier.finger_thresholds["thumb"] == 150.0
+        assert not pipeline.classifier.use_fuzzy_matching
+
+        pipeline.apply_config(RPSConfig(STABLE_FRAMES=5))
+        assert pipeline.stabilizers[0].window == 5
+        pipeline.apply_config(RPSConfig(STABLE_FRAMES=0))
+        assert pipeline.stabilizers is None
+
+    def test_player_thresholds_per_side(self):
+        from src.gesture_classifier_v2 import compile_thresholds
+        from src.landmarks import HAND_LEFT, HAND_RIGHT
+
+        packets = []
+        pipeline = RefereePipeline(
+            FakeSource(frames=1), FakeDetector(), drop_stale=False,
+            on_render=lambda packet, state: packets.append(packet)
+        )
+        # Every angle counts as extended for the left player only
+        pipeline.set_player(HAND_LEFT, compile_thresholds({name: 0.0 for name in
+                                                            ("thumb", "index", "middle", "ring", "pinky")}))
+        pipeline.run()
+        assert packets[0].left_result.gesture == "paper"
+        assert packets[0].right_result.gesture == "scissors"
+        pipeline.set_player(HAND_LEFT, None)
+        assert pipeline.player_thresholds == (None, None)
+        with pytest.raises(ValueError):
+            pipeline.set_player(HAND_RIGHT + 1, None)
+
+    def test_calibration_mode_collects_one_side(self):
+        from src.calibration import ThresholdCalibrator
+        from src.landmarks import HAND_RIGHT
+
+        calibrator = ThresholdCalibrator()
+        pipeline = RefereePipeline(FakeSource(frames=5), FakeDetector(), drop_stale=False)
+        pipeline.calibrate(HAND_RIGHT, "scissors", calibrator)
+        pipeline.run()
+        assert calibrator.frames("scissors") == 5
+        assert calibrator.frames("rock") == 0
+        pipeline.calibrate(HAND_RIGHT, None)
+        assert pipeline._calibration is None
+
+    def test_calibration_default_calibrator_and_validation(self):
+        from src.landmarks import HAND_LEFT, HAND_NONE
+
+        pipeline = RefereePipeline(FakeSource(frames=4), FakeDetector(), drop_stale=False)
+        with pytest.raises(ValueError):
+            pipeline.calibrate(HAND_NONE, "rock")
+        with pytest.raises(ValueError):
+            pipeline.calibrate(HAND_LEFT, "lizard")
+        assert pipeline._calibration is None
+
+        calibrator = pipeline.calibrate(HAND_LEFT, "paper")
+        pipeline.run()
+        assert calibrator.frames("paper") == 4
+
+    def test_publishes_events(self):
+        bus = EventBus()
+        subscription = bus.subscribe(coalesce=False)
+        pipeline = RefereePipeline(FakeSource(frames=3), FakeDetector(), display=FakeDisplay([ord(' ')]),
+                                   drop_stale=False, events=bus)
+        pipeline.run()
+        events = subscription.get_nowait()
+        assert [event.type for event in events] == ["gesture", "gesture", "result", "lock"]
+        assert events[2].message == "左手獲勝" and events[3].left == "rock"
+
+    def test_roi_tracker_crops_detector_input(self):
+        from src.roi import ROITracker
+
+        class ShapeDetector(FakeDetector):
+            def __init__(self):
+                super().__init__()
+                self.shapes = []
+
+            def process(self, frame_rgb):
+                self.shapes.append(frame_rgb.shape)
+                return super().process(frame_rgb)
+
+        detector, packets = ShapeDetector(), []
+        RefereePipeline(FakeSource(frames=3, shape=(480, 640, 3)), detector, drop_stale=False,
+                        roi=ROITracker(min_size=0.1),
+                        on_render=lambda packet, state: packets.append(packet)).run()
+
+        assert detector.shapes[0] == (480, 640, 3)
+        assert all(shape[0] * shape[1] < 480 * 640 for shape in detector.shapes[1:])
+        assert [p.left_result.gesture for p in packets] == ["rock"] * 3
+        assert [p.right_result.gesture for p in packets] == ["scissors"] * 3
+
+    def test_governor_reuses_landmarks_between_detections(self):
+        from src.governor import AdaptiveGovernor, OperatingPoint
+
+        detector, packets = FakeDetector(), []
+        governor = AdaptiveGovernor(30, levels=[OperatingPoint(0.5, 0, 3)], start=0)
+        stats = RefereePipeline(FakeSource(frames=9), detector, drop_stale=False, governor=governor,
+                                on_render=lambda packet, state: packets.append(packet)).run()
+
+        assert detector.calls == 3
+        assert [p.right_result.gesture for p in packets] == ["scissors"] * 9
+        assert "gov 0.5x c0 1/3" in stats.status_text()
+
+    def test_governor_swaps_detector_on_model_change(self):
+        from src.governor import AdaptiveGovernor, OperatingPoint
+
+        class SlowDetector(FakeDetector):
+            def process(self, frame_rgb):
+                import time
+                time.sleep(0.01)
+                return super().process(frame_rgb)
+
+        created = []
+
+        def factory(model_complexity):
+            created.append(model_complexity)
+            return FakeDetector()
+
+        first = SlowDetector()
+        governor = AdaptiveGovernor(200, levels=[OperatingPoint(1.0, 0, 1), OperatingPoint(1.0, 1, 1)],
+                                    cooldown=2)
+        pipeline = RefereePipeline(FakeSource(frames=6), first, drop_stale=False,
+                                   governor=governor, detector_factory=factory)
+        pipeline.run()
+
+        assert created == [0]
+        assert first.closed
+        assert pipeline.detector is not first and pipeline.detector.closed
+
+    def test_hands_without_handedness_are_skipped(self):
+        packets = []
+        pipeline = RefereePipeline(
+            FakeSource(frames=1), NoHandednessDetector(), drop_stale=False,
+            on_render=lambda packet, state: packets.append(packet)
+        )
+        pipeline.run()
+
+        assert packets[0].left_result is None
+        assert packets[0].right_result is None
+
+    def test_stuck_thread_is_not_released(self, monkeypatch):
+        """Test stop() does not release objects a live thread is still using"""
+        source, detector = BlockingSource(), FakeDetector()
+        pipeline = RefereePipeline(source, detector)
+        pipeline.start()
+        monkeypatch.setattr(threading.Thread, "join", lambda self, timeout=None: None)
+
+        with pytest.warns(RuntimeWarning, match="rps-capture"):
+            pipeline.stop()
+
+        assert not source.released and not detector.closed
+        source.gate.set()
+
+    def test_open_camera_failure_raises(self, monkeypatch):
+        class ClosedCapture:
+            released = False
+
+            def __init__(self, index):
+                pass
+
+            def isOpened(self):
+                return False
+
+            def release(self):
+                ClosedCapture.released = True
+
+        monkeypatch.setattr(pipeline_module.cv2, "VideoCapture", ClosedCapture)
+
+        with pytest.raises(IOError):
+            open_camera(3)
+        assert ClosedCapture.released
+
+    def test_max_frames(self):
+        pipeline = RefereePipeline(FakeSource(frames=1000), FakeDetector())
+        assert pipeline.run(max_frames=5).rendered >= 5
+
+    def test_drop_stale_frames_with_slow_render(self):
+        """Test a slow renderer skips frames instead of queueing them"""
+        pipeline = RefereePipeline(FakeSource(frames=200), FakeDetector(), queue_size=1)
+        pipeline.start()
+        pipeline._threads[0].join(timeout=5.0)
+        pipeline._threads[1].join(timeout=5.0)
+        stats = pipeline.stats()
+        pipeline.stop()
+
+        assert stats.captured == 200
+        assert stats.inference_queue <= 1
+        assert stats.capture_dropped + stats.inference_dropped > 0
+
+    def test_status_text_reports_queue_depth(self):
+        stats = PipelineStats(5, 4, 3, capture_queue=1, inference_queue=0,
+                              capture_dropped=2, inference_dropped=1)
+        assert stats.status_text() == "Q cap:1 inf:0 | drop cap:2 inf:1"
@@ -0,0 +1,124 @@
+"""
+Tests for binary landmark recordings
+測試二進位關鍵點記錄檔
+"""
+import time
+
+import numpy as np
+import pytest
+
+from src.landmarks import HAND_LEFT, HAND_NONE, HAND_RIGHT
+from src.recording import (
+    HEADER_SIZE, SessionRecorder, is_recording, read_recording, record_dtype
+)
+from src.replay import ReplayEngine, Session
+from src.synthetic import SyntheticSource
+
+
+def record(path, frames, **kwargs):
+    with SessionRecorder(str(path), **kwargs) as recorder:
+        for frame in frames:
+            recorder.write(*frame)
+    return recorder
+
+
+class TestRecordFormat:
+    """Test the fixed-size record layout"""
+
+    def test_two_hand_record_size(self):
+        dtype = record_dtype(2)
+        assert dtype.itemsize == 16 + 2 * 21 * 3 * 4
+        assert dtype.fields["points"][1] % 16 == 0
+
+    def test_file_size_is_header_plus_records(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        record(path, SyntheticSource(frames=7))
+        assert path.stat().st_size == HEADER_SIZE + 7 * record_dtype(2).itemsize
+        assert is_recording(str(path))
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.bin"
+        path.write_bytes(b"not a recording at all")
+        assert not is_recording(str(path))
+        with pytest.raises(ValueError, match="bad magic"):
+            read_recording(str(path))
+
+
+class TestRecorderReader:
+    """Test round-trips through the memory-mapped reader"""
+
+    def test_roundtrip_matches_source(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        source = SyntheticSource(frames=50, hold=10)
+        record(path, ((t + 100.0, p, h, c) for t, p, h, c in source))
+
+        session = read_recording(str(path))
+        expected = Session.from_frames(source)
+
+        assert isinstance(session.points, np.memmap) or isinstance(session.points.base, np.memmap)
+        np.testing.assert_allclose(session.timestamps, expected.timestamps)   # relative to first frame
+        np.testing.assert_array_equal(session.points, expected.points)
+        np.testing.assert_array_equal(session.handedness, expected.handedness)
+        np.testing.assert_array_equal(session.counts, expected.counts)
+
+    def test_replay_from_recording_matches_in_memory(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        source = SyntheticSource(frames=200, hold=15, seed=5)
+        record(path, source)
+
+        from_file = ReplayEngine(chunk_frames=32).run(Session.load(str(path)))
+        in_memory = ReplayEngine().run(source)
+
+        assert [e.to_dict() for e in from_file.events] == [e.to_dict() for e in in_memory.events]
+
+    def test_append_continues_timeline(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        frames = list(SyntheticSource(frames=4, fps=10.0))
+        record(path, frames[:2])
+        record(path, [(t + 50.0, p, h, c) for t, p, h, c in frames[2:]])
+
+        np.testing.assert_allclose(read_recording(str(path)).timestamps, [0.0, 0.1, 0.1, 0.2])
+
+    def test_partial_trailing_record_ignored(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        record(path, SyntheticSource(frames=3))
+        with open(path, "ab") as f:
+            f.write(b"\x00" * 100)
+
+        assert len(read_recording(str(path))) == 3
+        record(path, SyntheticSource(frames=1))   # appending trims the partial record
+        assert len(read_recording(str(path))) == 4
+
+    def test_fewer_hands_than_slots(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        points = np.ones((1, 21, 3), dtype=np.float32)
+        record(path, [(0.0, points, np.array([HAND_RIGHT], dtype=np.int8), 1)])
+
+        session = read_recording(str(path))
+        assert session.counts.tolist() == [1]
+        assert session.handedness[0].tolist() == [HAND_RIGHT, 0]
+        assert (session.points[0, 0] == 1).all()
+
+    def test_max_hands_mismatch(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        record(path, [], max_hands=2)
+        with pytest.raises(ValueError, match="max_hands"):
+            SessionRecorder(str(path), max_hands=1)
+
+    def test_empty_recording(self, tmp_path):
+        path = tmp_path / "s.rpsl"
+        record(path, [])
+        session = read_recording(str(path))
+        assert len(session) == 0
+        assert ReplayEngine().run(session).frames == 0
+
+    def test_write_cost(self, tmp_path):
+        points = np.random.default_rng(0).random((2, 21, 3)).astype(np.float32)
+        handedness = np.array([HAND_LEFT, HAND_NONE], dtype=np.int8)
+        with SessionRecorder(str(tmp_path / "s.rpsl")) as recorder:
+            start = time.perf_counter()
+            for i in range(2000):
+                recorder.write(i / 30, points, handedness, 1)
+            per_frame = (time.perf_counter() - start) / 2000
+
+        assert per_frame < 1e-4   # budget: 0.1 ms per frame
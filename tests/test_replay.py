@@ -0,0 +1,162 @@
+"""
+Tests for the offline replay engine
+測試離線重播引擎
+"""
+import json
+
+import numpy as np
+import pytest
+
+from src.cli import main
+from src.game_logic import RPSStateMachine
+from src.gesture_classifier_v2 import GestureClassifierV2
+from src.landmarks import HAND_LEFT, HAND_NONE, HAND_RIGHT
+from src.replay import ReplayClock, ReplayEngine, Session
+from src.server import referee_table
+from src.synthetic import SyntheticSource, canonical_hand, GESTURE_FINGER_STATES
+
+
+def make_session(pairs, fps=10.0):
+    """One frame per (left, right) gesture pair; None = hand missing"""
+    points = np.zeros((len(pairs), 2, 21, 3), dtype=np.float32)
+    handedness = np.full((len(pairs), 2), HAND_NONE, dtype=np.int8)
+    counts = np.zeros(len(pairs), dtype=np.int8)
+    for index, pair in enumerate(pairs):
+        for gesture, side in zip(pair, (HAND_LEFT, HAND_RIGHT)):
+            if gesture is not None:
+                slot = counts[index]
+                points[index, slot] = canonical_hand(GESTURE_FINGER_STATES[gesture])
+                handedness[index, slot] = side
+                counts[index] += 1
+    return Session(np.arange(len(pairs)) / fps, points, handedness, counts)
+
+
+class TestSession:
+    """Test session collection and persistence"""
+
+    def test_from_frames_copies_reused_buffers(self):
+        session = Session.from_frames(SyntheticSource(frames=40, hold=10))
+
+        assert len(session) == 40
+        assert session.points.shape == (40, 2, 21, 3)
+        assert session.max_hands == 2
+        assert not np.shares_memory(session.points[0], session.points[-1])
+        assert (session.counts == 2).all()
+
+    def test_from_empty_frames(self):
+        session = Session.from_frames([])
+        assert len(session) == 0
+        assert session.points.shape == (0, 2, 21, 3)
+
+    def test_save_load_roundtrip(self, tmp_path):
+        session = Session.from_frames(SyntheticSource(frames=20))
+        path = tmp_path / "session.npz"
+        session.save(str(path))
+
+        loaded = Session.load(str(path))
+
+        for field in ("timestamps", "points", "handedness", "counts"):
+            np.testing.assert_array_equal(getattr(loaded, field), getattr(session, field))
+
+    def test_iter_yields_frame_tuples(self):
+        session = Session.from_frames(SyntheticSource(frames=3))
+        timestamp, points, handedness, count = next(iter(session))
+        assert (timestamp, points.shape, count) == (0.0, (2, 21, 3), 2)
+
+
+class TestReplayEngine:
+    """Test the replayed judgement timeline"""
+
+    def test_assign_hands_matches_per_hand_classify(self):
+        session = make_session([("rock", "paper"), (None, "scissors"), ("paper", None), (None, None)])
+        session.handedness[2, 0] = HAND_NONE   # unlabeled hand is skipped
+
+        left, right = ReplayEngine().assign_hands(session)
+
+        assert left.tolist() == ["rock", "", "", ""]
+        assert right.tolist() == ["paper", "scissors", "", ""]
+        classifier = GestureClassifierV2()
+        assert classifier.classify(session.points[1, 0]).gesture == "scissors"
+
+    def test_live_events_match_server_judgements(self):
+        source = SyntheticSource(frames=300, hold=15, seed=3)
+        expected = []
+        referee_table(0, "synthetic", source, expected.append)
+
+        result = ReplayEngine().run(source)
+
+        assert result.frames == 300
+        assert [(e.frame, e.left, e.right, e.result) for e in result.events] == \
+               [(j.frame, j.left, j.right, j.result) for j in expected]
+        assert all(e.mode == "live" for e in result.events)
+
+    def test_space_locks_on_replay_clock(self):
+        session = make_session([("rock", "scissors")] * 5 + [("paper", "scissors")] * 40)
+
+        result = ReplayEngine(lock_duration=2.0).run(session, space_times=[0.15])
+
+        modes = [(e.frame, e.mode, e.left, e.right) for e in result.events]
+        # Locked on frame 2 (first frame at/after 0.15s), held 2.0s of replay time
+        assert modes == [(0, "live", "rock", "scissors"),
+                         (2, "locked", "rock", "scissors"),
+                         (22, "live", "paper", "scissors")]
+        assert result.events[1].message == "左手獲勝"
+
+    def test_missing_hand_breaks_pair(self):
+        session = make_session([("rock", "rock"), ("rock", None), ("rock", "rock")])
+        events = ReplayEngine().run(session).events
+        assert [e.frame for e in events] == [0, 2]
+
+    def test_countdown_mode_reveals_locked_gestures(self):
+        session = make_session([("rock", "scissors")] * 25 + [("paper", "scissors")] * 40)
+        engine = ReplayEngine(game_logic=RPSStateMachine(countdown=3.0, lock_delay=1.0, reveal_duration=2.0))
+
+        events = engine.run(session).events
+
+        # Counting from frame 0, locked at 3.0s (frame 30: paper), revealed 1.0s later
+        assert [(e.frame, e.mode, e.left, e.right, e.result) for e in events] == \
+               [(40, "reveal", "paper", "scissors", "right")]
+
+    def test_empty_session(self):
+        result = ReplayEngine().run(Session.from_frames([]))
+        assert (result.events, result.frames) == ([], 0)
+
+    def test_replay_clock(self):
+        clock = ReplayClock(5.0)
+        assert clock() == 5.0
+        clock.now = 7.5
+        assert clock() == 7.5
+
+
+class TestReplayCLI:
+    """Test ``rps-referee replay``"""
+
+    def test_replay_prints_jsonl(self, capsys, tmp_path):
+        path = tmp_path / "session.npz"
+        Session.from_frames(SyntheticSource(frames=60, hold=15)).save(str(path))
+
+        assert main(["replay", str(path), "--space", "1.0"]) == 0
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines[-1]["type"] == "summary"
+        assert lines[-1]["frames"] == 60
+        assert any(line.get("mode") == "locked" for line in lines[:-1])
+
+    def test_replay_countdown_mode(self, capsys, tmp_path):
+        path = tmp_path / "session.npz"
+        Session.from_frames(SyntheticSource(frames=300, hold=150)).save(str(path))
+
+        assert main(["replay", str(path), "--mode", "countdown", "--countdown", "1",
+                     "--lock-delay", "0.5", "--no-summary"]) == 0
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert lines and all(line["mode"] == "reveal" for line in lines)
+
+    def test_replay_no_summary(self, capsys, tmp_path):
+        path = tmp_path / "session.npz"
+        Session.from_frames(SyntheticSource(frames=15)).save(str(path))
+
+        main(["replay", str(path), "--no-summary"])
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert [line["type"] for line in lines] == ["judgement"]
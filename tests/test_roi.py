@@ -0,0 +1,127 @@
+"""
+Tests for the hand region-of-interest tracker
+測試手部 ROI 追蹤
+"""
+import numpy as np
+import pytest
+
+from src.roi import ROITracker
+from src.synthetic import GESTURE_FINGER_STATES, canonical_hand
+
+FRAME = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+def hands_at(cx, cy, scale=0.2):
+    """Two small hands around (cx, cy), full-frame normalized"""
+    hand = canonical_hand(GESTURE_FINGER_STATES["paper"])
+    hand[:, :2] = (hand[:, :2] - 0.5) * scale
+    points = np.stack([hand, hand])
+    points[0, :, 0] += cx - 0.05
+    points[1, :, 0] += cx + 0.05
+    points[:, :, 1] += cy
+    return points
+
+
+def to_box(points, box, shape=FRAME.shape):
+    """Normalize full-frame landmarks to a crop, as MediaPipe would report them"""
+    h, w = shape[:2]
+    x0, y0, x1, y1 = box
+    local = points.copy()
+    local[..., 0] = (points[..., 0] * w - x0) / (x1 - x0)
+    local[..., 1] = (points[..., 1] * h - y0) / (y1 - y0)
+    local[..., 2] = points[..., 2] * w / (x1 - x0)
+    return local
+
+
+def track(tracker, points, count=2):
+    region, box = tracker.crop(FRAME)
+    local = to_box(points, box)
+    tracker.update(local, count, box, FRAME.shape)
+    return region, box, local
+
+
+class TestROITracker:
+    """Test region prediction, remapping and fallbacks"""
+
+    def test_first_frame_is_full(self):
+        region, box = ROITracker().crop(FRAME)
+        assert box == (0, 0, 1280, 720)
+        assert region.shape == FRAME.shape
+
+    def test_crops_around_hands_after_detection(self):
+        tracker = ROITracker()
+        points = hands_at(0.5, 0.5)
+        track(tracker, points)
+
+        region, box = tracker.crop(FRAME)
+
+        x0, y0, x1, y1 = box
+        xs, ys = points[..., 0] * 1280, points[..., 1] * 720
+        assert x0 <= xs.min() and xs.max() <= x1 and y0 <= ys.min() and ys.max() <= y1
+        assert region.shape[0] * region.shape[1] < 0.5 * 1280 * 720
+
+    def test_remap_restores_full_frame_coordinates(self):
+        tracker = ROITracker()
+        points = hands_at(0.3, 0.6)
+        track(tracker, points)
+
+        _, box, local = track(tracker, points)
+
+        assert box != (0, 0, 1280, 720)
+        np.testing.assert_allclose(local, points, atol=1e-5)
+
+    def test_steady_box_for_small_motion(self):
+        tracker = ROITracker()
+        track(tracker, hands_at(0.5, 0.5))
+        track(tracker, hands_at(0.5, 0.5))
+        box = tracker.box
+
+        track(tracker, hands_at(0.51, 0.5))
+
+        assert tracker.box == box
+
+    def test_box_follows_large_motion(self):
+        tracker = ROITracker()
+        track(tracker, hands_at(0.3, 0.5))
+        box = tracker.box
+        track(tracker, hands_at(0.7, 0.5))
+        assert tracker.box != box
+
+    def test_lost_hand_falls_back_to_full_frame(self):
+        tracker = ROITracker()
+        track(tracker, hands_at(0.5, 0.5))
+        track(tracker, hands_at(0.5, 0.5), count=1)
+
+        assert tracker.box is None
+        assert tracker.crop(FRAME)[1] == (0, 0, 1280, 720)
+
+    def test_periodic_full_frame_refresh(self):
+        tracker = ROITracker(refresh=3)
+        boxes = [track(tracker, hands_at(0.5, 0.5))[1] for _ in range(9)]
+        full = [box == (0, 0, 1280, 720) for box in boxes]
+
+        assert full == [True, False, False, False, True, False, False, False, True]
+        assert (tracker.full_frames, tracker.roi_frames) == (3, 6)
+
+    def test_min_size(self):
+        tracker = ROITracker(min_size=0.5)
+        track(tracker, hands_at(0.5, 0.5, scale=0.01))
+        x0, y0, x1, y1 = tracker.box
+        assert x1 - x0 >= 0.5 * 1280 - 2 and y1 - y0 >= 0.5 * 720 - 2
+
+    def test_downscale_keeps_normalized_landmarks(self):
+        tracker = ROITracker(max_side=320)
+        region, box = tracker.crop(FRAME)
+        assert max(region.shape[:2]) == 320
+        assert region.shape[1] / region.shape[0] == pytest.approx(1280 / 720, rel=0.01)
+
+        points = hands_at(0.5, 0.5)
+        local = points.copy()
+        tracker.update(local, 2, box, FRAME.shape)
+        np.testing.assert_array_equal(local, points)
+
+    def test_reset(self):
+        tracker = ROITracker()
+        track(tracker, hands_at(0.5, 0.5))
+        tracker.reset()
+        assert tracker.box is None and tracker.hands == 0
@@ -0,0 +1,211 @@
+"""
+Tests for multi-table referee server
+測試多桌裁判伺服器
+"""
+import json
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import src.server as server
+from src.cli import main
+from src.judge import judge_rps
+from src.landmarks import HAND_LEFT, HAND_NONE
+from src.server import (
+    Judgement, TableSummary, parse_source, referee_table, serve,
+    _init_worker, _run_table
+)
+from src.synthetic import SyntheticSource
+
+
+class TestRefereeTable:
+    """Test single-table refereeing in-process"""
+
+    def test_judgements_follow_judge_rps(self):
+        events = []
+        summary = referee_table(0, "synthetic", SyntheticSource(frames=90, hold=15), events.append)
+
+        assert summary.frames == 90
+        assert summary.judgements == len(events)
+        assert len(events) >= 1
+        for event in events:
+            assert event.frame % 15 == 0
+            expected = judge_rps(event.left, event.right)
+            assert (event.result, event.message) == (expected["result"], expected["message"])
+
+    def test_held_pair_emits_once(self):
+        events = []
+        referee_table(0, "synthetic", SyntheticSource(frames=15, hold=15), events.append)
+        assert len(events) == 1
+
+    def test_hands_without_handedness_are_skipped(self):
+        frames = []
+        for timestamp, points, handedness, count in SyntheticSource(frames=5, hold=5):
+            handedness = np.where(handedness == HAND_LEFT, HAND_NONE, handedness)
+            frames.append((timestamp, points, handedness, count))
+        events = []
+        summary = referee_table(0, "synthetic", frames, events.append)
+        assert summary.frames == 5 and events == []
+
+
+class TestWorkerTask:
+    """Test the pool task in-process (worker state set up by the initializer)"""
+
+    def run_task(self, spec, **options):
+        events = queue.Queue()
+        _init_worker(events, options)
+        _run_table(7, spec)
+        started = events.get_nowait()
+        assert (started.table, started.pid) == (7, os.getpid())
+        return [events.get_nowait() for _ in range(events.qsize())]
+
+    def test_synthetic_task_ends_with_summary(self):
+        events = self.run_task("synthetic:30")
+
+        assert isinstance(events[-1], TableSummary)
+        assert events[-1].table == 7
+        assert all(isinstance(e, Judgement) for e in events[:-1])
+        assert events[-1].to_dict()["type"] == "summary"
+        assert events[0].to_dict()["type"] == "judgement"
+
+    def test_each_video_table_gets_fresh_hands(self, monkeypatch):
+        import src.pipeline as pipeline_module
+
+        created = []
+
+        class FakeHands:
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        def create_hands(**kwargs):
+            created.append(FakeHands())
+            return created[-1]
+
+        monkeypatch.setattr(pipeline_module, "create_hands", create_hands)
+        monkeypatch.setattr(server, "iter_video_hands", lambda path, hands, **kwargs: iter(()))
+        events = queue.Queue()
+        _init_worker(events, {})
+        _run_table(0, "a.mp4")
+        _run_table(1, "b.mp4")
+        assert len(created) == 2 and created[0] is not created[1]
+        assert all(hands.closed for hands in created)
+
+    def test_missing_video_task_reports_error(self, tmp_path):
+        events = self.run_task(str(tmp_path / "missing.mp4"))
+
+        assert len(events) == 1
+        assert events[0].error.startswith("OSError")
+        assert events[0].fps == 0.0
+
+    @pytest.mark.slow
+    def test_video_task_with_mediapipe(self, tmp_path):
+        """Test a real video file goes through the worker's Hands instance"""
+        cv2 = pytest.importorskip("cv2")
+        pytest.importorskip("mediapipe")
+        path = str(tmp_path / "blank.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (160, 120))
+        for _ in range(5):
+            writer.write(np.zeros((120, 160, 3), dtype=np.uint8))
+        writer.release()
+
+        events = self.run_task(path, mirror=True)
+
+        assert len(events) == 1
+        assert events[0].error is None
+        assert events[0].frames == 5
+        assert events[0].judgements == 0
+
+
+class TestParseSource:
+    """Test source spec parsing"""
+
+    def test_synthetic_specs(self):
+        assert len(parse_source("synthetic")) == 300
+        assert len(parse_source("synthetic:42")) == 42
+
+    def test_video_spec_returns_none(self):
+        assert parse_source("match.mp4") is None
+
+
+class TestServe:
+    """Test the process pool"""
+
+    def test_streams_all_tables(self):
+        sources = ["synthetic:60", "synthetic:90", "synthetic:30"]
+        events = list(serve(sources, workers=2))
+
+        summaries = [e for e in events if isinstance(e, TableSummary)]
+        judgements = [e for e in events if isinstance(e, Judgement)]
+
+        assert sorted(s.table for s in summaries) == [0, 1, 2]
+        assert {s.table: s.frames for s in summaries} == {0: 60, 1: 90, 2: 30}
+        for table in range(3):
+            frames = [j.frame for j in judgements if j.table == table]
+            assert frames == sorted(frames)
+            assert len(frames) == next(s.judgements for s in summaries if s.table == table)
+
+    def test_missing_video_reports_error(self, tmp_path):
+        events = list(serve([str(tmp_path / "missing.mp4")], workers=1))
+
+        assert len(events) == 1
+        assert events[0].error is not None
+        assert events[0].frames == 0
+
+    @pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(),
+                        reason="needs fork to patch the worker")
+    def test_dead_worker_reports_error(self, monkeypatch):
+        """Test a worker that dies hard ends its table instead of hanging serve()"""
+        real_parse_source = server.parse_source
+
+        def crashing_parse_source(spec):
+            if spec == "crash":
+                os._exit(1)
+            return real_parse_source(spec)
+
+        monkeypatch.setattr(server, "parse_source", crashing_parse_source)
+        events = list(serve(["crash", "synthetic:30"], workers=2, start_method="fork"))
+        summaries = {e.table: e for e in events if isinstance(e, TableSummary)}
+
+        assert sorted(summaries) == [0, 1]
+        assert "died" in summaries[0].error
+        assert summaries[1].error is None
+
+    def test_empty_sources(self):
+        assert list(serve([])) == []
+
+
+class TestServeCLI:
+    """Test ``rps-referee serve``"""
+
+    def test_serve_prints_jsonl(self, capsys):
+        assert main(["serve", "synthetic:45", "synthetic:45", "-w", "2"]) == 0
+
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {line["type"] for line in lines} == {"judgement", "summary"}
+        assert sum(line["type"] == "summary" for line in lines) == 2
+
+    def test_serve_stdout_is_pure_jsonl(self):
+        """Test stdout of a real CLI run (parent + spawned workers) is only JSON lines"""
+        root = Path(__file__).resolve().parent.parent
+        completed = subprocess.run(
+            [sys.executable, "-m", "src.cli", "serve", "synthetic:30", "synthetic:30", "-w", "2"],
+            cwd=root, capture_output=True, text=True, timeout=120
+        )
+
+        assert completed.returncode == 0
+        lines = completed.stdout.splitlines()
+        assert lines
+        for line in lines:
+            json.loads(line)
+
+    def test_serve_no_summary_and_error_exit(self, capsys, tmp_path):
+        assert main(["serve", str(tmp_path / "missing.mp4"), "--no-summary"]) == 1
+        assert capsys.readouterr().out == ""
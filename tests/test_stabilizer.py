@@ -0,0 +1,84 @@
+"""
+Tests for the sliding-window gesture stabilizer
+測試手勢穩定器
+"""
+import numpy as np
+import pytest
+
+from src.gestures import Gesture
+from src.stabilizer import GestureStabilizer
+
+
+def feed(stabilizer, gestures):
+    return [stabilizer.update(g) for g in gestures]
+
+
+class TestGestureStabilizer:
+    """Test majority vote with hysteresis"""
+
+    def test_needs_full_window_by_default(self):
+        stabilizer = GestureStabilizer(window=3)
+        assert feed(stabilizer, ["rock", "rock", "rock"]) == [None, None, "rock"]
+        assert stabilizer.stability == 1.0
+
+    def test_single_misclassified_frame_is_ignored(self):
+        stabilizer = GestureStabilizer(window=5, min_count=3)
+        feed(stabilizer, ["rock"] * 5)
+
+        out = feed(stabilizer, ["scissors", "rock", "rock"])
+
+        assert out == ["rock", "rock", "rock"]
+        assert stabilizer.stability == pytest.approx(0.8)
+
+    def test_switch_after_min_count(self):
+        stabilizer = GestureStabilizer(window=5, min_count=3)
+        feed(stabilizer, ["rock"] * 5)
+        assert feed(stabilizer, ["paper"] * 3) == ["rock", "rock", "paper"]
+
+    def test_hysteresis_holds_on_tie(self):
+        stabilizer = GestureStabilizer(window=4, min_count=3)
+        feed(stabilizer, ["rock"] * 4)
+        # 2 rock / 2 paper: paper never reaches 3 slots
+        assert feed(stabilizer, ["paper", "rock", "paper", "rock"] * 3)[-1] == "rock"
+
+    def test_unknown_and_missing_hand_count_as_no_gesture(self):
+        stabilizer = GestureStabilizer(window=3)
+        feed(stabilizer, ["paper"] * 3)
+        assert feed(stabilizer, ["unknown", None, None]) == ["paper", "paper", None]
+        assert stabilizer.stability == 1.0
+
+    def test_counts_match_brute_force_window(self):
+        rng = np.random.default_rng(0)
+        choices = ["rock", "paper", "scissors", None, "unknown"]
+        stabilizer = GestureStabilizer(window=7, min_count=4)
+        history = [None] * 7
+
+        for gesture in rng.choice(len(choices), 500):
+            gesture = choices[gesture]
+            stable_before = stabilizer.gesture
+            stable = stabilizer.update(gesture)
+            history = history[1:] + [gesture if gesture in ("rock", "paper", "scissors") else None]
+
+            # Counts are indexed by Gesture code (UNKNOWN = no gesture)
+            assert stabilizer._counts == [history.count(g) for g in (None, "rock", "paper", "scissors")]
+            if stable != stable_before:
+                assert history.count(stable) >= 4
+            assert stabilizer.stability == history.count(stable) / 7
+
+    def test_push_codes(self):
+        stabilizer = GestureStabilizer(window=2)
+        assert [stabilizer.push(code) for code in (Gesture.PAPER, Gesture.PAPER, Gesture.UNKNOWN)] == [
+            Gesture.UNKNOWN, Gesture.PAPER, Gesture.PAPER]
+        assert stabilizer.code == Gesture.PAPER and stabilizer.gesture == "paper"
+
+    def test_reset(self):
+        stabilizer = GestureStabilizer(window=2)
+        feed(stabilizer, ["rock", "rock"])
+        stabilizer.reset()
+        assert stabilizer.gesture is None
+        assert stabilizer.update("rock") is None
+
+    @pytest.mark.parametrize("min_count", [0, 6])
+    def test_invalid_min_count(self, min_count):
+        with pytest.raises(ValueError):
+            GestureStabilizer(window=5, min_count=min_count)
@@ -0,0 +1,139 @@
+"""
+Tests for the synthetic landmark generator
+測試合成手部關鍵點產生器
+"""
+import json
+
+import numpy as np
+import pytest
+
+from src.cli import main
+from src.gesture_classifier_v2 import GestureClassifierV2
+from src.gestures import Gesture
+from src.landmarks import HAND_LEFT, HAND_RIGHT
+from src.recording import SessionRecorder, write_recording
+from src.replay import ReplayEngine, Session
+from src.synthetic import (Augment, POSE_TEMPLATES, random_hands, synthesize_hands,
+                           synthesize_session, transform_hands)
+
+MILD = Augment(noise=0.003, rotation=25.0, scale=(0.7, 1.3), shift=0.15)
+
+
+class TestSynthesizeHands:
+    """Templates, transforms and augmentation"""
+
+    def test_templates_classify_as_their_code(self):
+        codes = np.array([Gesture.ROCK, Gesture.PAPER, Gesture.SCISSORS])
+        result = GestureClassifierV2().classify_batch(synthesize_hands(codes))
+        assert result.codes.tolist() == codes.tolist()
+
+    def test_transform_rotates_about_wrist(self):
+        hand = POSE_TEMPLATES[[Gesture.PAPER]].copy()
+        moved = transform_hands(hand.copy(), np.radians([90.0]), np.array([2.0]),
+                                np.array([[0.1, -0.1]]))
+        np.testing.assert_allclose(moved[0, 0], hand[0, 0] + [0.1, -0.1, 0.0], atol=1e-6)
+        before = hand[0, 12, :2] - hand[0, 0, :2]
+        after = moved[0, 12, :2] - moved[0, 0, :2]
+        np.testing.assert_allclose(after, 2 * np.array([-before[1], before[0]]), atol=1e-6)
+
+    def test_rotation_and_scale_keep_labels(self):
+        codes, points = next(random_hands(3000, Augment(rotation=40.0, scale=(0.5, 1.5), shift=0.2)))
+        assert (GestureClassifierV2().classify_batch(points).codes == codes).all()
+
+    def test_tilt_moves_fingers_in_depth(self):
+        hand = POSE_TEMPLATES[[Gesture.PAPER]].copy()
+        tilted = transform_hands(hand.copy(), np.zeros(1), np.ones(1), np.zeros((1, 2)),
+                                 tilts=np.radians([60.0]))
+        length = np.linalg.norm(hand[0, 12] - hand[0, 0])
+        assert np.linalg.norm(tilted[0, 12] - tilted[0, 0]) == pytest.approx(length, rel=1e-5)
+        assert abs(tilted[0, 12, 2]) == pytest.approx(length * np.sin(np.radians(60.0)), rel=1e-3)
+
+    def test_mild_noise_accuracy(self):
+        codes, points = next(random_hands(5000, MILD, seed=1))
+        accuracy = (GestureClassifierV2().classify_batch(points).codes == codes).mean()
+        assert accuracy > 0.98
+
+    def test_occlusion_moves_only_one_finger(self):
+        codes = np.full(200, Gesture.PAPER)
+        points = synthesize_hands(codes, Augment(occlusion=1.0), np.random.default_rng(0))
+        changed = np.abs(points - POSE_TEMPLATES[Gesture.PAPER]).max(axis=2) > 0
+        assert (changed.sum(axis=1) == 3).all()
+        assert not changed[:, [0, 1, 5, 9, 13, 17]].any()
+
+    def test_seeded_and_batched(self):
+        first = [(c.copy(), p.copy()) for c, p in random_hands(1000, MILD, seed=3, batch=256)]
+        again = [(c.copy(), p.copy()) for c, p in random_hands(1000, MILD, seed=3, batch=256)]
+        assert [len(c) for c, _ in first] == [256, 256, 256, 232]
+        for (c1, p1), (c2, p2) in zip(first, again):
+            assert (c1 == c2).all() and np.array_equal(p1, p2)
+        assert set(np.concatenate([c for c, _ in first]).tolist()) == {1, 2, 3}
+
+    def test_large_batches_use_noise_table(self):
+        _, points = next(random_hands(10000, Augment(noise=0.01), batch=10000))
+        codes = np.asarray(GestureClassifierV2().classify_batch(points).codes)
+        assert points.dtype == np.float32 and points.shape == (10000, 21, 3)
+        assert (codes != Gesture.UNKNOWN).mean() > 0.9
+
+
+class TestSynthesizeSession:
+    """Two-hand matches with transitions"""
+
+    def test_layout_and_labels(self):
+        session, labels = synthesize_session(100, fps=25.0, hold=10, transition=5)
+        assert len(session) == 100 and labels.shape == (100, 2)
+        assert session.timestamps[1] == pytest.approx(0.04)
+        assert session.counts.tolist() == [2] * 100
+        assert (session.handedness == [HAND_LEFT, HAND_RIGHT]).all()
+        # The first pair is held for the whole period; later ones blend in for 5 frames
+        assert (labels[:15] != Gesture.UNKNOWN).all()
+        changed = labels[20] != labels[14]
+        assert (labels[15:20, changed] == Gesture.UNKNOWN).all()
+        assert (labels[15:20, ~changed] == labels[14, ~changed]).all()
+        assert (labels[20:30] != Gesture.UNKNOWN).all()
+        assert (session.points[:, 0, 0, 0] < session.points[:, 1, 0, 0]).all()
+
+    def test_held_frames_classify_as_labels(self):
+        session, labels = synthesize_session(600, hold=20, transition=4, augment=MILD, seed=2)
+        codes = GestureClassifierV2().classify_batch(session.points.reshape(-1, 21, 3)).codes
+        held = labels.ravel() != Gesture.UNKNOWN
+        assert (codes[held] == labels.ravel()[held]).mean() > 0.97
+
+    def test_pose_is_kept_while_held(self):
+        session, _ = synthesize_session(30, hold=30, augment=Augment(rotation=30.0, shift=0.2))
+        assert np.array_equal(session.points[0], session.points[29])
+
+    def test_replay_runs_synthetic_session(self):
+        session, labels = synthesize_session(300, hold=30)
+        result = ReplayEngine().run(session)
+        assert result.frames == 300
+        assert len(result.events) >= 1
+
+    def test_write_recording_matches_recorder(self, tmp_path):
+        session, _ = synthesize_session(50, augment=MILD)
+        bulk, streamed = str(tmp_path / "bulk.rpsl"), str(tmp_path / "streamed.rpsl")
+        assert write_recording(bulk, session, chunk=16) == 50
+        with SessionRecorder(streamed) as recorder:
+            for frame in session:
+                recorder.write(*frame)
+        assert open(bulk, "rb").read() == open(streamed, "rb").read()
+        loaded = Session.load(bulk)
+        np.testing.assert_array_equal(loaded.points, session.points)
+
+
+class TestSynthCommand:
+    """rps-referee synth"""
+
+    def test_writes_session_and_labels(self, tmp_path, capsys):
+        output, labels = tmp_path / "match.npz", tmp_path / "labels.npy"
+        assert main(["synth", str(output), "--frames", "90", "--transition", "3",
+                     "--noise", "0.002", "--rotation", "15", "--occlusion", "0.1",
+                     "--labels", str(labels)]) == 0
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["frames"] == 90 and summary["hands"] == 180
+        assert len(Session.load(str(output))) == 90
+        assert np.load(labels).shape == (90, 2)
+
+    def test_writes_recording(self, tmp_path, capsys):
+        output = tmp_path / "match.rpsl"
+        assert main(["synth", str(output), "--frames", "30"]) == 0
+        assert len(Session.load(str(output))) == 30
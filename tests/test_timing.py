@@ -0,0 +1,111 @@
+"""
+Tests for per-stage latency instrumentation
+測試各階段延遲量測
+"""
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from src.timing import STAGES, StageStats, StageTimer
+
+
+class TestStageTimer:
+    """Test ring buffers, percentiles and rolling FPS"""
+
+    def test_percentiles_in_milliseconds(self):
+        timer = StageTimer(stages=["detect"], capacity=1000)
+        for ms in range(1, 101):
+            timer.record("detect", ms * 1_000_000)
+
+        stats = timer.stats("detect")
+
+        assert stats.count == 100
+        assert stats.p50 == pytest.approx(50.5)
+        assert stats.p95 == pytest.approx(95.05)
+        assert stats.p99 == pytest.approx(99.01)
+        assert stats.mean == pytest.approx(50.5)
+
+    def test_ring_keeps_latest_samples(self):
+        timer = StageTimer(stages=["detect"], capacity=10)
+        for value in range(25):
+            timer.record("detect", value)
+
+        assert sorted(timer.samples("detect").tolist()) == list(range(15, 25))
+        assert timer.stats("detect").count == 25
+
+    def test_empty_stage(self):
+        assert StageTimer().stats("draw") == StageStats("draw", 0, 0.0, 0.0, 0.0, 0.0)
+
+    def test_unknown_stage_raises(self):
+        with pytest.raises(KeyError):
+            StageTimer().record("teleport", 1)
+
+    def test_rolling_fps(self):
+        timer = StageTimer(capacity=30)
+        assert timer.fps == 0.0
+        for frame in range(100):
+            timer.tick(frame * 33_333_333)   # 30 FPS
+
+        assert timer.fps == pytest.approx(30.0, rel=1e-6)
+        assert timer.frames == 100
+
+    def test_overlay_lines_cached_between_refreshes(self):
+        timer = StageTimer(overlay_refresh=10)
+        timer.record("detect", 5_000_000)
+        timer.tick(0)
+        lines = timer.overlay_lines()
+
+        assert lines[0].startswith("FPS")
+        assert any(line.startswith("detect") and "5.0" in line for line in lines)
+        timer.record("classify", 1_000_000)
+        timer.tick(1)
+        assert timer.overlay_lines() is lines
+        for frame in range(2, 12):
+            timer.tick(frame)
+        assert any(line.startswith("classify") for line in timer.overlay_lines())
+
+    def test_default_stages_cover_the_loop(self):
+        assert STAGES == ("capture", "convert", "detect", "classify", "game", "draw", "display")
+
+
+class TestTimingDump:
+    """Test JSON / CSV dumps"""
+
+    def fill(self, timer):
+        for stage in timer.stages:
+            timer.record(stage, 2_000_000)
+
+    def test_json_snapshot(self, tmp_path):
+        path = str(tmp_path / "timing.json")
+        timer = StageTimer()
+        self.fill(timer)
+        timer.dump(path)
+
+        data = json.loads(open(path).read())
+        assert set(data["stages"]) == set(STAGES)
+        assert data["stages"]["detect"]["p99"] == pytest.approx(2.0)
+
+    def test_periodic_csv_appends(self, tmp_path):
+        path = str(tmp_path / "timing.csv")
+        timer = StageTimer(stages=["detect", "draw"], dump_path=path, dump_interval=1.0)
+        self.fill(timer)
+        for second in np.arange(0, 3.5, 0.5):
+            timer.tick(int(second * 1e9))
+
+        rows = list(csv.DictReader(open(path)))
+        assert len(rows) == 3 * 2   # dumps at 1s, 2s, 3s; one row per stage
+        assert rows[0]["stage"] == "detect"
+        assert float(rows[0]["p50"]) == pytest.approx(2.0)
+
+    def test_record_overhead(self):
+        import time
+        timer = StageTimer()
+        start = time.perf_counter()
+        for _ in range(10000):
+            timer.record("detect", 123)
+        per_call = (time.perf_counter() - start) / 10000
+
+        # Seven stages per frame must stay far below 1% of a 33 ms frame
+        assert 7 * per_call < 0.0033 * 0.01
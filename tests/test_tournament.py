@@ -0,0 +1,164 @@
+"""
+Tests for league scoring
+測試聯賽 Elo 計分
+"""
+import numpy as np
+import pytest
+
+from src.gestures import Gesture
+from src.judge import Result, judge_rps
+from src.tournament import League, Standing
+
+
+def random_rounds(n, players=20, seed=0):
+    rng = np.random.default_rng(seed)
+    labels = [g.label for g in Gesture]
+    left = rng.integers(0, players, n)
+    right = (left + rng.integers(1, players, n)) % players
+    gestures = rng.integers(0, 4, (2, n))
+    return [(f"p{a}", f"p{b}", labels[c], labels[d], float(t))
+            for t, (a, b, c, d) in enumerate(zip(left.tolist(), right.tolist(),
+                                                 gestures[0].tolist(), gestures[1].tolist()))]
+
+
+class TestSingleRounds:
+    """Sequential Elo and judge_rps semantics"""
+
+    def test_win_moves_ratings_symmetrically(self):
+        league = League(k_factor=32)
+        outcome = league.add_round("alice", "bob", "rock", "scissors", timestamp=5.0)
+        assert outcome is judge_rps("rock", "scissors")
+        assert league.rating("alice") == pytest.approx(1516.0)
+        assert league.rating("bob") == pytest.approx(1484.0)
+        assert league.column("last_played").tolist() == [5.0, 5.0]
+
+    def test_draw_between_equals_changes_nothing(self):
+        league = League()
+        assert league.add_round("a", "b", "paper", "paper")["result"] == "draw"
+        assert league.column("rating").tolist() == [1500.0, 1500.0]
+        assert league.column("draws").tolist() == [1, 1]
+
+    def test_invalid_round_only_counts(self):
+        league = League()
+        outcome = league.add_round("a", "b", "rock", "unknown")
+        assert outcome["result"] == "invalid"
+        assert league.column("rating").tolist() == [1500.0, 1500.0]
+        assert league.column("invalid").tolist() == [1, 1]
+        assert league.standings()[0].played == 0
+        assert league.rounds == 1
+
+    def test_upset_gains_more(self):
+        league = League()
+        for _ in range(5):
+            league.add_round("strong", "weak", "paper", "rock")
+        before = league.rating("weak")
+        league.add_round("strong", "weak", "paper", "scissors")
+        assert league.rating("weak") - before > 16
+
+
+class TestBatchScoring:
+    """Column and stream ingestion"""
+
+    def test_counts_match_judge_rps(self):
+        rounds = random_rounds(2000)
+        league = League()
+        assert league.ingest(rounds, chunk=300) == 2000
+
+        wins = {}
+        for left, right, lg, rg, _ in rounds:
+            result = judge_rps(lg, rg)["result"]
+            if result == "left":
+                wins[left] = wins.get(left, 0) + 1
+            elif result == "right":
+                wins[right] = wins.get(right, 0) + 1
+        for name, count in wins.items():
+            assert league.column("wins")[league.player_id(name)] == count
+
+    def test_rating_is_zero_sum(self):
+        league = League()
+        league.ingest(random_rounds(5000))
+        assert league.column("rating").mean() == pytest.approx(1500.0)
+        played = league.column("wins") + league.column("draws") + league.column("losses")
+        assert played.sum() == 2 * 5000 - league.column("invalid").sum()
+
+    def test_one_round_chunks_match_add_round(self):
+        rounds = random_rounds(200, players=5)
+        streamed, single = League(), League()
+        streamed.ingest(rounds, chunk=1)
+        for round_ in rounds:
+            single.add_round(*round_)
+        np.testing.assert_allclose(streamed.column("rating"), single.column("rating"))
+
+    def test_large_chunks_match_add_round(self):
+        rounds = random_rounds(20000, players=4, seed=1)
+        streamed, single = League(), League()
+        streamed.ingest(rounds)
+        for round_ in rounds:
+            single.add_round(*round_)
+        names = [f"p{i}" for i in range(4)]
+        np.testing.assert_allclose([streamed.rating(name) for name in names],
+                                   [single.rating(name) for name in names])
+        assert np.abs(streamed.column("rating") - 1500.0).max() < 200.0
+
+    def test_rating_moves_at_most_k_per_round(self):
+        league = League(k_factor=32.0)
+        ids = [league.player_id(name) for name in ("a", "b")]
+        league.add_rounds([ids[0]] * 1000, [ids[1]] * 1000,
+                          [Gesture.ROCK] * 1000, [Gesture.SCISSORS] * 1000)
+        assert 1500.0 < league.rating("a") < 1500.0 + 32.0 * 1000
+        assert league.rating("a") + league.rating("b") == pytest.approx(3000.0)
+
+    def test_add_rounds_returns_result_codes(self):
+        league = League()
+        ids = [league.player_id(name) for name in ("a", "b")]
+        results = league.add_rounds([ids[0]] * 3, [ids[1]] * 3,
+                                    [Gesture.ROCK, Gesture.ROCK, Gesture.UNKNOWN],
+                                    [Gesture.SCISSORS, Gesture.PAPER, Gesture.ROCK])
+        assert results.tolist() == [Result.LEFT, Result.RIGHT, Result.INVALID]
+
+    def test_unknown_player_id_rejected(self):
+        league = League()
+        league.player_id("a")
+        with pytest.raises(ValueError):
+            league.add_rounds([0], [1], [Gesture.ROCK], [Gesture.PAPER])
+
+    def test_tables_grow(self):
+        league = League(capacity=2)
+        league.ingest(random_rounds(500, players=100))
+        assert len(league) == 100
+        assert len(league.column("rating")) == 100
+
+
+class TestStandings:
+    """Leaderboard and checkpoints"""
+
+    def test_sorted_by_rating(self):
+        league = League()
+        league.ingest(random_rounds(3000))
+        rows = league.standings()
+        assert [row.rank for row in rows] == list(range(1, len(rows) + 1))
+        ratings = [row.rating for row in rows]
+        assert ratings == sorted(ratings, reverse=True)
+        assert len(league.standings(top=3)) == 3
+        assert isinstance(rows[0], Standing)
+        assert set(rows[0].to_dict()) == {"rank", "player", "rating", "played",
+                                          "wins", "draws", "losses"}
+
+    def test_checkpoint_round_trip(self, tmp_path):
+        rounds = random_rounds(4000)
+        path = str(tmp_path / "league.npz")
+
+        resumed = League(k_factor=24)
+        resumed.ingest(rounds[:2000], chunk=500)
+        resumed.save(path)
+        resumed = League.load(path)
+        resumed.ingest(rounds[2000:], chunk=500)
+
+        straight = League(k_factor=24)
+        straight.ingest(rounds, chunk=500)
+
+        assert resumed.k_factor == 24 and resumed.rounds == 4000
+        assert resumed.players == straight.players
+        for name in ("rating", "wins", "draws", "losses", "invalid", "last_played"):
+            np.testing.assert_allclose(resumed.column(name), straight.column(name))
+        assert not (tmp_path / "league.npz.tmp").exists()
@@ -0,0 +1,177 @@
+"""
+Tests for V3 UI rendering
+測試 V3 介面繪製
+"""
+import os
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+import src.ui as ui
+from src.game_logic import GameMode
+from src.gesture_classifier_v2 import GestureResult
+from src.ui import (TextSpriteCache, draw_hand_skeleton, draw_text_lines, draw_ui_v3,
+                    find_chinese_font, put_chinese_text)
+
+
+def make_result(gesture):
+    return GestureResult(gesture=gesture, finger_states=[0, 0, 0, 0, 0],
+                         confidence=0.85, debug_angles=[0.0] * 5)
+
+
+LIVE_STATE = {"mode": GameMode.LIVE, "live_result": {"result": "left", "message": "左手獲勝"},
+              "locked_result": None, "locked_gestures": {"left": None, "right": None},
+              "time_remaining": 0}
+LOCKED_STATE = {"mode": GameMode.LOCKED, "live_result": None,
+                "locked_result": {"result": "draw", "message": "平手"},
+                "locked_gestures": {"left": "rock", "right": "rock"}, "time_remaining": 2.5}
+WAITING_STATE = dict(LIVE_STATE, live_result=None)
+# Countdown mode (RPSStateMachine)
+COUNTDOWN_STATES = [
+    dict(WAITING_STATE, mode=GameMode.WAITING, countdown=0),
+    dict(WAITING_STATE, mode=GameMode.COUNTING, countdown=2, time_remaining=1.5),
+    dict(LOCKED_STATE, locked_result=None, countdown=0),
+    dict(LOCKED_STATE, mode=GameMode.REVEAL, countdown=0),
+]
+
+
+class TestDrawUI:
+    """Smoke tests: every mode draws without error and changes the frame"""
+
+    @pytest.mark.parametrize("font_path", [None, "missing-font.ttf"])
+    @pytest.mark.parametrize("state", [LIVE_STATE, LOCKED_STATE, WAITING_STATE] + COUNTDOWN_STATES)
+    def test_draw_modes(self, monkeypatch, font_path, state):
+        monkeypatch.setattr(ui, "FONT_PATH", font_path)
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+
+        out = draw_ui_v3(frame, make_result("rock"), make_result("scissors"),
+                         state, 30.0, status_text="Q cap:0 inf:0")
+
+        assert out.shape == (360, 640, 3)
+        assert out.any()
+
+    def test_put_chinese_text_returns_bgr_frame(self, monkeypatch):
+        monkeypatch.setattr(ui, "FONT_PATH", None)
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        out = put_chinese_text(frame, "平手", (10, 10), 40, (0, 255, 0))
+
+        assert out.shape == frame.shape
+        assert out[..., 1].any()
+
+    def test_draw_hand_skeleton(self):
+        frame = np.zeros((100, 100, 3), dtype=np.uint8)
+        points = np.random.default_rng(0).random((21, 3)).astype(np.float32)
+
+        draw_hand_skeleton(frame, points)
+
+        assert frame.any()
+
+    def test_draw_text_lines(self):
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+
+        draw_text_lines(frame, ["FPS 30.0", "detect p50 12.0"], (5, 20), line_height=30)
+
+        assert frame[5:25].any() and frame[35:55].any()
+        assert not frame[60:].any()
+
+    def test_find_chinese_font(self, tmp_path):
+        font = tmp_path / "font.ttf"
+        font.write_bytes(b"")
+
+        assert find_chinese_font([str(tmp_path / "missing.ttf"), str(font)]) == str(font)
+        assert find_chinese_font([str(tmp_path / "missing.ttf")]) is None
+
+
+def _test_font():
+    """A TrueType font that exists in the test environment, if any"""
+    try:
+        import matplotlib
+    except ImportError:
+        return None
+    path = os.path.join(os.path.dirname(matplotlib.__file__), "mpl-data", "fonts", "ttf", "DejaVuSans.ttf")
+    return path if os.path.exists(path) else None
+
+
+class TestTextSpriteCache:
+    """Cached text sprites replace the per-call PIL round-trip"""
+
+    def test_sprite_rasterized_once(self):
+        cache = TextSpriteCache()
+        first = cache.sprite("平手", 40, (0, 255, 0))
+        second = cache.sprite("平手", 40, (0, 255, 0))
+
+        assert first is second
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.sprite("平手", 40, (255, 0, 0)) is not first
+        assert len(cache) == 2
+
+    def test_font_loaded_once_per_size(self, monkeypatch):
+        font_path = _test_font()
+        if font_path is None:
+            pytest.skip("no TrueType font available")
+        calls = []
+        real_truetype = ImageFont.truetype
+        monkeypatch.setattr(ImageFont, "truetype",
+                            lambda *args: calls.append(args) or real_truetype(*args))
+        cache = TextSpriteCache()
+
+        for text in ("Left wins", "Draw", "Left wins"):
+            cache.sprite(text, 40, (255, 255, 255), font_path)
+
+        assert calls == [(font_path, 40)]
+
+    def test_lru_eviction(self):
+        cache = TextSpriteCache(max_entries=2)
+        cache.sprite("a", 20, (255, 255, 255))
+        cache.sprite("b", 20, (255, 255, 255))
+        cache.sprite("a", 20, (255, 255, 255))   # refresh "a"
+        cache.sprite("c", 20, (255, 255, 255))   # evicts "b"
+
+        assert len(cache) == 2
+        misses = cache.misses
+        cache.sprite("a", 20, (255, 255, 255))
+        assert cache.misses == misses
+        cache.sprite("b", 20, (255, 255, 255))
+        assert cache.misses == misses + 1
+
+    def test_draw_only_touches_bounding_box(self):
+        cache = TextSpriteCache()
+        frame = np.full((120, 200, 3), 7, dtype=np.uint8)
+        sprite = cache.sprite("Draw", 30, (0, 255, 0))
+
+        cache.draw(frame, "Draw", (50, 40), 30, (0, 255, 0))
+
+        h, w = sprite.alpha.shape[:2]
+        x0, y0 = 50 + sprite.offset[0], 40 + sprite.offset[1]
+        outside = frame.copy()
+        outside[y0:y0 + h, x0:x0 + w] = 7
+        assert (outside == 7).all()
+        assert frame[y0:y0 + h, x0:x0 + w, 1].max() > 200
+
+    @pytest.mark.parametrize("position", [(-20, -10), (180, 100), (500, 500)])
+    def test_draw_clips_at_frame_edges(self, position):
+        frame = np.zeros((120, 200, 3), dtype=np.uint8)
+
+        out = TextSpriteCache().draw(frame, "Left wins", position, 40, (255, 255, 255))
+
+        assert out is frame
+        assert out.shape == (120, 200, 3)
+
+    def test_matches_pil_rendering(self):
+        font_path = _test_font()
+        if font_path is None:
+            pytest.skip("no TrueType font available")
+        frame = np.random.default_rng(0).integers(0, 255, (100, 300, 3), dtype=np.uint8)
+        color = (40, 200, 250)
+
+        # Reference: the original full-frame PIL path (BGR order kept throughout)
+        pil_image = Image.fromarray(frame.copy())
+        ImageDraw.Draw(pil_image).text((10, 20), "Left wins", font=ImageFont.truetype(font_path, 40),
+                                        fill=color)
+        expected = np.asarray(pil_image).astype(np.int16)
+
+        out = TextSpriteCache().draw(frame.copy(), "Left wins", (10, 20), 40, color, font_path)
+
+        assert np.abs(out.astype(np.int16) - expected).max() <= 2
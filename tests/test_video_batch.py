@@ -0,0 +1,213 @@
+"""
+Tests for the chunked video batch referee
+測試影片分段平行裁判
+"""
+import io
+import json
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pytest
+
+from src.cli import main
+from src.landmarks import HAND_LEFT, HAND_NONE, HAND_RIGHT
+from src.synthetic import GESTURE_FINGER_STATES, canonical_hand
+from src.video_batch import (ChunkResult, assign_sides, merge_chunks, plan_chunks,
+                             process_video, timeline_events, write_timeline)
+
+cv2 = pytest.importorskip("cv2")
+
+
+@dataclass
+class MockLandmark:
+    x: float
+    y: float
+    z: float = 0.0
+
+
+@dataclass
+class MockHandLandmarks:
+    landmark: List[MockLandmark]
+
+
+@dataclass
+class MockCategory:
+    label: str
+
+
+@dataclass
+class MockHandedness:
+    classification: List[MockCategory]
+
+
+@dataclass
+class MockResults:
+    multi_hand_landmarks: list = None
+    multi_handedness: list = None
+
+
+def mock_hand(gesture: str, dx: float) -> MockHandLandmarks:
+    points = canonical_hand(GESTURE_FINGER_STATES[gesture])
+    return MockHandLandmarks([MockLandmark(x + dx, y, z) for x, y, z in points.tolist()])
+
+
+# Frame brightness bucket -> (left gesture, right gesture); 0 = no hands
+SCENES = {1: ("rock", "scissors"), 2: ("paper", "paper"), 3: ("scissors", "rock")}
+PATTERN = [1, 1, 0, 2, 3, 3, 1, 2]   # one bucket per 8 frames
+
+
+class BrightnessHands:
+    """Fake Hands: the frame's brightness selects the scene (picklable)"""
+
+    def process(self, frame_rgb):
+        bucket = int(round((float(frame_rgb.mean()) - 20) / 50))
+        if bucket not in SCENES:
+            return MockResults()
+        left, right = SCENES[bucket]
+        # Mirrored frame: the user's left hand is on the left of the image
+        return MockResults([mock_hand(left, -0.3), mock_hand(right, 0.3)],
+                           [MockHandedness([MockCategory("Left")]),
+                            MockHandedness([MockCategory("Right")])])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("video") / "match.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for bucket in PATTERN:
+        for _ in range(8):
+            writer.write(np.full((48, 64, 3), 20 + 50 * bucket, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def chunk(start, first, counts, handedness, wrist_x, codes=None):
+    n = len(counts)
+    handedness = np.array(handedness, dtype=np.int8)
+    wrists = np.zeros((n, 2, 2), dtype=np.float32)
+    wrists[..., 0] = wrist_x
+    return ChunkResult(start, first, np.arange(first, first + n) / 30.0,
+                       np.array(counts, dtype=np.int8), handedness,
+                       np.full((n, 2), 1, dtype=np.int8) if codes is None else np.array(codes, np.int8),
+                       wrists)
+
+
+class TestPlanning:
+    """Chunk ranges"""
+
+    def test_ranges_cover_video(self):
+        assert plan_chunks(100, 4) == [(0, 25), (25, 50), (50, 75), (75, None)]
+        assert plan_chunks(10, 3) == [(0, 4), (4, 8), (8, None)]
+
+    def test_more_chunks_than_frames(self):
+        assert plan_chunks(2, 8) == [(0, 1), (1, None)]
+        assert plan_chunks(0, 4) == [(0, None)]
+
+
+class TestMerge:
+    """Ordering, sides and seam continuity"""
+
+    def test_assign_sides_last_valid_hand_wins(self):
+        counts = np.array([2, 1, 0])
+        handedness = np.array([[HAND_LEFT, HAND_RIGHT], [HAND_RIGHT, HAND_NONE], [HAND_NONE] * 2])
+        codes = np.array([[1, 3], [2, 0], [1, 1]])
+        left, right = assign_sides(counts, handedness, codes)
+        assert left.tolist() == [1, 0, 0]
+        assert right.tolist() == [3, 2, 0]
+
+    def test_overlap_frames_are_dropped(self):
+        first = chunk(0, 0, [2] * 4, [[HAND_LEFT, HAND_RIGHT]] * 4, [0.2, 0.8])
+        second = chunk(4, 2, [2] * 4, [[HAND_LEFT, HAND_RIGHT]] * 4, [0.2, 0.8])
+        timestamps, left, right, flips = merge_chunks([second, first])
+        assert np.allclose(timestamps * 30, range(6))
+        assert flips == 0
+
+    def test_swapped_seam_is_flipped_until_hands_lost(self):
+        first = chunk(0, 0, [2] * 4, [[HAND_LEFT, HAND_RIGHT]] * 4, [0.2, 0.8],
+                      codes=[[1, 3]] * 4)
+        # Cold tracker labels the hands the other way round; hands lost at row 4
+        second = chunk(4, 2, [2, 2, 2, 2, 0, 2], [[HAND_RIGHT, HAND_LEFT]] * 4
+                       + [[HAND_NONE] * 2] + [[HAND_RIGHT, HAND_LEFT]],
+                       [0.2, 0.8], codes=[[1, 3]] * 6)
+        timestamps, left, right, flips = merge_chunks([first, second])
+        assert flips == 1
+        assert left.tolist() == [1, 1, 1, 1, 1, 1, 0, 3]
+        assert right.tolist() == [3, 3, 3, 3, 3, 3, 0, 1]
+
+    def test_events_on_pair_change(self):
+        left = np.array([1, 1, 0, 1, 2, 2], dtype=np.int8)
+        right = np.array([3, 3, 3, 3, 2, 2], dtype=np.int8)
+        events = timeline_events("v.mp4", np.arange(6) / 30.0, left, right)
+        assert [(e.frame, e.left, e.right, e.result) for e in events] == [
+            (0, "rock", "scissors", "left"), (3, "rock", "scissors", "left"),
+            (4, "paper", "paper", "draw")]
+
+
+class TestProcessVideo:
+    """End to end with a fake Hands"""
+
+    EXPECTED = [(0, "rock", "scissors"), (24, "paper", "paper"), (32, "scissors", "rock"),
+                (48, "rock", "scissors"), (56, "paper", "paper")]
+
+    def run(self, video, **kwargs):
+        return process_video(video, hands_factory=BrightnessHands, **kwargs)
+
+    def test_single_chunk(self, video):
+        result = self.run(video, workers=0, chunks=1)
+        assert result.frames == len(PATTERN) * 8
+        assert [(e.frame, e.left, e.right) for e in result.events] == self.EXPECTED
+
+    def test_chunks_match_single_pass(self, video):
+        single = self.run(video, workers=0, chunks=1)
+        chunked = self.run(video, workers=0, chunks=5, overlap=3)
+        assert chunked.chunks == 5
+        assert chunked.frames == single.frames
+        assert chunked.events == single.events
+        assert chunked.seam_flips == 0
+        assert chunked.duration == pytest.approx(len(PATTERN) * 8 / 30)
+
+    @pytest.mark.slow
+    def test_process_pool(self, video):
+        pooled = self.run(video, workers=2, chunks=3)
+        assert [(e.frame, e.left, e.right) for e in pooled.events] == self.EXPECTED
+        assert len(pooled.worker_seconds) == 3
+        assert pooled.to_dict()["type"] == "summary"
+
+    def test_missing_video(self, tmp_path):
+        with pytest.raises(IOError):
+            process_video(str(tmp_path / "missing.mp4"), workers=0)
+
+
+class TestTimelineOutput:
+    """CSV / JSONL writers and the CLI"""
+
+    def test_csv_and_jsonl(self, video):
+        events = process_video(video, workers=0, chunks=2, hands_factory=BrightnessHands).events
+        out = io.StringIO()
+        write_timeline(events, out, "csv")
+        rows = out.getvalue().splitlines()
+        assert rows[0].split(",")[:4] == ["table", "source", "frame", "timestamp"]
+        assert len(rows) == len(events) + 1
+
+        out = io.StringIO()
+        write_timeline(events, out, "jsonl")
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [line["frame"] for line in lines] == [e.frame for e in events]
+        with pytest.raises(ValueError):
+            write_timeline(events, out, "xml")
+
+    def test_cli_writes_csv(self, video, tmp_path, monkeypatch, capsys):
+        import src.video_batch as video_batch
+
+        real = video_batch.process_video
+        monkeypatch.setattr(video_batch, "process_video",
+                            lambda path, **kw: real(path, hands_factory=BrightnessHands, **kw))
+        output = tmp_path / "timeline.csv"
+        assert main(["video", video, "-w", "0", "--chunks", "3", "-o", str(output)]) == 0
+        assert output.read_text(encoding="utf-8").count("\n") == len(TestProcessVideo.EXPECTED) + 1
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["chunks"] == 3 and summary["frames"] == len(PATTERN) * 8